@@ -0,0 +1,337 @@
+import heapq
+import json
+import queue
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metricas import metricas
+
+# =============================================
+# DESPACHO ASÍNCRONO DE ALERTAS (WHATSAPP)
+# =============================================
+# Las caídas y los riesgos nuevos se encolan con notificar(), que nunca
+# bloquea: si la cola acotada está llena la alerta se descarta y se cuenta.
+# Las urgentes (caídas) van por una cola aparte sin límite, nunca se
+# descartan y encabezan el mensaje de su lote.
+# Un hilo propio agrupa las alertas por número de supervisor durante
+# VENTANA_LOTE segundos y manda un solo mensaje por lote. Cada destinatario
+# tiene un cubo de fichas (MENSAJES_POR_MINUTO, ráfaga RAFAGA): mientras no
+# haya ficha el lote sigue creciendo en vez de generar más mensajes. Los
+# envíos fallidos se reintentan con espera exponencial y algo de azar.
+#
+# El transporte es intercambiable: TransporteSimulado (sin red),
+# TransporteHTTP (webhook de una pasarela de WhatsApp) y ServidorAlertasFalso,
+# un servidor HTTP local para probar el despacho con fallos y latencia.
+
+CAPACIDAD_COLA = 1000
+VENTANA_LOTE = 2.0
+MENSAJES_POR_MINUTO = 6
+RAFAGA = 3
+REINTENTOS = 4
+ESPERA_BASE = 1.0
+# Lo máximo que el hilo bloquea en la cola antes de volver a revisar lotes y reintentos
+SONDEO_COLA = 0.5
+# Alertas retenidas por destinatario mientras espera ficha (se descartan las más viejas)
+MAXIMO_PENDIENTES = 200
+LINEAS_POR_MENSAJE = 10
+MENSAJES_REGISTRADOS = 100
+
+
+@dataclass(slots=True)
+class Alerta:
+    destinatario: str
+    texto: str
+    sala_id: str = ""
+    fecha: float = field(default_factory=time.time)
+    urgente: bool = False
+
+
+def componer_mensaje(alertas, maximo_lineas=LINEAS_POR_MENSAJE):
+    if len(alertas) == 1:
+        return alertas[0].texto
+    alertas = sorted(alertas, key=lambda alerta: not alerta.urgente)
+    lineas = [f"🚨 {len(alertas)} alertas"]
+    lineas.extend(f"• {alerta.texto}" for alerta in alertas[:maximo_lineas])
+    if len(alertas) > maximo_lineas:
+        lineas.append(f"… y {len(alertas) - maximo_lineas} más")
+    return "\n".join(lineas)
+
+
+class CuboFichas:
+    __slots__ = ('fichas', 'actualizado')
+
+    def __init__(self, rafaga, ahora):
+        self.fichas = float(rafaga)
+        self.actualizado = ahora
+
+    def tomar(self, ahora, por_segundo, rafaga):
+        self.fichas = min(rafaga, self.fichas + (ahora - self.actualizado) * por_segundo)
+        self.actualizado = ahora
+        if self.fichas < 1:
+            return False
+        self.fichas -= 1
+        return True
+
+    def disponible(self, por_segundo):
+        # Momento (en el reloj del despachador) en que habrá una ficha entera
+        return self.actualizado + max(0.0, 1 - self.fichas) / por_segundo
+
+
+class TransporteSimulado:
+    # Sin red: registra los últimos mensajes (antes enviar_whatsapp_simulacion)
+    def __init__(self):
+        self.enviados = deque(maxlen=MENSAJES_REGISTRADOS)
+
+    def enviar(self, numero, mensaje):
+        self.enviados.append((numero, mensaje))
+        return True, f"Mensaje simulado enviado a {numero}"
+
+
+class TransporteHTTP:
+    # POST {"to", "text"} en JSON a un webhook; éxito = respuesta 2xx
+    def __init__(self, url, timeout=5.0, token=None):
+        self.url = url
+        self.timeout = timeout
+        self.token = token
+
+    def enviar(self, numero, mensaje):
+        cuerpo = json.dumps({'to': numero, 'text': mensaje}).encode('utf-8')
+        cabeceras = {'Content-Type': 'application/json'}
+        if self.token:
+            cabeceras['Authorization'] = f"Bearer {self.token}"
+        solicitud = urllib.request.Request(self.url, data=cuerpo, headers=cabeceras, method='POST')
+        try:
+            with urllib.request.urlopen(solicitud, timeout=self.timeout) as respuesta:
+                return 200 <= respuesta.status < 300, f"HTTP {respuesta.status}"
+        except urllib.error.HTTPError as error:
+            return False, f"HTTP {error.code}"
+        except (urllib.error.URLError, OSError) as error:
+            return False, str(error)
+
+
+class DespachadorAlertas:
+    def __init__(self, transporte, capacidad=CAPACIDAD_COLA, ventana=VENTANA_LOTE,
+                 mensajes_por_minuto=MENSAJES_POR_MINUTO, rafaga=RAFAGA, reintentos=REINTENTOS,
+                 espera_base=ESPERA_BASE, reloj=time.monotonic):
+        self.transporte = transporte
+        self.ventana = ventana
+        self.por_segundo = mensajes_por_minuto / 60
+        self.rafaga = rafaga
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self._reloj = reloj
+        self._cola = queue.Queue(capacidad)
+        self._urgentes = queue.SimpleQueue()
+        # Solo los usa el hilo del despachador: destinatario -> alertas / apertura del lote / cubo
+        self._pendientes = {}
+        self._apertura = {}
+        self._cubos = {}
+        # (cuándo, orden, destinatario, mensaje, cantidad de alertas, intento)
+        self._reintentos = []
+        self._orden = 0
+        self._azar = random.Random()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._candado_estadisticas = threading.Lock()
+        self.estadisticas = {'encoladas': 0, 'descartadas': 0, 'mensajes': 0, 'alertas_enviadas': 0,
+                             'reintentos': 0, 'fallidos': 0}
+
+    def notificar(self, destinatario, texto, sala_id="", urgente=False):
+        # Llamable desde cualquier hilo (incluso con el candado de una sala tomado)
+        if not destinatario:
+            return False
+        if urgente:
+            self._urgentes.put(Alerta(destinatario, texto, sala_id, urgente=True))
+            self._contar('encoladas')
+            return True
+        try:
+            self._cola.put_nowait(Alerta(destinatario, texto, sala_id))
+        except queue.Full:
+            self._contar('descartadas')
+            return False
+        self._contar('encoladas')
+        return True
+
+    def en_cola(self):
+        return self._cola.qsize() + self._urgentes.qsize() + sum(len(alertas) for alertas in list(self._pendientes.values()))
+
+    def iniciar(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="despachador-alertas", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            self.recibir(self._proxima_espera())
+            self.despachar()
+
+    def recibir(self, espera=0):
+        # Pasa lo encolado a los lotes por destinatario; espera hasta 'espera' s por la primera alerta
+        self._recibir_urgentes()
+        try:
+            self._agrupar(self._cola.get(timeout=espera) if espera else self._cola.get_nowait())
+            while True:
+                self._agrupar(self._cola.get_nowait())
+        except queue.Empty:
+            pass
+        self._recibir_urgentes()
+
+    def _recibir_urgentes(self):
+        try:
+            while True:
+                self._agrupar(self._urgentes.get_nowait())
+        except queue.Empty:
+            pass
+
+    def _agrupar(self, alerta):
+        pendientes = self._pendientes.get(alerta.destinatario)
+        if pendientes is None:
+            pendientes = self._pendientes[alerta.destinatario] = []
+            self._apertura[alerta.destinatario] = self._reloj()
+        pendientes.append(alerta)
+        if len(pendientes) > MAXIMO_PENDIENTES:
+            # Se descarta la más vieja que no sea urgente
+            for i, pendiente in enumerate(pendientes):
+                if not pendiente.urgente:
+                    del pendientes[i]
+                    self._contar('descartadas')
+                    break
+
+    def _proxima_espera(self):
+        ahora = self._reloj()
+        plazos = []
+        for destinatario, apertura in self._apertura.items():
+            # Un lote vencido que espera ficha no se revisa antes de que la haya
+            cubo = self._cubos.get(destinatario)
+            disponible = cubo.disponible(self.por_segundo) if cubo is not None else ahora
+            plazos.append(max(apertura + self.ventana, disponible))
+        if self._reintentos:
+            plazos.append(self._reintentos[0][0])
+        if not plazos:
+            return SONDEO_COLA
+        return min(SONDEO_COLA, max(0.01, min(plazos) - ahora))
+
+    def _ficha(self, destinatario, ahora):
+        cubo = self._cubos.get(destinatario)
+        if cubo is None:
+            cubo = self._cubos[destinatario] = CuboFichas(self.rafaga, ahora)
+        return cubo.tomar(ahora, self.por_segundo, self.rafaga)
+
+    def despachar(self):
+        # Un pase: reintentos vencidos y lotes cuya ventana ya cerró. Devuelve mensajes enviados
+        ahora = self._reloj()
+        enviados = 0
+        aplazados = []
+        while self._reintentos and self._reintentos[0][0] <= ahora:
+            reintento = heapq.heappop(self._reintentos)
+            _, _, destinatario, mensaje, cantidad, intento = reintento
+            if not self._ficha(destinatario, ahora):
+                aplazados.append(reintento)
+                continue
+            enviados += self._enviar(destinatario, mensaje, cantidad, intento)
+        for _, _, destinatario, mensaje, cantidad, intento in aplazados:
+            self._programar(self._cubos[destinatario].disponible(self.por_segundo), destinatario, mensaje,
+                            cantidad, intento)
+
+        for destinatario in [d for d, apertura in self._apertura.items() if ahora - apertura >= self.ventana]:
+            # Sin ficha el lote queda abierto y sigue sumando alertas
+            if not self._ficha(destinatario, ahora):
+                continue
+            alertas = self._pendientes.pop(destinatario)
+            del self._apertura[destinatario]
+            enviados += self._enviar(destinatario, componer_mensaje(alertas), len(alertas), 0)
+        return enviados
+
+    def _programar(self, cuando, destinatario, mensaje, cantidad, intento):
+        self._orden += 1
+        heapq.heappush(self._reintentos, (cuando, self._orden, destinatario, mensaje, cantidad, intento))
+
+    def _contar(self, estadistica, cantidad=1):
+        with self._candado_estadisticas:
+            self.estadisticas[estadistica] += cantidad
+
+    def _enviar(self, destinatario, mensaje, cantidad, intento):
+        with metricas.medir("alertas.envio"):
+            try:
+                exito, _ = self.transporte.enviar(destinatario, mensaje)
+            except Exception:
+                exito = False
+        if exito:
+            self._contar('mensajes')
+            self._contar('alertas_enviadas', cantidad)
+            return 1
+        if intento < self.reintentos:
+            self._contar('reintentos')
+            espera = self.espera_base * 2 ** intento * (1 + 0.5 * self._azar.random())
+            self._programar(self._reloj() + espera, destinatario, mensaje, cantidad, intento + 1)
+        else:
+            self._contar('fallidos')
+        return 0
+
+
+class ServidorAlertasFalso:
+    # Pasarela HTTP local para pruebas: guarda lo recibido y puede responder
+    # con errores o tardar, para ejercitar reintentos y el límite por destinatario
+    def __init__(self, latencia=0.0):
+        self.recibidos = []
+        self.latencia = latencia
+        self._fallos = 0
+        self._estado_fallo = 503
+        self._candado = threading.Lock()
+        falso = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_POST(self):
+                cuerpo = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if falso.latencia:
+                    time.sleep(falso.latencia)
+                with falso._candado:
+                    fallar = falso._fallos > 0
+                    if fallar:
+                        falso._fallos -= 1
+                    else:
+                        falso.recibidos.append(dict(json.loads(cuerpo), fecha=time.time()))
+                self.send_response(falso._estado_fallo if fallar else 200)
+                self.end_headers()
+
+            def log_message(self, *argumentos):
+                pass
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        threading.Thread(target=self._servidor.serve_forever, name="alertas-falso", daemon=True).start()
+
+    @property
+    def url(self):
+        anfitrion, puerto = self._servidor.server_address
+        return f"http://{anfitrion}:{puerto}/mensajes"
+
+    def fallar_siguientes(self, cantidad, estado=503):
+        with self._candado:
+            self._fallos = cantidad
+            self._estado_fallo = estado
+
+    def cerrar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
@@ -0,0 +1,480 @@
+import copy
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from datetime import datetime
+
+from eventos import (DIARIO_SIMULADOR, ESTADO_FINALIZADA, ESTADO_INICIADA, ESTADO_PAUSADA, EVENTO_CAIDA,
+                     EVENTO_ESTADO, EVENTO_ESTUDIANTE, EVENTO_MOVIMIENTO, EVENTO_REINICIO, EVENTO_RIESGO,
+                     DiariosEventos)
+from historial import CAPACIDAD_HISTORIAL, HistorialMovimientos
+from modelos import ID_ZONA, Epp, EstadoAlerta, Sala
+from riesgos import CATALOGO_RIESGOS, acumular_riesgos, cache_evaluaciones, evaluar_riesgos_memorizados
+from seguimiento import SeguimientoAlertas, plazo_escalamiento
+
+# =============================================
+# ALMACÉN COMPARTIDO DE SALAS Y ESTUDIANTES
+# =============================================
+# Una sola instancia por proceso del servidor (ver obtener_almacen en app.py):
+# todas las sesiones del navegador leen y escriben las mismas salas, de modo
+# que un estudiante puede unirse a la sala que un monitor creó en otra pestaña.
+#
+# Concurrencia: cada sala tiene su propio candado (no hay un candado global
+# para las mutaciones) y un contador 'version' tipo seqlock: es impar mientras
+# una escritura está en curso y par cuando la sala está estable. Los lectores
+# copian la sala sin bloquear y reintentan si la versión cambió. El candado no
+# es reentrante: anidar modificar_sala sobre la misma sala rompería la paridad.
+#
+# Persistencia opcional (ver persistencia.py) y diario de eventos opcional
+# (ver eventos.py): las escrituras a disco ocurren después de soltar el
+# candado de la sala, y las lecturas nunca los consultan.
+#
+# Alertas: cada riesgo activo de un estudiante tiene un estado (ver
+# seguimiento.py) y solo sus transiciones se publican. Con un despacho de
+# alertas (ver alertas.py), las caídas y las alertas abiertas o escaladas se
+# encolan para el WhatsApp del monitor sin esperar el envío.
+#
+# Agregados: los totales que muestran Inicio y Salas Activas se mantienen al
+# mutar (globales en 'contadores', por sala en Sala.con_riesgo/sin_arnes) y se
+# leen en O(1). verificar_contadores() los recalcula desde cero para compararlos.
+
+INTENTOS_LECTURA_OPTIMISTA = 3
+
+# Campos que alteran la evaluación de riesgos de un estudiante
+CAMPOS_CON_RIESGO = ('ubicacion_actual', 'epp', 'herramientas', 'tipo_personaje',
+                     'condiciones_salud', 'peso', 'altura')
+
+# Espacio de códigos SIM-1000 ... SIM-9999
+CODIGO_MINIMO = 1000
+CODIGO_MAXIMO = 9999
+
+
+class AsignadorCodigos:
+    # Códigos libres en una lista + posición de cada uno: sacar un código al
+    # azar y devolver uno liberado son O(1) (intercambio con el último).
+    def __init__(self, minimo=CODIGO_MINIMO, maximo=CODIGO_MAXIMO, semilla=None):
+        self._libres = list(range(minimo, maximo + 1))
+        self._posiciones = {numero: i for i, numero in enumerate(self._libres)}
+        self._azar = random.Random(semilla)
+
+    def disponibles(self):
+        return len(self._libres)
+
+    def reservar(self, codigo):
+        # Saca un código concreto (al hidratar salas ya existentes)
+        numero = int(codigo.split("-")[1])
+        i = self._posiciones.pop(numero, None)
+        if i is None:
+            return False
+        ultimo = self._libres.pop()
+        if ultimo != numero:
+            self._libres[i] = ultimo
+            self._posiciones[ultimo] = i
+        return True
+
+    def asignar(self):
+        if not self._libres:
+            return None
+        i = self._azar.randrange(len(self._libres))
+        numero = self._libres[i]
+        ultimo = self._libres.pop()
+        if i < len(self._libres):
+            self._libres[i] = ultimo
+            self._posiciones[ultimo] = i
+        del self._posiciones[numero]
+        return f"SIM-{numero}"
+
+    def liberar(self, codigo):
+        numero = int(codigo.split("-")[1])
+        if numero not in self._posiciones:
+            self._posiciones[numero] = len(self._libres)
+            self._libres.append(numero)
+
+
+@dataclass(slots=True)
+class Contadores:
+    salas: int = 0
+    salas_activas: int = 0
+    simulaciones_activas: int = 0
+    estudiantes: int = 0
+    estudiantes_en_salas_activas: int = 0
+
+
+def sin_arnes(estudiante):
+    return Epp.ARNES not in estudiante.epp
+
+
+def marcar_modificado(estudiante):
+    # Marca de cambio para la reevaluación incremental de riesgos
+    estudiante.revision += 1
+
+
+def prefijo_alerta(transicion):
+    if transicion.hacia is EstadoAlerta.ESCALADA:
+        return "🚨 Sin atender"
+    if transicion.hacia is EstadoAlerta.ABIERTA and plazo_escalamiento(transicion.codigo) is not None:
+        return "⚠️ Nuevo riesgo"
+    return None
+
+
+class AlmacenSimulacion:
+    def __init__(self, directorio_historial=None, persistencia=None, directorio_eventos=None, alertas=None):
+        self.monitores = {}
+        self.salas = {}
+        self.estudiantes = {}
+        # El movimiento automático es del servidor, no de cada sesión
+        self.movimiento_automatico = True
+        # Si se indica, el historial que no cabe en memoria se vuelca aquí
+        self.directorio_historial = directorio_historial
+        self.persistencia = persistencia
+        self.diarios = DiariosEventos(directorio_eventos) if directorio_eventos is not None else None
+        self.alertas = alertas
+        self.seguimiento = SeguimientoAlertas()
+        self._candados = {}
+        # Índice código -> sala_id de las salas activas (búsqueda O(1))
+        self._salas_por_codigo = {}
+        self._codigos = AsignadorCodigos()
+        # Solo protege el registro de salas y códigos (y los contadores globales), nunca su contenido
+        self._candado_registro = threading.Lock()
+        self.contadores = Contadores()
+
+    def crear_sala(self, **datos):
+        with self._candado_registro:
+            codigo = self._codigos.asignar()
+        if codigo is None:
+            return None
+        sala_id = str(uuid.uuid4())[:8]
+        # Semilla del movimiento simulado: la sesión es reproducible
+        datos.setdefault('semilla', random.getrandbits(32))
+        if 'riesgos_activados' in datos:
+            datos['riesgos_activados'] = tuple(datos['riesgos_activados'])
+        sala = Sala(
+            sala_id=sala_id,
+            codigo=codigo,
+            fecha_creacion=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            historial=self._nuevo_historial(sala_id),
+            **datos,
+        )
+        self._agregar_sala(sala)
+        self._persistir('guardar_sala', sala)
+        return sala
+
+    def _nuevo_historial(self, sala_id):
+        ruta_volcado = None
+        if self.directorio_historial is not None:
+            ruta_volcado = os.path.join(self.directorio_historial, f"{sala_id}.movimientos")
+        return HistorialMovimientos(ruta_volcado=ruta_volcado)
+
+    def _agregar_sala(self, sala):
+        with self._candado_registro:
+            self._candados[sala.sala_id] = threading.Lock()
+            self.salas[sala.sala_id] = sala
+            self._salas_por_codigo[sala.codigo] = sala.sala_id
+            self.contadores.salas += 1
+            self.contadores.estudiantes += len(sala.estudiantes)
+        self._cambio_estado(sala, (False, False), (sala.activa, sala.simulacion_iniciada))
+
+    def _cambio_estado(self, sala, antes, despues):
+        # antes/despues: (activa, simulacion_iniciada)
+        if antes == despues:
+            return
+        with self._candado_registro:
+            self.contadores.salas_activas += despues[0] - antes[0]
+            self.contadores.simulaciones_activas += despues[1] - antes[1]
+            self.contadores.estudiantes_en_salas_activas += (despues[0] - antes[0]) * len(sala.estudiantes)
+
+    def _alertar(self, sala, texto, urgente=False):
+        if self.alertas is not None and sala.telefono_monitor:
+            self.alertas.notificar(sala.telefono_monitor, f"[{sala.codigo}] {texto}", sala.sala_id, urgente)
+
+    def _publicar(self, sala, transiciones):
+        # Al WhatsApp solo van las aperturas de riesgos que escalan y las escaladas
+        for transicion in transiciones:
+            prefijo = prefijo_alerta(transicion)
+            if prefijo is None:
+                continue
+            estudiante = self.estudiantes.get(transicion.est_id)
+            nombre = estudiante.nombre if estudiante is not None else transicion.est_id
+            self._alertar(sala, f"{prefijo}: {nombre} - {CATALOGO_RIESGOS[transicion.codigo]}")
+
+    def _publicar_resumen(self, sala, transiciones):
+        # Registro en lote (nómina importada): un solo mensaje en vez de uno por estudiante y riesgo
+        anunciables = [transicion for transicion in transiciones if prefijo_alerta(transicion) is not None]
+        if anunciables:
+            estudiantes = len({transicion.est_id for transicion in anunciables})
+            self._alertar(sala, f"⚠️ Nómina registrada: {len(anunciables)} riesgos nuevos "
+                                f"en {estudiantes} estudiantes")
+
+    def revisar_alertas(self, ahora):
+        transiciones = self.seguimiento.revisar(ahora)
+        for transicion in transiciones:
+            sala = self.salas.get(transicion.sala_id)
+            if sala is not None:
+                self._publicar(sala, [transicion])
+        return transiciones
+
+    def reconocer_alertas(self, sala_id, claves):
+        return self.seguimiento.reconocer(sala_id, claves, time.time())
+
+    def _persistir(self, operacion, *argumentos):
+        if self.persistencia is not None:
+            getattr(self.persistencia, operacion)(*argumentos)
+
+    def _registrar_eventos(self, sala_id, eventos):
+        # eventos: [(tipo, fecha, campos)]
+        if self.diarios is not None and eventos:
+            self.diarios.diario(sala_id).agregar_lote(eventos)
+
+    def registrar_caida(self, sala_id=DIARIO_SIMULADOR, indice=-1, fecha=None, simulada=False):
+        # Las caídas sintéticas cuentan y quedan en el diario, pero nunca salen por WhatsApp
+        fecha = time.time() if fecha is None else fecha
+        if sala_id in self.salas:
+            nombre = "trabajador sin identificar"
+            with self.modificar_sala(sala_id) as sala:
+                sala.caidas_detectadas += 1
+                if 0 <= indice < len(sala.estudiantes):
+                    estudiante = self.estudiantes.get(sala.estudiantes[indice])
+                    if estudiante is not None:
+                        estudiante.caidas += 1
+                        nombre = estudiante.nombre
+            if not simulada:
+                self._alertar(sala, f"🔴 Caída detectada: {nombre} ({datetime.fromtimestamp(fecha):%H:%M:%S})",
+                              urgente=True)
+        self._registrar_eventos(sala_id, [(EVENTO_CAIDA, fecha, (indice,))])
+
+    def hidratar(self):
+        # Recupera las salas activas guardadas: una consulta por tabla y sala,
+        # sin reevaluar riesgos (las máscaras ya vienen guardadas)
+        if self.persistencia is None:
+            return 0
+        salas = self.persistencia.cargar_salas_activas(CAPACIDAD_HISTORIAL)
+        for sala, estudiantes, movimientos, conteos in salas:
+            with self._candado_registro:
+                if not self._codigos.reservar(sala.codigo):
+                    continue
+            sala.historial = self._nuevo_historial(sala.sala_id)
+            sala.historial.cargar(movimientos, conteos)
+            for estudiante in estudiantes:
+                self.estudiantes[estudiante.id] = estudiante
+                sala.estudiantes.append(estudiante.id)
+                sala.con_riesgo += bool(estudiante.riesgos_detectados)
+                sala.sin_arnes += sin_arnes(estudiante)
+            self._agregar_sala(sala)
+        return len(salas)
+
+    def buscar_sala_por_codigo(self, codigo):
+        sala_id = self._salas_por_codigo.get(codigo)
+        if sala_id is None:
+            return None
+        return self.salas.get(sala_id)
+
+    def finalizar_sala(self, sala_id):
+        with self.modificar_sala(sala_id) as sala:
+            if not sala.activa:
+                return
+            antes = (sala.activa, sala.simulacion_iniciada)
+            sala.activa = False
+            sala.simulacion_iniciada = False
+            self._cambio_estado(sala, antes, (False, False))
+        # El código queda libre para una sala nueva
+        with self._candado_registro:
+            if self._salas_por_codigo.get(sala.codigo) == sala_id:
+                del self._salas_por_codigo[sala.codigo]
+                self._codigos.liberar(sala.codigo)
+        self.seguimiento.olvidar_sala(sala_id)
+        cache_evaluaciones.olvidar(sala.estudiantes)
+        self._persistir('guardar_sala', sala)
+        self._registrar_eventos(sala_id, [(EVENTO_ESTADO, time.time(), (ESTADO_FINALIZADA,))])
+        if self.diarios is not None:
+            self.diarios.cerrar(sala_id)
+
+    def candado_sala(self, sala_id):
+        return self._candados[sala_id]
+
+    @contextmanager
+    def modificar_sala(self, sala_id):
+        sala = self.salas[sala_id]
+        with self._candados[sala_id]:
+            sala.version += 1
+            try:
+                yield sala
+            finally:
+                sala.version += 1
+
+    def instantanea_sala(self, sala_id):
+        sala = self.salas[sala_id]
+        for _ in range(INTENTOS_LECTURA_OPTIMISTA):
+            version = sala.version
+            if version % 2 == 0:
+                copia = self._copiar_sala(sala)
+                if sala.version == version:
+                    return copia
+        # Demasiada contención: leer bajo el candado de la sala
+        with self._candados[sala_id]:
+            return self._copiar_sala(sala)
+
+    def _copiar_sala(self, sala):
+        # Tuplas de enums y máscaras de riesgo son inmutables; solo listas y dicts se copian
+        copia_sala = copy.copy(sala)
+        copia_sala.estudiantes = list(sala.estudiantes)
+        copia_estudiantes = []
+        for est_id in copia_sala.estudiantes:
+            estudiante = self.estudiantes.get(est_id)
+            if estudiante is not None:
+                copia = copy.copy(estudiante)
+                copia.riesgos_desde = dict(estudiante.riesgos_desde)
+                copia_estudiantes.append(copia)
+        return copia_sala, copia_estudiantes
+
+    def registrar_estudiante(self, sala_id, estudiante):
+        return self.registrar_estudiantes(sala_id, [estudiante]) == 1
+
+    def registrar_estudiantes(self, sala_id, estudiantes):
+        # Varios estudiantes en una sola operación (una escritura y un lote de eventos);
+        # entran en orden hasta llenar el cupo. Devuelve cuántos se registraron
+        with self.modificar_sala(sala_id) as sala:
+            nuevos = estudiantes[:max(0, sala.max_estudiantes - len(sala.estudiantes))]
+            for estudiante in nuevos:
+                # Posición del estudiante en la sala: su índice en el historial
+                estudiante.indice = len(sala.estudiantes)
+                self.estudiantes[estudiante.id] = estudiante
+                sala.estudiantes.append(estudiante.id)
+                sala.con_riesgo += bool(estudiante.riesgos_detectados)
+                sala.sin_arnes += sin_arnes(estudiante)
+            with self._candado_registro:
+                self.contadores.estudiantes += len(nuevos)
+                self.contadores.estudiantes_en_salas_activas += sala.activa * len(nuevos)
+        if not nuevos:
+            return 0
+        self._persistir('guardar_estudiantes', nuevos)
+        fecha = time.time()
+        transiciones = []
+        for estudiante in nuevos:
+            transiciones.extend(self.seguimiento.observar(sala_id, estudiante.id, estudiante.riesgos_detectados,
+                                                          fecha))
+        if len(nuevos) == 1:
+            self._publicar(sala, transiciones)
+        else:
+            self._publicar_resumen(sala, transiciones)
+        self._registrar_eventos(sala_id, [(EVENTO_ESTUDIANTE, fecha, (
+            estudiante.indice, ID_ZONA[estudiante.ubicacion_actual], estudiante.riesgos_detectados))
+            for estudiante in nuevos])
+        return len(nuevos)
+
+    def actualizar_sala(self, sala_id, **cambios):
+        with self.modificar_sala(sala_id) as sala:
+            antes = (sala.activa, sala.simulacion_iniciada)
+            for campo, valor in cambios.items():
+                setattr(sala, campo, valor)
+            self._cambio_estado(sala, antes, (sala.activa, sala.simulacion_iniciada))
+        self._persistir('guardar_sala', sala)
+        if 'simulacion_iniciada' in cambios:
+            estado = ESTADO_INICIADA if cambios['simulacion_iniciada'] else ESTADO_PAUSADA
+            self._registrar_eventos(sala_id, [(EVENTO_ESTADO, time.time(), (estado,))])
+
+    def reiniciar_movimientos(self, sala_id, zona_inicial):
+        with self.modificar_sala(sala_id) as sala:
+            reiniciados = []
+            for est_id in sala.estudiantes:
+                estudiante = self.estudiantes.get(est_id)
+                if estudiante is not None:
+                    estudiante.ubicacion_actual = zona_inicial
+                    estudiante.riesgos_detectados = 0
+                    estudiante.riesgos_desde = {}
+                    marcar_modificado(estudiante)
+                    reiniciados.append(estudiante)
+            sala.con_riesgo = 0
+        self.seguimiento.resolver_sala(sala_id, time.time())
+        self._persistir('borrar_riesgos_sala', sala_id)
+        self._persistir('guardar_estado', reiniciados)
+        self._registrar_eventos(sala_id, [(EVENTO_REINICIO, time.time(), (ID_ZONA[zona_inicial],))])
+
+    def mover_estudiante(self, sala_id, est_id, nueva_zona, ahora):
+        # Movimiento manual del monitor: mismo camino que un tick de un solo
+        # estudiante (historial, riesgos, alertas, disco y diario)
+        fecha = ahora.timestamp()
+        with self.modificar_sala(sala_id) as sala:
+            estudiante = self.estudiantes[est_id]
+            desde = estudiante.ubicacion_actual
+            estudiante.ubicacion_actual = nueva_zona
+            estudiante.ultimo_movimiento = ahora.strftime("%H:%M:%S")
+            marcar_modificado(estudiante)
+            if sala.historial is not None:
+                sala.historial.registrar([estudiante.indice], [ID_ZONA[desde]], [ID_ZONA[nueva_zona]], fecha)
+            evaluacion = evaluar_riesgos_memorizados(estudiante, nueva_zona)
+            nuevos = self.acumular_riesgos_estudiante(sala, estudiante, evaluacion.mascara, fecha)
+        self.persistir_tick(sala, [(est_id, desde, nueva_zona, nuevos)], ahora)
+
+    def acumular_riesgos_estudiante(self, sala, estudiante, mascara_, fecha):
+        # Con el candado de la sala tomado (tick de movimiento y mover_estudiante)
+        tenia_riesgos = estudiante.riesgos_detectados != 0
+        nuevos = acumular_riesgos(estudiante, mascara_, fecha)
+        if nuevos and not tenia_riesgos:
+            sala.con_riesgo += 1
+        self._publicar(sala, self.seguimiento.observar(sala.sala_id, estudiante.id, mascara_, fecha))
+        return nuevos
+
+    def persistir_tick(self, sala, cambios, ahora):
+        # Un tick del motor = una transacción y un solo bloque en el diario
+        if not cambios:
+            return
+        fecha = ahora.timestamp()
+        self._persistir('guardar_tick', sala, self.estudiantes, cambios, fecha)
+        if self.diarios is not None:
+            eventos = []
+            for est_id, desde, hacia, nuevos in cambios:
+                indice = self.estudiantes[est_id].indice
+                eventos.append((EVENTO_MOVIMIENTO, fecha, (indice, ID_ZONA[desde], ID_ZONA[hacia])))
+                if nuevos:
+                    eventos.append((EVENTO_RIESGO, fecha, (indice, nuevos)))
+            self._registrar_eventos(sala.sala_id, eventos)
+
+    def actualizar_estudiante(self, sala_id, est_id, **cambios):
+        with self.modificar_sala(sala_id) as sala:
+            estudiante = self.estudiantes[est_id]
+            antes = (bool(estudiante.riesgos_detectados), sin_arnes(estudiante))
+            for campo, valor in cambios.items():
+                setattr(estudiante, campo, valor)
+            # Vuelve a validar enums y recalcula el IMC
+            estudiante.normalizar()
+            if any(campo in CAMPOS_CON_RIESGO for campo in cambios):
+                marcar_modificado(estudiante)
+            sala.con_riesgo += bool(estudiante.riesgos_detectados) - antes[0]
+            sala.sin_arnes += sin_arnes(estudiante) - antes[1]
+        self._persistir('guardar_estudiantes', [estudiante])
+
+    def estudiantes_de_sala(self, sala):
+        return [self.estudiantes[est_id] for est_id in sala.estudiantes if est_id in self.estudiantes]
+
+    def salas_activas(self):
+        return [sala for sala in list(self.salas.values()) if sala.activa]
+
+    def verificar_contadores(self):
+        # Recalcula los agregados recorriendo todo; devuelve {nombre: (mantenido, real)}
+        # solo con los que no coinciden (vacío si están al día)
+        salas = list(self.salas.values())
+        reales = Contadores(
+            salas=len(salas),
+            salas_activas=sum(1 for sala in salas if sala.activa),
+            simulaciones_activas=sum(1 for sala in salas if sala.simulacion_iniciada),
+            estudiantes=len(self.estudiantes),
+            estudiantes_en_salas_activas=sum(len(sala.estudiantes) for sala in salas if sala.activa),
+        )
+        diferencias = {}
+        for campo in fields(Contadores):
+            mantenido, real = getattr(self.contadores, campo.name), getattr(reales, campo.name)
+            if mantenido != real:
+                diferencias[campo.name] = (mantenido, real)
+        for sala in salas:
+            estudiantes = self.estudiantes_de_sala(sala)
+            con_riesgo = sum(1 for estudiante in estudiantes if estudiante.riesgos_detectados)
+            sin_arnes_real = sum(1 for estudiante in estudiantes if sin_arnes(estudiante))
+            if sala.con_riesgo != con_riesgo:
+                diferencias[f"{sala.sala_id}.con_riesgo"] = (sala.con_riesgo, con_riesgo)
+            if sala.sin_arnes != sin_arnes_real:
+                diferencias[f"{sala.sala_id}.sin_arnes"] = (sala.sin_arnes, sin_arnes_real)
+        return diferencias
@@ -0,0 +1,156 @@
+import time
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# =============================================
+# DETECCIÓN DE CAÍDAS SOBRE EL ACELERÓMETRO
+# =============================================
+# Patrón buscado en la magnitud |a| de cada arnés:
+#   1. caída libre: |a| < UMBRAL_CAIDA_LIBRE durante DURACION_CAIDA_LIBRE
+#   2. impacto: pico > UMBRAL_IMPACTO en los VENTANA_IMPACTO siguientes
+#   3. quietud: desviación estándar < UMBRAL_QUIETUD en los VENTANA_QUIETUD siguientes
+# Todo se evalúa con ventanas deslizantes vectorizadas sobre una matriz
+# (trabajadores x muestras): un lote procesa a todos los arneses de una sala.
+# Entre lotes se conserva la cola de muestras que todavía no completa una
+# ventana, así que una caída partida entre dos lotes también se detecta.
+
+GRAVEDAD = 9.81
+FRECUENCIA_ACELEROMETRO = 100
+UMBRAL_CAIDA_LIBRE = 0.5 * GRAVEDAD
+UMBRAL_IMPACTO = 2.5 * GRAVEDAD
+UMBRAL_QUIETUD = 1.0
+DURACION_CAIDA_LIBRE = 0.2
+VENTANA_IMPACTO = 0.3
+VENTANA_QUIETUD = 1.0
+# Una misma caída no se cuenta dos veces dentro de este margen
+REFRACTARIO = 3.0
+LATENCIAS_REGISTRADAS = 1000
+
+# Caídas simuladas en las salas: probabilidad por estudiante y por segundo
+PROBABILIDAD_CAIDA = 0.0002
+# Si el motor se atrasa, no se generan más de estos segundos por lote
+MAXIMO_SEGUNDOS_LOTE = 2.0
+
+
+def suma_movil(datos, n):
+    # Suma de cada ventana de n muestras a lo largo del eje 1 (vía cumsum)
+    acumulada = np.cumsum(datos, axis=1, dtype=np.float64)
+    acumulada = np.concatenate([np.zeros((datos.shape[0], 1)), acumulada], axis=1)
+    return acumulada[:, n:] - acumulada[:, :-n]
+
+
+class DetectorCaidas:
+    def __init__(self, frecuencia=FRECUENCIA_ACELEROMETRO):
+        self.frecuencia = frecuencia
+        self.muestras_libre = max(1, int(round(DURACION_CAIDA_LIBRE * frecuencia)))
+        self.muestras_impacto = max(1, int(round(VENTANA_IMPACTO * frecuencia)))
+        self.muestras_quietud = max(2, int(round(VENTANA_QUIETUD * frecuencia)))
+        self.largo = self.muestras_libre + self.muestras_impacto + self.muestras_quietud
+        self._cola = np.zeros((0, 0))
+        self._cola_t = np.zeros(0)
+        self._ultima = np.zeros(0)
+        # Segundos entre el impacto y el momento en que se confirmó la caída
+        self.latencias = deque(maxlen=LATENCIAS_REGISTRADAS)
+        self.detectadas = 0
+
+    def _ajustar_trabajadores(self, n):
+        faltan = n - self._cola.shape[0]
+        if faltan > 0:
+            relleno = np.full((faltan, self._cola.shape[1]), GRAVEDAD)
+            self._cola = np.concatenate([self._cola, relleno], axis=0)
+            self._ultima = np.concatenate([self._ultima, np.full(faltan, -np.inf)])
+
+    def procesar(self, tiempos, magnitudes, ahora=None):
+        # tiempos: (n,) compartidos; magnitudes: (trabajadores, n).
+        # Devuelve [(trabajador, fecha de inicio de la caída, fecha del impacto)]
+        magnitudes = np.atleast_2d(np.asarray(magnitudes, dtype=np.float64))
+        self._ajustar_trabajadores(magnitudes.shape[0])
+        if self._cola.shape[0] > magnitudes.shape[0]:
+            faltan = self._cola.shape[0] - magnitudes.shape[0]
+            magnitudes = np.concatenate([magnitudes, np.full((faltan, magnitudes.shape[1]), GRAVEDAD)])
+        datos = np.concatenate([self._cola, magnitudes], axis=1)
+        fechas = np.concatenate([self._cola_t, tiempos])
+        posiciones = datos.shape[1] - self.largo + 1
+        if posiciones <= 0:
+            self._cola, self._cola_t = datos, fechas
+            return []
+
+        m, k, q = self.muestras_libre, self.muestras_impacto, self.muestras_quietud
+        libre = suma_movil(datos < UMBRAL_CAIDA_LIBRE, m)[:, :posiciones] == m
+        picos = sliding_window_view(datos, k, axis=1).max(axis=-1)
+        impacto = picos[:, m:m + posiciones] > UMBRAL_IMPACTO
+        media = suma_movil(datos, q) / q
+        varianza = suma_movil(datos ** 2, q) / q - media ** 2
+        quieto = varianza[:, m + k:m + k + posiciones] < UMBRAL_QUIETUD ** 2
+
+        ahora = time.time() if ahora is None else ahora
+        caidas = []
+        for trabajador, inicio in zip(*np.nonzero(libre & impacto & quieto)):
+            fecha = fechas[inicio]
+            if fecha < self._ultima[trabajador] + REFRACTARIO:
+                continue
+            self._ultima[trabajador] = fecha
+            pico = inicio + m + int(np.argmax(datos[trabajador, inicio + m:inicio + m + k]))
+            self.latencias.append(ahora - fechas[pico])
+            caidas.append((int(trabajador), float(fecha), float(fechas[pico])))
+        self.detectadas += len(caidas)
+
+        # Lo que no alcanzó a formar una ventana completa pasa al próximo lote
+        self._cola, self._cola_t = datos[:, posiciones:], fechas[posiciones:]
+        return caidas
+
+
+def patron_caida(generador, frecuencia):
+    # Magnitudes de una caída: ~0.4 s casi sin aceleración y un impacto de ~4 g
+    libre = np.abs(generador.normal(0.5, 0.2, int(0.4 * frecuencia)))
+    impacto = np.full(max(1, int(0.05 * frecuencia)), 4 * GRAVEDAD)
+    return np.concatenate([libre, impacto])
+
+
+def simular_magnitudes(generador, n_trabajadores, n, frecuencia, probabilidad=PROBABILIDAD_CAIDA):
+    # Acelerómetros de toda una sala en un solo sorteo: ruido en los tres ejes
+    # más la gravedad, y caídas al azar con 'probabilidad' por segundo
+    ejes = generador.normal(0, 0.3, (n_trabajadores, n, 3))
+    ejes[..., 2] += GRAVEDAD
+    magnitudes = np.sqrt(np.einsum('wnc,wnc->wn', ejes, ejes))
+    patron = patron_caida(generador, frecuencia)
+    if n >= len(patron):
+        caen = np.flatnonzero(generador.random(n_trabajadores) < probabilidad * n / frecuencia)
+        for trabajador in caen:
+            inicio = generador.integers(0, n - len(patron) + 1)
+            magnitudes[trabajador, inicio:inicio + len(patron)] = patron
+    return magnitudes
+
+
+class SensoresSala:
+    # Acelerómetros simulados de una sala + su detector
+    def __init__(self, semilla=None, frecuencia=FRECUENCIA_ACELEROMETRO):
+        self.frecuencia = frecuencia
+        self.detector = DetectorCaidas(frecuencia)
+        self._generador = np.random.default_rng(semilla)
+        self._hasta = None
+
+    def avanzar(self, n_trabajadores, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        if self._hasta is None:
+            self._hasta = ahora
+        elif ahora - self._hasta > MAXIMO_SEGUNDOS_LOTE:
+            self._hasta = ahora - MAXIMO_SEGUNDOS_LOTE
+        n = int((ahora - self._hasta) * self.frecuencia)
+        if n == 0 or n_trabajadores == 0:
+            return []
+        tiempos = self._hasta + np.arange(n) / self.frecuencia
+        self._hasta += n / self.frecuencia
+        magnitudes = simular_magnitudes(self._generador, n_trabajadores, n, self.frecuencia)
+        return self.detector.procesar(tiempos, magnitudes, ahora)
+
+
+def resumen_latencias(detectores):
+    latencias = [latencia for detector in detectores for latencia in detector.latencias]
+    if not latencias:
+        return None
+    return {'caidas': sum(detector.detectadas for detector in detectores),
+            'p50': float(np.percentile(latencias, 50)),
+            'p95': float(np.percentile(latencias, 95))}
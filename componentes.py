@@ -0,0 +1,15 @@
+# =============================================
+# COMPONENTES COMPARTIDOS ENTRE PÁGINAS
+# =============================================
+
+
+def obtener_icono_personaje(tipo_personaje):
+    iconos = {
+        "Hombre musculoso": "💪",
+        "Mujer atlética": "🏃‍♀️", 
+        "Persona mayor": "👴",
+        "Persona con sobrepeso": "🧍",
+        "Mujer embarazada": "🤰",
+        "Persona con discapacidad motriz": "♿"
+    }
+    return iconos.get(tipo_personaje, "👤")
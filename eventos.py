@@ -0,0 +1,234 @@
+import io
+import os
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# =============================================
+# DIARIO DE EVENTOS POR SALA (SOLO AGREGAR) + INSTANTÁNEAS
+# =============================================
+# Cada sala escribe sus eventos en un archivo binario al que solo se agrega:
+#   [longitud u32][tipo u8][fecha f64][carga de 'longitud' bytes]
+# Cada cierto número de eventos se guarda una instantánea del estado derivado
+# (zonas, máscaras de riesgo, conteos) junto con la posición del diario en la
+# que se tomó. Reconstruir = cargar la instantánea y reproducir solo la cola.
+# Los análisis posteriores leen el diario registro a registro con leer_eventos.
+#
+# A lo sumo ARCHIVOS_ABIERTOS diarios tienen su archivo abierto a la vez: el
+# usado hace más tiempo se cierra (con instantánea) y se reabre al escribir.
+
+CABECERA = struct.Struct('<IBd')
+
+EVENTO_ESTUDIANTE = 1   # indice, zona, máscara inicial
+EVENTO_MOVIMIENTO = 2   # indice, desde, hacia
+EVENTO_RIESGO = 3       # indice, riesgos nuevos (bits)
+EVENTO_CAIDA = 4        # indice (-1: simulador individual)
+EVENTO_ESTADO = 5       # estado de la sala
+EVENTO_REINICIO = 6     # zona a la que vuelven todos
+
+CARGAS = {
+    EVENTO_ESTUDIANTE: struct.Struct('<ibq'),
+    EVENTO_MOVIMIENTO: struct.Struct('<ibb'),
+    EVENTO_RIESGO: struct.Struct('<iq'),
+    EVENTO_CAIDA: struct.Struct('<i'),
+    EVENTO_ESTADO: struct.Struct('<B'),
+    EVENTO_REINICIO: struct.Struct('<b'),
+}
+
+ESTADO_PAUSADA = 0
+ESTADO_INICIADA = 1
+ESTADO_FINALIZADA = 2
+
+EVENTOS_POR_INSTANTANEA = 5000
+ARCHIVOS_ABIERTOS = 64
+TAMANO_LECTURA = 1 << 16
+
+# El diario del simulador individual (no pertenece a ninguna sala)
+DIARIO_SIMULADOR = "simulador"
+
+
+@dataclass(slots=True)
+class EstadoDiario:
+    zonas: list = field(default_factory=list)
+    mascaras: list = field(default_factory=list)
+    movimientos: list = field(default_factory=list)
+    caidas: int = 0
+    estado: int = ESTADO_PAUSADA
+    eventos: int = 0
+    posicion: int = 0
+
+    def aplicar(self, tipo, campos):
+        if tipo == EVENTO_MOVIMIENTO:
+            indice, _, hacia = campos
+            self._asegurar(indice)
+            self.zonas[indice] = hacia
+            self.movimientos[indice] += 1
+        elif tipo == EVENTO_RIESGO:
+            indice, nuevos = campos
+            self._asegurar(indice)
+            self.mascaras[indice] |= nuevos
+        elif tipo == EVENTO_ESTUDIANTE:
+            indice, zona, mascara_ = campos
+            self._asegurar(indice)
+            self.zonas[indice] = zona
+            self.mascaras[indice] = mascara_
+        elif tipo == EVENTO_CAIDA:
+            self.caidas += 1
+        elif tipo == EVENTO_ESTADO:
+            self.estado = campos[0]
+        elif tipo == EVENTO_REINICIO:
+            self.zonas = [campos[0]] * len(self.zonas)
+            self.mascaras = [0] * len(self.mascaras)
+        self.eventos += 1
+
+    def _asegurar(self, indice):
+        faltan = indice + 1 - len(self.zonas)
+        if faltan > 0:
+            self.zonas.extend([0] * faltan)
+            self.mascaras.extend([0] * faltan)
+            self.movimientos.extend([0] * faltan)
+
+
+def codificar(tipo, fecha, *campos):
+    carga = CARGAS[tipo].pack(*campos)
+    return CABECERA.pack(len(carga), tipo, fecha) + carga
+
+
+def leer_eventos(ruta, desde=0):
+    # Generador (posición final, tipo, fecha, campos) que lee el archivo por
+    # bloques: memoria constante sin importar el tamaño del diario. Un último
+    # registro incompleto (escritura interrumpida) se ignora.
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, 'rb', buffering=TAMANO_LECTURA) as archivo:
+        archivo.seek(desde)
+        posicion = desde
+        while True:
+            cabecera = archivo.read(CABECERA.size)
+            if len(cabecera) < CABECERA.size:
+                return
+            longitud, tipo, fecha = CABECERA.unpack(cabecera)
+            carga = archivo.read(longitud)
+            if len(carga) < longitud:
+                return
+            posicion += CABECERA.size + longitud
+            formato = CARGAS.get(tipo)
+            campos = formato.unpack(carga) if formato is not None and formato.size == longitud else ()
+            yield posicion, tipo, fecha, campos
+
+
+def guardar_instantanea(ruta, estado):
+    # Escritura atómica: archivo temporal + os.replace
+    temporal = ruta + ".tmp"
+    with open(temporal, 'wb') as archivo:
+        np.savez(archivo,
+                 zonas=np.asarray(estado.zonas, dtype=np.int8),
+                 mascaras=np.asarray(estado.mascaras, dtype=np.int64),
+                 movimientos=np.asarray(estado.movimientos, dtype=np.int64),
+                 contadores=np.array([estado.caidas, estado.estado, estado.eventos, estado.posicion],
+                                     dtype=np.int64))
+    os.replace(temporal, ruta)
+
+
+def cargar_instantanea(ruta):
+    if not os.path.exists(ruta):
+        return EstadoDiario()
+    with np.load(ruta) as datos:
+        caidas, estado, eventos, posicion = datos['contadores'].tolist()
+        return EstadoDiario(zonas=datos['zonas'].tolist(), mascaras=datos['mascaras'].tolist(),
+                            movimientos=datos['movimientos'].tolist(), caidas=caidas, estado=estado,
+                            eventos=eventos, posicion=posicion)
+
+
+def reconstruir(ruta_diario, ruta_instantanea):
+    estado = cargar_instantanea(ruta_instantanea)
+    for posicion, tipo, _, campos in leer_eventos(ruta_diario, estado.posicion):
+        estado.aplicar(tipo, campos)
+        estado.posicion = posicion
+    return estado
+
+
+class DiarioSala:
+    def __init__(self, directorio, clave, eventos_por_instantanea=EVENTOS_POR_INSTANTANEA):
+        os.makedirs(directorio, exist_ok=True)
+        self.ruta = os.path.join(directorio, f"{clave}.eventos")
+        self.ruta_instantanea = os.path.join(directorio, f"{clave}.instantanea.npz")
+        self.eventos_por_instantanea = eventos_por_instantanea
+        self._candado = threading.Lock()
+        # El estado derivado se mantiene al día al escribir: la instantánea no relee el diario
+        self.estado = reconstruir(self.ruta, self.ruta_instantanea)
+        self._desde_instantanea = 0
+        self._abrir()
+
+    def _abrir(self):
+        self._archivo = open(self.ruta, 'ab')
+        if self._archivo.tell() != self.estado.posicion:
+            # Quita un registro incompleto al final antes de seguir agregando
+            self._archivo.truncate(self.estado.posicion)
+            self._archivo.seek(self.estado.posicion)
+
+    def abierto(self):
+        return not self._archivo.closed
+
+    def agregar(self, tipo, fecha, *campos):
+        self.agregar_lote([(tipo, fecha, campos)])
+
+    def agregar_lote(self, eventos):
+        if not eventos:
+            return
+        bloque = io.BytesIO()
+        with self._candado:
+            if self._archivo.closed:
+                self._abrir()
+            for tipo, fecha, campos in eventos:
+                bloque.write(codificar(tipo, fecha, *campos))
+                self.estado.aplicar(tipo, campos)
+            # Un solo write + flush por lote (un tick completo de la sala)
+            self._archivo.write(bloque.getvalue())
+            self._archivo.flush()
+            self.estado.posicion = self._archivo.tell()
+            self._desde_instantanea += len(eventos)
+            if self._desde_instantanea >= self.eventos_por_instantanea:
+                guardar_instantanea(self.ruta_instantanea, self.estado)
+                self._desde_instantanea = 0
+
+    def cerrar(self):
+        with self._candado:
+            if not self._archivo.closed:
+                guardar_instantanea(self.ruta_instantanea, self.estado)
+                self._desde_instantanea = 0
+                self._archivo.close()
+
+
+class DiariosEventos:
+    def __init__(self, directorio, eventos_por_instantanea=EVENTOS_POR_INSTANTANEA,
+                 archivos_abiertos=ARCHIVOS_ABIERTOS):
+        self.directorio = directorio
+        self.eventos_por_instantanea = eventos_por_instantanea
+        self.archivos_abiertos = archivos_abiertos
+        self._diarios = {}
+        # clave -> diario con el archivo abierto, del usado hace más tiempo al más reciente
+        self._abiertos = OrderedDict()
+        self._candado = threading.Lock()
+
+    def diario(self, clave):
+        with self._candado:
+            diario = self._diarios.get(clave)
+            if diario is None:
+                diario = self._diarios[clave] = DiarioSala(self.directorio, clave, self.eventos_por_instantanea)
+            self._abiertos[clave] = diario
+            self._abiertos.move_to_end(clave)
+            while len(self._abiertos) > self.archivos_abiertos:
+                _, viejo = self._abiertos.popitem(last=False)
+                viejo.cerrar()
+        return diario
+
+    def cerrar(self, clave):
+        with self._candado:
+            diario = self._diarios.pop(clave, None)
+            self._abiertos.pop(clave, None)
+        if diario is not None:
+            diario.cerrar()
@@ -0,0 +1,204 @@
+import io
+import threading
+from collections import OrderedDict
+
+from matplotlib import font_manager
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from PIL import Image, ImageDraw, ImageFont
+
+# =============================================
+# FIGURAS DEL SIMULADOR INDIVIDUAL
+# =============================================
+# El dibujo de cada escenario (estructura, plataformas, anclajes, título) no
+# cambia entre reruns: se renderiza una vez con matplotlib y se guarda como
+# PNG en un LRU acotado, junto con la transformación datos -> píxeles. En cada
+# render solo se compone encima, con PIL, la capa dinámica: trabajador, línea
+# de vida y ficha con el nombre. Las figuras se crean con Figure() (fuera del
+# registro de pyplot) y se liberan al terminar, así que no se acumulan.
+
+CAPACIDAD_FIGURAS = 16
+DPI_FIGURAS = 100
+LIMITES_X = (0, 5)
+LIMITES_Y = (-1, 6)
+
+# Geometría de la capa dinámica por escenario: posición del trabajador,
+# extremo de su línea de vida, estilo de la línea y dato de la ficha
+ESCENARIOS = {
+    "Andamios": {'trabajador': (2.5, 3.5), 'linea': (2.5, 5.0), 'discontinua': True, 'dato': "Altura: 12 metros"},
+    "Estructura": {'trabajador': (2.0, 3.0), 'linea': (2.0, 4.2), 'discontinua': False, 'dato': "Altura: 15 metros"},
+    "Torre": {'trabajador': (2.0, 3.2), 'linea': (2.5, 4.5), 'discontinua': False, 'dato': "Altura: 45 metros"},
+    "cubierta": {'trabajador': (2.5, 2.0), 'linea': (2.5, 2.8), 'discontinua': True, 'dato': "Inclinación: 30°"},
+}
+
+
+def clave_escenario(escenario):
+    # Misma prioridad que los 'if "Andamios" in escenario' originales
+    for clave in ESCENARIOS:
+        if clave.lower() in escenario.lower():
+            return clave
+    return None
+
+
+def _dibujar_fondo(ax, clave):
+    if clave == "Andamios":
+        for i in range(6):
+            ax.add_patch(Rectangle((i*0.8, 0), 0.6, 5, fill=False, edgecolor='#8B4513', linewidth=3))
+            # Plataformas
+            if i < 5:
+                ax.add_patch(Rectangle((i*0.8 + 0.1, 2), 0.4, 0.1, color='#DEB887'))
+                ax.add_patch(Rectangle((i*0.8 + 0.1, 4), 0.4, 0.1, color='#DEB887'))
+        ax.set_title("🔨 Trabajo en Andamios - Nivel 4", fontsize=16, fontweight='bold', pad=20)
+
+    elif clave == "Estructura":
+        # Base, columnas principales y vigas
+        ax.add_patch(Rectangle((1, 0), 3, 0.3, color='#555555'))
+        ax.add_patch(Rectangle((1.5, 0.3), 0.2, 4, color='#888888'))
+        ax.add_patch(Rectangle((3.3, 0.3), 0.2, 4, color='#888888'))
+        ax.add_patch(Rectangle((1, 2), 3, 0.15, color='#666666'))
+        ax.add_patch(Rectangle((1, 4), 3, 0.15, color='#666666'))
+        # Punto de anclaje
+        ax.plot([2.0], [4.2], 's', markersize=8, color='blue')
+        ax.set_title("🔩 Estructura Metálica - Montaje", fontsize=16, fontweight='bold', pad=20)
+
+    elif clave == "Torre":
+        # Torre principal, plataformas de trabajo y antenas
+        ax.plot([2.5, 2.5], [0, 4.5], color='#333333', linewidth=8)
+        ax.add_patch(Rectangle((1.5, 1.5), 2, 0.1, color='#666666'))
+        ax.add_patch(Rectangle((1.5, 3.0), 2, 0.1, color='#666666'))
+        ax.plot([2.5], [4.7], '^', markersize=15, color='gray')
+        ax.plot([1.8, 3.2], [4.5, 4.5], color='gray', linewidth=3)
+        # Anclaje superior
+        ax.plot([2.5], [4.5], 'o', markersize=10, color='orange')
+        ax.set_title("📡 Torre de Comunicación - Mantenimiento", fontsize=16, fontweight='bold', pad=20)
+
+    elif clave == "cubierta":
+        ax.add_patch(Rectangle((0.5, 1), 4, 2, color='#8B4513', alpha=0.7))
+        ax.add_patch(Rectangle((0.5, 1), 4, 0.1, color='#A0522D'))  # Borde
+        # Línea de vida horizontal
+        ax.plot([1, 4], [2.8, 2.8], 'g-', linewidth=3, alpha=0.7)
+        ax.set_title("🏠 Trabajos en Cubierta Inclinada", fontsize=16, fontweight='bold', pad=20)
+
+    # Configuración común del gráfico
+    ax.set_xlim(*LIMITES_X)
+    ax.set_ylim(*LIMITES_Y)
+    ax.set_aspect('equal')
+    ax.axis('off')
+
+    # Leyenda de seguridad
+    ax.text(0.1, 5.5, '🚨 SISTEMA DE SEGURIDAD ACTIVO',
+            fontsize=12, fontweight='bold', color='red',
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="yellow", alpha=0.7))
+
+
+def renderizar_fondo(clave):
+    # Devuelve (png, transformación) donde la transformación lleva un punto en
+    # coordenadas de datos a píxeles de la imagen: (x*ex + ox, y*ey + oy)
+    figura = Figure(figsize=(12, 8), dpi=DPI_FIGURAS)
+    FigureCanvasAgg(figura)
+    try:
+        ax = figura.add_axes([0.05, 0.02, 0.9, 0.88])
+        _dibujar_fondo(ax, clave)
+        figura.canvas.draw()
+        alto = figura.bbox.height
+        (x0, y0), (x1, y1) = ax.transData.transform([(0, 0), (1, 1)])
+        transformacion = (x1 - x0, x0, -(y1 - y0), alto - y0)
+        buffer = io.BytesIO()
+        figura.savefig(buffer, format='png', dpi=DPI_FIGURAS)
+        return buffer.getvalue(), transformacion
+    finally:
+        figura.clear()
+
+
+class CacheFiguras:
+    # LRU acotado de fondos ya renderizados (mismo esquema que TablaRiesgos)
+    def __init__(self, capacidad=CAPACIDAD_FIGURAS):
+        self.capacidad = capacidad
+        self._fondos = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def fondo(self, clave):
+        with self._candado:
+            fondo = self._fondos.get(clave)
+            if fondo is not None:
+                self._fondos.move_to_end(clave)
+                self.aciertos += 1
+                return fondo
+        fondo = renderizar_fondo(clave)
+        with self._candado:
+            self.fallos += 1
+            self._fondos[clave] = fondo
+            if len(self._fondos) > self.capacidad:
+                self._fondos.popitem(last=False)
+        return fondo
+
+
+cache_figuras = CacheFiguras()
+
+_fuentes = {}
+
+
+def _fuente(tamano):
+    fuente = _fuentes.get(tamano)
+    if fuente is None:
+        ruta = font_manager.findfont(font_manager.FontProperties(family='DejaVu Sans'))
+        fuente = _fuentes[tamano] = ImageFont.truetype(ruta, tamano)
+    return fuente
+
+
+def _linea_discontinua(dibujo, inicio, fin, color, ancho, tramo=10):
+    (xa, ya), (xb, yb) = inicio, fin
+    largo = max(1.0, ((xb - xa) ** 2 + (yb - ya) ** 2) ** 0.5)
+    for i in range(0, int(largo), tramo * 2):
+        fin_tramo = min(i + tramo, largo)
+        dibujo.line([(xa + (xb - xa) * i / largo, ya + (yb - ya) * i / largo),
+                     (xa + (xb - xa) * fin_tramo / largo, ya + (yb - ya) * fin_tramo / largo)],
+                    fill=color, width=ancho)
+
+
+def figura_escenario(escenario, trabajador_nombre, linea_de_vida=True, descenso=0.0):
+    # PNG del escenario con la capa dinámica: 'descenso' (en unidades del
+    # dibujo) baja al trabajador, por ejemplo después de una caída detectada
+    clave = clave_escenario(escenario)
+    png, (ex, ox, ey, oy) = cache_figuras.fondo(clave)
+    geometria = ESCENARIOS.get(clave)
+    if geometria is None:
+        return png
+
+    def pixel(x, y):
+        return x * ex + ox, y * ey + oy
+
+    imagen = Image.open(io.BytesIO(png)).convert('RGB')
+    dibujo = ImageDraw.Draw(imagen)
+    x, y = geometria['trabajador']
+    trabajador = pixel(x, y - descenso)
+
+    # Línea de vida: verde si está equipada, roja punteada si falta
+    extremo = pixel(*geometria['linea'])
+    if linea_de_vida:
+        if geometria['discontinua']:
+            _linea_discontinua(dibujo, trabajador, extremo, (0, 128, 0), 4)
+        else:
+            dibujo.line([trabajador, extremo], fill=(0, 128, 0), width=4)
+    else:
+        _linea_discontinua(dibujo, trabajador, extremo, (200, 0, 0), 3, tramo=4)
+
+    radio = 12
+    dibujo.ellipse([trabajador[0] - radio, trabajador[1] - radio, trabajador[0] + radio, trabajador[1] + radio],
+                   fill=(220, 0, 0), outline=(120, 0, 0), width=2)
+
+    # Ficha con nombre y dato del escenario
+    texto = f"Trabajador: {trabajador_nombre}\n{geometria['dato']}"
+    centro = pixel(2.5, -0.5)
+    caja = dibujo.multiline_textbbox(centro, texto, font=_fuente(14), anchor='mm', align='center')
+    dibujo.rounded_rectangle([caja[0] - 8, caja[1] - 6, caja[2] + 8, caja[3] + 6], radius=8,
+                             fill=(173, 216, 230), outline=(0, 0, 0))
+    dibujo.multiline_text(centro, texto, font=_fuente(14), fill=(0, 0, 0), anchor='mm', align='center')
+
+    # Compresión mínima: la imagen se envía una vez y se descarta
+    salida = io.BytesIO()
+    imagen.save(salida, format='PNG', compress_level=1)
+    return salida.getvalue()
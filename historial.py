@@ -0,0 +1,121 @@
+import os
+import time
+
+import numpy as np
+
+# =============================================
+# HISTORIAL DE MOVIMIENTOS POR SALA (BUFFER CIRCULAR)
+# =============================================
+# Un historial columnar por sala: índice del estudiante dentro de la sala,
+# zona de origen y destino como enteros pequeños y fecha epoch. La capacidad
+# es fija; cuando se llena se descarta el bloque más antiguo (y, si hay ruta
+# de volcado, antes se agrega al archivo en disco con el mismo formato).
+
+CAPACIDAD_HISTORIAL = 10_000
+
+DTYPE_MOVIMIENTO = np.dtype([
+    ('estudiante', np.int32),
+    ('desde', np.int8),
+    ('hacia', np.int8),
+    ('fecha', np.float64),
+])
+
+
+class HistorialMovimientos:
+    def __init__(self, capacidad=CAPACIDAD_HISTORIAL, ruta_volcado=None):
+        self.capacidad = capacidad
+        self.ruta_volcado = ruta_volcado
+        self._datos = np.zeros(capacidad, dtype=DTYPE_MOVIMIENTO)
+        self._inicio = 0
+        self._cantidad = 0
+        # Movimientos desde el inicio de la sala, incluidos los descartados
+        self.total = 0
+        self._conteos = np.zeros(0, dtype=np.int64)
+        self._bloque_descarte = max(1, capacidad // 4)
+
+    def __len__(self):
+        return self._cantidad
+
+    def registrar(self, estudiantes, desde, hacia, fecha=None):
+        fecha = time.time() if fecha is None else fecha
+        estudiantes = np.asarray(estudiantes, dtype=np.int32)
+        n = len(estudiantes)
+        if n == 0:
+            return
+        if n > self.capacidad:
+            # Solo cabe la cola del lote; lo que había en memoria sale primero para
+            # que el volcado quede en orden, y la cabeza del lote va directo detrás
+            self._descartar(self._cantidad)
+            exceso = n - self.capacidad
+            self._descartar_lote(estudiantes[:exceso], desde[:exceso], hacia[:exceso], fecha)
+            self._contar(estudiantes[:exceso])
+            estudiantes, desde, hacia = estudiantes[exceso:], desde[exceso:], hacia[exceso:]
+            n = self.capacidad
+
+        while self._cantidad + n > self.capacidad:
+            self._descartar(min(self._bloque_descarte, self._cantidad))
+
+        posiciones = (self._inicio + self._cantidad + np.arange(n)) % self.capacidad
+        self._datos['estudiante'][posiciones] = estudiantes
+        self._datos['desde'][posiciones] = desde
+        self._datos['hacia'][posiciones] = hacia
+        self._datos['fecha'][posiciones] = fecha
+        self._cantidad += n
+        self._contar(estudiantes)
+
+    def cargar(self, registros, conteos):
+        # Restaura la cola más reciente y los conteos históricos (hidratación)
+        registros = registros[-self.capacidad:]
+        self._datos[:len(registros)] = registros
+        self._inicio = 0
+        self._cantidad = len(registros)
+        self._conteos = np.asarray(conteos, dtype=np.int64)
+        self.total = int(self._conteos.sum())
+
+    def _contar(self, estudiantes):
+        if len(estudiantes) == 0:
+            return
+        maximo = int(estudiantes.max()) + 1
+        if maximo > len(self._conteos):
+            self._conteos = np.concatenate([self._conteos, np.zeros(maximo - len(self._conteos), dtype=np.int64)])
+        np.add.at(self._conteos, estudiantes, 1)
+        self.total += len(estudiantes)
+
+    def _descartar(self, n):
+        posiciones = (self._inicio + np.arange(n)) % self.capacidad
+        if self.ruta_volcado is not None:
+            self._volcar(self._datos[posiciones])
+        self._inicio = (self._inicio + n) % self.capacidad
+        self._cantidad -= n
+
+    def _descartar_lote(self, estudiantes, desde, hacia, fecha):
+        if self.ruta_volcado is None:
+            return
+        lote = np.zeros(len(estudiantes), dtype=DTYPE_MOVIMIENTO)
+        lote['estudiante'] = estudiantes
+        lote['desde'] = desde
+        lote['hacia'] = hacia
+        lote['fecha'] = fecha
+        self._volcar(lote)
+
+    def _volcar(self, registros):
+        directorio = os.path.dirname(self.ruta_volcado)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(self.ruta_volcado, 'ab') as archivo:
+            registros.tofile(archivo)
+
+    def registros(self):
+        # Copia en orden cronológico de lo que sigue en memoria
+        posiciones = (self._inicio + np.arange(self._cantidad)) % self.capacidad
+        return self._datos[posiciones]
+
+    def leer_volcado(self):
+        if self.ruta_volcado is None or not os.path.exists(self.ruta_volcado):
+            return np.zeros(0, dtype=DTYPE_MOVIMIENTO)
+        return np.fromfile(self.ruta_volcado, dtype=DTYPE_MOVIMIENTO)
+
+    def movimientos_de(self, estudiante):
+        if estudiante < len(self._conteos):
+            return int(self._conteos[estudiante])
+        return 0
@@ -0,0 +1,267 @@
+import csv
+import io
+import re
+import time
+import unicodedata
+import uuid
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from modelos import Condicion, Epp, Estudiante, Herramienta, Perfil
+from riesgos import MASCARA_AUTOMATICOS, acumular_riesgos, mascaras_estudiantes
+from simulacion import ZONA_INICIAL
+
+# =============================================
+# IMPORTACIÓN MASIVA DE NÓMINAS (CSV / EXCEL)
+# =============================================
+# Un monitor sube la lista de su clase en vez de que cada estudiante llene
+# el formulario de registro. Las filas se leen una a una (csv o openpyxl en
+# modo solo lectura), se validan con los mismos rangos del formulario y los
+# errores se informan por número de fila sin detener el resto. Los riesgos
+# iniciales de todas las filas válidas se evalúan juntos (ver
+# mascaras_estudiantes en riesgos.py) y el almacén las inserta en una sola operación.
+#
+# Las listas (condiciones, EPP, herramientas) van en una celda separadas por
+# ';', ',' o '|'. Encabezados y valores no distinguen mayúsculas ni tildes.
+
+EXTENSIONES = ("csv", "xlsx")
+# Excel en Windows guarda los CSV en cp1252 si no se elige UTF-8
+CODIFICACIONES = ("utf-8-sig", "cp1252")
+SEPARADOR_LISTAS = re.compile(r"[;,|]")
+RANGOS = {'edad': (18, 65), 'altura': (140, 200), 'peso': (40, 150)}
+EXPERIENCIAS = ["Ninguna", "Menos de 1 año", "1-3 años", "3-5 años", "Más de 5 años"]
+
+# Columna normalizada -> campo del estudiante
+COLUMNAS = {
+    'nombre': 'nombre', 'nombre completo': 'nombre', 'estudiante': 'nombre',
+    'institucion': 'institucion', 'empresa': 'institucion', 'institucion/empresa': 'institucion',
+    'perfil': 'tipo_personaje', 'tipo de personaje': 'tipo_personaje', 'personaje': 'tipo_personaje',
+    'peso': 'peso', 'peso (kg)': 'peso',
+    'altura': 'altura', 'altura (cm)': 'altura',
+    'edad': 'edad',
+    'experiencia': 'experiencia',
+    'telefono': 'telefono', 'whatsapp': 'telefono',
+    'email': 'email', 'correo': 'email',
+    'condiciones': 'condiciones_salud', 'condiciones de salud': 'condiciones_salud',
+    'epp': 'epp',
+    'herramientas': 'herramientas',
+}
+OBLIGATORIAS = ('nombre', 'institucion', 'tipo_personaje', 'peso', 'altura')
+# Campo -> nombre de la columna en los mensajes de error
+ETIQUETAS = {'nombre': "Nombre", 'institucion': "Institución", 'tipo_personaje': "Perfil", 'peso': "Peso",
+             'altura': "Altura", 'edad': "Edad", 'experiencia': "Experiencia",
+             'condiciones_salud': "Condiciones", 'epp': "EPP", 'herramientas': "Herramientas"}
+PLANTILLA = ["Nombre", "Institución", "Perfil", "Peso", "Altura", "Edad", "Experiencia", "Teléfono",
+             "Email", "Condiciones", "EPP", "Herramientas"]
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize("NFKD", str(texto).strip().lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _valores(enumeracion):
+    return {normalizar(valor): valor for valor in enumeracion}
+
+
+VALORES = {
+    'tipo_personaje': _valores(Perfil),
+    'condiciones_salud': _valores(Condicion),
+    'epp': _valores(Epp),
+    'herramientas': _valores(Herramienta),
+    'experiencia': {normalizar(e): e for e in EXPERIENCIAS},
+}
+
+
+class ErrorNomina(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class ErrorFila:
+    fila: int
+    mensaje: str
+
+
+@dataclass(slots=True)
+class ResultadoImportacion:
+    registrados: list = field(default_factory=list)
+    errores: list = field(default_factory=list)
+    filas: int = 0
+    segundos: float = 0.0
+
+
+def plantilla_csv():
+    ejemplo = ["Ana García López", "Universidad Técnica", "Mujer atlética", 62, 165, 24, "1-3 años",
+               "+52 55 1234 5678", "ana.garcia@email.com", "Vértigo", "Casco; Arnés de seguridad", "Taladro"]
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow(PLANTILLA)
+    escritor.writerow(ejemplo)
+    return salida.getvalue()
+
+
+def leer_filas(archivo, nombre):
+    # Generador de (número de fila, {columna normalizada: valor}); la fila 1 es el encabezado
+    extension = nombre.rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        filas = _filas_csv(archivo)
+    elif extension == "xlsx":
+        filas = _filas_excel(archivo)
+    else:
+        raise ErrorNomina(f"Formato no soportado: .{extension} (usa {', '.join(EXTENSIONES)})")
+    encabezado = next(filas, None)
+    if not encabezado or not any(encabezado):
+        raise ErrorNomina("El archivo está vacío")
+    campos = [COLUMNAS.get(normalizar(columna)) if columna is not None else None for columna in encabezado]
+    faltantes = [campo for campo in OBLIGATORIAS if campo not in campos]
+    if faltantes:
+        raise ErrorNomina(f"Faltan columnas obligatorias: {', '.join(ETIQUETAS[campo] for campo in faltantes)}")
+    for numero, valores in enumerate(filas, start=2):
+        fila = {campo: valor for campo, valor in zip(campos, valores)
+                if campo is not None and valor not in (None, "")}
+        if fila:
+            yield numero, fila
+
+
+def _filas_csv(archivo):
+    texto = archivo if isinstance(archivo, io.TextIOBase) else io.StringIO(_decodificar(archivo.read()),
+                                                                          newline="")
+    # Excel en español exporta con ';': se detecta con la primera línea
+    primera = texto.readline()
+    try:
+        dialecto = csv.Sniffer().sniff(primera, delimiters=",;\t")
+    except csv.Error:
+        dialecto = csv.excel
+    try:
+        yield from csv.reader(_encadenar(primera, texto), dialecto)
+    except csv.Error as error:
+        raise ErrorNomina(f"El CSV está dañado: {error}") from None
+
+
+def _decodificar(datos):
+    for codificacion in CODIFICACIONES:
+        try:
+            return datos.decode(codificacion)
+        except UnicodeDecodeError:
+            pass
+    raise ErrorNomina("No se pudo leer el CSV: guárdalo como «CSV UTF-8»")
+
+
+def _encadenar(primera, texto):
+    yield primera
+    yield from texto
+
+
+def _filas_excel(archivo):
+    try:
+        import openpyxl
+    except ImportError:
+        raise ErrorNomina("Para importar .xlsx instala openpyxl (o exporta la hoja como CSV)") from None
+    from openpyxl.utils.exceptions import InvalidFileException
+    try:
+        libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, ValueError):
+        raise ErrorNomina("El archivo no es un libro de Excel (.xlsx) válido") from None
+    try:
+        for valores in libro.active.iter_rows(values_only=True):
+            yield [valor.strip() if isinstance(valor, str) else valor for valor in valores]
+    finally:
+        libro.close()
+
+
+def _numero(fila, campo, defecto=None):
+    valor = fila.get(campo)
+    if valor is None:
+        if defecto is None:
+            raise ValueError(f"falta {ETIQUETAS[campo]}")
+        return defecto
+    try:
+        numero = float(str(valor).replace(",", "."))
+    except ValueError:
+        raise ValueError(f"{ETIQUETAS[campo]} no es un número: {valor!r}") from None
+    minimo, maximo = RANGOS[campo]
+    if not minimo <= numero <= maximo:
+        raise ValueError(f"{ETIQUETAS[campo]} fuera de rango ({minimo}-{maximo}): {valor}")
+    return numero
+
+
+def _opcion(fila, campo, defecto=None):
+    valor = fila.get(campo)
+    if valor is None:
+        return defecto
+    opcion = VALORES[campo].get(normalizar(valor))
+    if opcion is None:
+        raise ValueError(f"{ETIQUETAS[campo]} desconocido: {valor!r}")
+    return opcion
+
+
+def _lista(fila, campo):
+    valores = []
+    for valor in SEPARADOR_LISTAS.split(str(fila.get(campo, ""))):
+        if valor.strip():
+            opcion = VALORES[campo].get(normalizar(valor))
+            if opcion is None:
+                raise ValueError(f"{ETIQUETAS[campo]}: valor desconocido {valor.strip()!r}")
+            valores.append(opcion)
+    return valores
+
+
+def estudiante_desde_fila(fila, sala_id, ahora):
+    # Mismos campos y rangos que el formulario de registro; ValueError con el motivo si no es válida
+    nombre = str(fila.get('nombre', "")).strip()
+    institucion = str(fila.get('institucion', "")).strip()
+    if not nombre or not institucion:
+        raise ValueError("Nombre e Institución son obligatorios")
+    tipo_personaje = _opcion(fila, 'tipo_personaje')
+    if tipo_personaje is None:
+        raise ValueError("falta Perfil")
+    return Estudiante(
+        id=str(uuid.uuid4())[:8],
+        nombre=nombre,
+        tipo_personaje=tipo_personaje,
+        peso=_numero(fila, 'peso'),
+        altura=_numero(fila, 'altura'),
+        edad=int(_numero(fila, 'edad', 25)),
+        experiencia=_opcion(fila, 'experiencia', "Ninguna"),
+        institucion=institucion,
+        telefono=str(fila.get('telefono', "")).strip(),
+        email=str(fila.get('email', "")).strip(),
+        condiciones_salud=_lista(fila, 'condiciones_salud'),
+        herramientas=_lista(fila, 'herramientas'),
+        epp=_lista(fila, 'epp'),
+        sala_id=sala_id,
+        ubicacion_actual=ZONA_INICIAL,
+        ultimo_movimiento=ahora.strftime("%H:%M:%S"),
+        fecha_union=ahora.strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def importar_nomina(almacen, sala_id, archivo, nombre):
+    # Lee, valida y registra la nómina completa; ErrorNomina si el archivo entero es inválido
+    inicio = time.perf_counter()
+    resultado = ResultadoImportacion()
+    ahora = datetime.now()
+    validos = []
+    filas = []
+    for numero, fila in leer_filas(archivo, nombre):
+        resultado.filas += 1
+        try:
+            validos.append(estudiante_desde_fila(fila, sala_id, ahora))
+            filas.append(numero)
+        except ValueError as error:
+            resultado.errores.append(ErrorFila(numero, str(error)))
+
+    # Riesgos iniciales de toda la nómina juntos (como el registro: solo los automáticos)
+    fecha = time.time()
+    if validos:
+        for estudiante, mascara_ in zip(validos, mascaras_estudiantes(validos)):
+            acumular_riesgos(estudiante, mascara_ & MASCARA_AUTOMATICOS, fecha)
+
+    registrados = almacen.registrar_estudiantes(sala_id, validos)
+    resultado.registrados = validos[:registrados]
+    resultado.errores.extend(ErrorFila(numero, "la sala está llena") for numero in filas[registrados:])
+    resultado.errores.sort(key=lambda error: error.fila)
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
@@ -0,0 +1,164 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# =============================================
+# MÉTRICAS DE RENDIMIENTO EN MEMORIA
+# =============================================
+# Cada sección de página o llamada del motor registra su duración con
+# metricas.medir("seccion"). Por sección se guardan las últimas N duraciones
+# (percentiles móviles para el panel de depuración) y un histograma
+# acumulado con cubetas fijas para exportar en formato de texto de Prometheus,
+# a un archivo local o servido en localhost.
+
+MUESTRAS_POR_SECCION = 2000
+# Límites superiores de las cubetas, en segundos
+CUBETAS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+PREFIJO = "arnes"
+INTERVALO_EXPORTACION = 5.0
+
+registro_errores = logging.getLogger(__name__)
+
+
+class HistogramaSeccion:
+    __slots__ = ('recientes', 'cubetas', 'suma', 'cantidad')
+
+    def __init__(self, muestras=MUESTRAS_POR_SECCION):
+        self.recientes = deque(maxlen=muestras)
+        self.cubetas = [0] * (len(CUBETAS) + 1)
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def agregar(self, segundos):
+        self.recientes.append(segundos)
+        # Pocas cubetas: la búsqueda lineal es más barata que bisect + llamada
+        for i, limite in enumerate(CUBETAS):
+            if segundos <= limite:
+                break
+        else:
+            i = len(CUBETAS)
+        self.cubetas[i] += 1
+        self.suma += segundos
+        self.cantidad += 1
+
+
+class RegistroMetricas:
+    def __init__(self, muestras=MUESTRAS_POR_SECCION):
+        self.muestras = muestras
+        self._secciones = {}
+        self._medidores = {}
+        self._candado = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo_exportacion = None
+        self.exportaciones_fallidas = 0
+
+    def registrar(self, seccion, segundos):
+        with self._candado:
+            histograma = self._secciones.get(seccion)
+            if histograma is None:
+                histograma = self._secciones[seccion] = HistogramaSeccion(self.muestras)
+            histograma.agregar(segundos)
+
+    @contextmanager
+    def medir(self, seccion):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(seccion, time.perf_counter() - inicio)
+
+    def medidor(self, nombre, funcion):
+        # Valor instantáneo leído al exportar (p. ej. salas activas)
+        self._medidores[nombre] = funcion
+
+    def resumen(self):
+        # {seccion: {p50, p95, maximo, muestras, total}} con las duraciones recientes en ms
+        with self._candado:
+            copias = {seccion: (list(h.recientes), h.cantidad) for seccion, h in self._secciones.items()}
+        resumen = {}
+        for seccion, (recientes, total) in sorted(copias.items()):
+            valores = np.asarray(recientes) * 1000
+            p50, p95 = np.percentile(valores, (50, 95))
+            resumen[seccion] = {'p50': float(p50), 'p95': float(p95), 'maximo': float(valores.max()),
+                                'muestras': len(valores), 'total': total}
+        return resumen
+
+    def reiniciar(self):
+        with self._candado:
+            self._secciones.clear()
+
+    def texto_prometheus(self):
+        nombre = f"{PREFIJO}_seccion_segundos"
+        lineas = [f"# HELP {nombre} Duración de cada sección de página o llamada del motor.",
+                  f"# TYPE {nombre} histogram"]
+        with self._candado:
+            for seccion, histograma in sorted(self._secciones.items()):
+                acumulado = 0
+                for limite, cantidad in zip(CUBETAS + ("+Inf",), histograma.cubetas):
+                    acumulado += cantidad
+                    lineas.append(f'{nombre}_bucket{{seccion="{seccion}",le="{limite}"}} {acumulado}')
+                lineas.append(f'{nombre}_sum{{seccion="{seccion}"}} {histograma.suma:.6f}')
+                lineas.append(f'{nombre}_count{{seccion="{seccion}"}} {histograma.cantidad}')
+        for medidor, funcion in sorted(self._medidores.items()):
+            lineas.append(f"# TYPE {PREFIJO}_{medidor} gauge")
+            lineas.append(f"{PREFIJO}_{medidor} {funcion()}")
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, ruta):
+        # Escritura atómica para que quien lea el archivo nunca lo vea a medias
+        temporal = ruta + ".tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            archivo.write(self.texto_prometheus())
+        os.replace(temporal, ruta)
+
+    def exportar_periodicamente(self, ruta, intervalo=INTERVALO_EXPORTACION):
+        # Un error de escritura (disco lleno, carpeta inexistente) se registra y se
+        # reintenta en la próxima vuelta en vez de matar el hilo en silencio
+        def bucle():
+            while True:
+                try:
+                    self.exportar(ruta)
+                except OSError:
+                    self.exportaciones_fallidas += 1
+                    registro_errores.exception("No se pudieron exportar las métricas a %s", ruta)
+                if self._detener.wait(intervalo):
+                    return
+
+        self._detener.clear()
+        self._hilo_exportacion = threading.Thread(target=bucle, name="metricas-archivo", daemon=True)
+        self._hilo_exportacion.start()
+        return self._hilo_exportacion
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo_exportacion is not None:
+            self._hilo_exportacion.join()
+
+    def servir(self, puerto, anfitrion="127.0.0.1"):
+        # Solo localhost por defecto: las métricas no se publican hacia afuera
+        registro = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                cuerpo = registro.texto_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *argumentos):
+                pass
+
+        servidor = ThreadingHTTPServer((anfitrion, puerto), Manejador)
+        threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+        return servidor
+
+
+metricas = RegistroMetricas()
@@ -0,0 +1,174 @@
+from dataclasses import dataclass, field
+from enum import Enum
+
+from historial import HistorialMovimientos
+
+# =============================================
+# MODELOS DE SALA Y ESTUDIANTE
+# =============================================
+# Clases con __slots__ en lugar de dicts de ~25 claves. Zonas, perfiles, EPP,
+# herramientas y condiciones son enums con el texto de la interfaz como
+# valor: cada registro guarda una referencia al miembro (único por proceso)
+# en vez de su propia copia del texto, y como heredan de str siguen
+# funcionando con "Andamios" in zona, ", ".join(epp) o f"{zona}".
+
+INTERVALO_MOVIMIENTO = 20
+
+
+class Etiqueta(str, Enum):
+    def __str__(self):
+        return self.value
+
+    def __format__(self, especificacion):
+        return format(self.value, especificacion)
+
+    @classmethod
+    def tupla(cls, valores):
+        return tuple(cls(valor) for valor in valores)
+
+
+class Zona(Etiqueta):
+    ANDAMIOS = "Zona A - Andamios"
+    EXCAVACION = "Zona B - Excavación"
+    ESTRUCTURA = "Zona C - Estructura"
+    ACABADOS = "Zona D - Acabados"
+
+
+# Zonas por posición: el historial, la base de datos y el diario de eventos las guardan como entero
+ZONAS = list(Zona)
+ID_ZONA = {zona: i for i, zona in enumerate(ZONAS)}
+
+
+class EstadoAlerta(Etiqueta):
+    # Ciclo de vida de una alerta por (estudiante, riesgo): ver seguimiento.py
+    ABIERTA = "🆕 Abierta"
+    RECONOCIDA = "👁️ Reconocida"
+    ESCALADA = "🚨 Escalada"
+    RESUELTA = "✅ Resuelta"
+
+
+class Perfil(Etiqueta):
+    MUSCULOSO = "Hombre musculoso"
+    ATLETICA = "Mujer atlética"
+    MAYOR = "Persona mayor"
+    SOBREPESO = "Persona con sobrepeso"
+    EMBARAZADA = "Mujer embarazada"
+    DISCAPACIDAD = "Persona con discapacidad motriz"
+
+
+class Condicion(Etiqueta):
+    VERTIGO = "Vértigo"
+    MAREOS = "Mareos"
+    CARDIACOS = "Problemas cardíacos"
+    DIABETES = "Diabetes"
+    RESPIRATORIOS = "Problemas respiratorios"
+    ESPALDA = "Problemas de espalda"
+    NINGUNA = "Ninguna"
+
+
+class Epp(Etiqueta):
+    CASCO = "Casco"
+    BOTAS = "Botas con punta de acero"
+    GUANTES = "Guantes"
+    GAFAS = "Gafas de seguridad"
+    ARNES = "Arnés de seguridad"
+    CHALECO = "Chaleco reflectante"
+    PROTECTOR_AUDITIVO = "Protector auditivo"
+
+
+class Herramienta(Etiqueta):
+    MARTILLO = "Martillo"
+    TALADRO = "Taladro"
+    SOLDADORA = "Soldadora"
+    SIERRA = "Sierra eléctrica"
+    LLAVE = "Llave inglesa"
+    NIVEL = "Nivel"
+    NINGUNA = "Ninguna"
+    COMPACTADORA = "Compactadora"
+    HIDROLAVADORA = "Hidrolavadora"
+
+
+def calcular_imc(peso, altura):
+    return peso / ((altura/100) ** 2) if altura > 0 else None
+
+
+@dataclass(slots=True)
+class Estudiante:
+    id: str
+    nombre: str
+    tipo_personaje: Perfil
+    peso: float = 70
+    altura: float = 170
+    edad: int = 25
+    experiencia: str = ""
+    institucion: str = ""
+    telefono: str = ""
+    email: str = ""
+    tono_piel: str = ""
+    cabello: str = ""
+    complexion: str = ""
+    condiciones_salud: tuple = ()
+    herramientas: tuple = ()
+    epp: tuple = ()
+    sala_id: str = ""
+    ubicacion_actual: Zona = Zona.ANDAMIOS
+    # Conjunto de códigos de riesgo como bits + fecha epoch en que se vio cada uno
+    riesgos_detectados: int = 0
+    riesgos_desde: dict = field(default_factory=dict)
+    ultimo_movimiento: str = ""
+    fecha_union: str = ""
+    revision: int = 0
+    indice: int = -1
+    caidas: int = 0
+    imc: float = field(init=False, default=None)
+    # Parte de la clave de riesgos que no depende de la zona; la arma riesgos.clave_riesgos
+    clave_riesgos: tuple = field(init=False, default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.normalizar()
+
+    def normalizar(self):
+        self.tipo_personaje = Perfil(self.tipo_personaje)
+        self.ubicacion_actual = Zona(self.ubicacion_actual)
+        self.condiciones_salud = Condicion.tupla(self.condiciones_salud)
+        self.herramientas = Herramienta.tupla(self.herramientas)
+        self.epp = Epp.tupla(self.epp)
+        # Valores derivados, calculados una vez al registrar o al editar
+        self.imc = calcular_imc(self.peso, self.altura)
+        self.clave_riesgos = None
+
+    def get(self, campo, defecto=None):
+        # Las reglas escalares de riesgos leen con .get(), como con los dicts
+        return getattr(self, campo, defecto)
+
+
+@dataclass(slots=True)
+class Sala:
+    sala_id: str
+    codigo: str
+    monitor_nombre: str = ""
+    empresa: str = ""
+    # WhatsApp del monitor: destino de las alertas de caídas y riesgos (ver alertas.py)
+    telefono_monitor: str = ""
+    tipo_escenario: str = ""
+    nivel_dificultad: str = ""
+    max_estudiantes: int = 30
+    duracion: int = 60
+    condiciones_climaticas: str = ""
+    riesgos_activados: tuple = ()
+    descripcion_escenario: str = ""
+    intervalo_movimiento: int = INTERVALO_MOVIMIENTO
+    semilla: int = None
+    estudiantes: list = field(default_factory=list)
+    activa: bool = True
+    simulacion_iniciada: bool = False
+    version: int = 0
+    fecha_creacion: str = ""
+    ultimo_tick: str = None
+    caidas_detectadas: int = 0
+    # Acelerómetros simulados con caídas sintéticas: solo si el monitor lo pide
+    simular_sensores: bool = False
+    # Agregados mantenidos por el almacén al mutar (ver AlmacenSimulacion.contadores)
+    con_riesgo: int = 0
+    sin_arnes: int = 0
+    historial: HistorialMovimientos = None
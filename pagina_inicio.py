@@ -0,0 +1,107 @@
+import streamlit as st
+
+# =============================================
+# SECCIÓN: INICIO - COMPLETA
+# =============================================
+
+
+def mostrar(almacen, motor_simulacion):
+    st.header("🏠 Bienvenido al Sistema de Protección Inteligente")
+    
+    # Tarjetas informativas
+    col_info1, col_info2, col_info3 = st.columns(3)
+    
+    with col_info1:
+        st.markdown("""
+        <div style='padding: 20px; background: #e8f4fd; border-radius: 10px; border-left: 5px solid #2196F3;'>
+            <h3 style='color: #1976D2; margin: 0;'>🎮 Simulador Individual</h3>
+            <p style='color: #424242;'>Prueba el sistema de detección de riesgos en modo individual con diferentes escenarios y configuraciones.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col_info2:
+        st.markdown("""
+        <div style='padding: 20px; background: #f3e5f5; border-radius: 10px; border-left: 5px solid #9C27B0;'>
+            <h3 style='color: #7B1FA2; margin: 0;'>👨‍🏫 Modo Multijugador</h3>
+            <p style='color: #424242;'>Crea salas de simulación para entrenamiento grupal con monitoreo en tiempo real.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col_info3:
+        st.markdown("""
+        <div style='padding: 20px; background: #e8f5e8; border-radius: 10px; border-left: 5px solid #4CAF50;'>
+            <h3 style='color: #388E3C; margin: 0;'>📊 Salas Activas</h3>
+            <p style='color: #424242;'>Monitorea y gestiona todas las simulaciones activas con análisis detallado.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Estadísticas del sistema
+    st.subheader("📈 Estadísticas del Sistema")
+    
+    col_stats1, col_stats2, col_stats3, col_stats4 = st.columns(4)
+    
+    # Agregados mantenidos por el almacén: lectura O(1)
+    contadores = almacen.contadores
+    
+    with col_stats1:
+        st.metric("Salas Creadas", contadores.salas)
+    
+    with col_stats2:
+        st.metric("Estudiantes Registrados", contadores.estudiantes)
+    
+    with col_stats3:
+        st.metric("Salas Activas", contadores.salas_activas)
+    
+    with col_stats4:
+        st.metric("Simulaciones Activas", contadores.simulaciones_activas)
+    
+    # Información del proyecto
+    st.markdown("---")
+    st.subheader("🎓 Información del Proyecto de Grado")
+    
+    col_proj1, col_proj2 = st.columns([2, 1])
+    
+    with col_proj1:
+        st.markdown("""
+        ### Objetivos del Sistema
+        
+        Este sistema de protección inteligente para trabajos en altura tiene como objetivos:
+        
+        - **Detección temprana** de riesgos y condiciones peligrosas
+        - **Simulación realista** de escenarios de trabajo en altura
+        - **Entrenamiento interactivo** para trabajadores y estudiantes
+        - **Monitoreo en tiempo real** de múltiples usuarios
+        - **Análisis predictivo** de comportamientos de riesgo
+        
+        ### Características Principales
+        
+        ✅ **Sistema multijugador** para entrenamiento grupal  
+        ✅ **Detección automática** de riesgos basada en perfiles  
+        ✅ **Simulación de movimientos** y cambios de ubicación  
+        ✅ **Alertas inteligentes** personalizadas por perfil  
+        ✅ **Análisis en tiempo real** de condiciones de trabajo  
+        ✅ **Interfaz intuitiva** para monitores y estudiantes  
+        
+        ### Tecnologías Utilizadas
+        
+        - **Streamlit** para la interfaz web interactiva
+        - **Python** para la lógica de simulación y análisis
+        - **Session State** para gestión de estado multiusuario
+        - **Matplotlib** para visualizaciones
+        - **Sistema de tiempo real** para simulaciones continuas
+        """)
+    
+    with col_proj2:
+        st.markdown("""
+        <div style='padding: 20px; background: #fff3e0; border-radius: 10px; border: 2px solid #FF9800;'>
+            <h3 style='color: #E65100; text-align: center;'>👩‍🔬 Autora</h3>
+            <div style='text-align: center; font-size: 3em;'>💫</div>
+            <h2 style='color: #E65100; text-align: center;'>Michell Andrea</h2>
+            <h2 style='color: #E65100; text-align: center;'>Rodriguez Rivera</h2>
+            <p style='text-align: center; color: #5D4037;'><strong>Ingeniera en Seguridad y Salud en el Trabajo</strong></p>
+            <hr>
+            <p style='text-align: center; color: #5D4037;'>Sistema desarrollado como Proyecto de Grado para la obtención del título de Ingeniería en Seguridad y Salud en el Trabajo</p>
+        </div>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,238 @@
+import time
+import uuid
+from datetime import datetime
+
+import streamlit as st
+
+from componentes import obtener_icono_personaje
+from modelos import Estudiante
+from riesgos import MASCARA_AUTOMATICOS, acumular_riesgos, etiquetas_riesgos, evaluar_riesgos_memorizados
+from simulacion import INTERVALO_MOVIMIENTO, ZONA_INICIAL
+
+# =============================================
+# SECCIÓN: MODO MULTIJUGADOR
+# =============================================
+
+
+def mostrar(almacen, motor_simulacion):
+    st.header("🎮 Sistema de Simulación Multijugador")
+    
+    submenu = st.selectbox("Selecciona el modo:", 
+                          ["👨‍🏫 Crear Sala como Monitor", "🎓 Unirse como Estudiante"])
+    
+    if submenu == "👨‍🏫 Crear Sala como Monitor":
+        st.subheader("👨‍🏫 Crear Sala de Simulación")
+
+        with st.form("crear_sala"):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                monitor_nombre = st.text_input("Nombre del monitor *", placeholder="Ing. Laura Méndez")
+                empresa = st.text_input("Empresa/Institución *", placeholder="Constructora Andina")
+                telefono_monitor = st.text_input("WhatsApp para alertas", placeholder="+52 55 1234 5678",
+                                                 help="Recibe las caídas y los riesgos nuevos de la sala")
+                tipo_escenario = st.selectbox("Tipo de escenario *",
+                                            ["Obra en construcción", "Edificio en altura", "Planta industrial",
+                                             "Torre de telecomunicaciones"])
+                nivel_dificultad = st.selectbox("Nivel de dificultad *", ["Básico", "Intermedio", "Avanzado"])
+
+            with col2:
+                max_estudiantes = st.number_input("Máximo de estudiantes *", min_value=1, max_value=50, value=30)
+                duracion = st.number_input("Duración (min) *", min_value=10, max_value=240, value=60)
+                condiciones_climaticas = st.selectbox("Condiciones climáticas *",
+                                                    ["Soleado", "Nublado", "Lluvia", "Viento fuerte"])
+                intervalo_movimiento = st.number_input("Intervalo de movimiento (s) *", min_value=5, max_value=300,
+                                                       value=INTERVALO_MOVIMIENTO)
+                riesgos_activados = st.multiselect("Riesgos a simular:",
+                                                  ["Caída de altura", "Caída de objetos", "Derrumbe",
+                                                   "Riesgo eléctrico", "Incendio", "Sobrecarga física"])
+                simular_sensores = st.checkbox("🧪 Simular sensores de caída", value=False,
+                                               help="Genera caídas sintéticas en los arneses para practicar; "
+                                                    "se cuentan en la sala pero no se envían por WhatsApp")
+
+            descripcion_escenario = st.text_area("Descripción del escenario",
+                                               placeholder="Trabajo en fachada del piso 8 con andamios colgantes")
+
+            submitted_sala = st.form_submit_button("🏗️ Crear Sala", type="primary")
+
+            if submitted_sala:
+                if monitor_nombre and empresa:
+                    sala = almacen.crear_sala(
+                        monitor_nombre=monitor_nombre,
+                        empresa=empresa,
+                        telefono_monitor=telefono_monitor.strip(),
+                        tipo_escenario=tipo_escenario,
+                        nivel_dificultad=nivel_dificultad,
+                        max_estudiantes=max_estudiantes,
+                        duracion=duracion,
+                        condiciones_climaticas=condiciones_climaticas,
+                        riesgos_activados=riesgos_activados,
+                        intervalo_movimiento=intervalo_movimiento,
+                        simular_sensores=simular_sensores,
+                        descripcion_escenario=descripcion_escenario or "Sin descripción",
+                    )
+                    if sala is None:
+                        st.error("❌ No hay códigos de sala disponibles. Finaliza alguna sala e intenta de nuevo.")
+                    else:
+                        st.success(f"✅ Sala creada con código: **{sala.codigo}**")
+                        st.info("📢 Comparte este código con tus estudiantes para que se unan.")
+                else:
+                    st.error("❌ Por favor completa todos los campos obligatorios (*)")
+
+    elif submenu == "🎓 Unirse como Estudiante":
+        st.subheader("🎓 Unirse a Sala de Simulación")
+        
+        codigo_sala = st.text_input("Ingresa el código de la sala:", placeholder="SIM-1234").upper()
+        
+        if codigo_sala:
+            sala_encontrada = almacen.buscar_sala_por_codigo(codigo_sala)
+            
+            if sala_encontrada:
+                if len(sala_encontrada.estudiantes) >= sala_encontrada.max_estudiantes:
+                    st.error("❌ La sala está llena. No se pueden unir más estudiantes.")
+                else:
+                    st.success(f"✅ Sala encontrada: {sala_encontrada.tipo_escenario}")
+                    st.info(f"👨‍🏫 Monitor: {sala_encontrada.monitor_nombre}")
+                    
+                    with st.form("registro_estudiante"):
+                        st.subheader("👤 Registro del Estudiante")
+                        
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            nombre_estudiante = st.text_input("Nombre completo *", placeholder="Ana García López")
+                            edad = st.number_input("Edad *", min_value=18, max_value=65, value=25)
+                            experiencia = st.selectbox("Experiencia en construcción *",
+                                                     ["Ninguna", "Menos de 1 año", "1-3 años", "3-5 años", "Más de 5 años"])
+                        
+                        with col2:
+                            institucion = st.text_input("Institución/Empresa *", placeholder="Universidad Técnica")
+                            telefono = st.text_input("WhatsApp *", placeholder="+52 55 1234 5678")
+                            email = st.text_input("Email *", placeholder="ana.garcia@email.com")
+                        
+                        st.markdown("---")
+                        st.subheader("🎭 Personalización del Personaje")
+                        
+                        col3, col4, col5 = st.columns(3)
+                        
+                        with col3:
+                            tipo_personaje = st.selectbox("Tipo de personaje *",
+                                                        ["Hombre musculoso", "Mujer atlética", "Persona mayor", 
+                                                         "Persona con sobrepeso", "Mujer embarazada", "Persona con discapacidad motriz"])
+                            
+                            tono_piel = st.selectbox("Tono de piel *",
+                                                   ["Muy claro", "Claro", "Medio", "Oscuro", "Muy oscuro"])
+                        
+                        with col4:
+                            cabello = st.selectbox("Estilo de cabello *",
+                                                 ["Cabello corto", "Cabello largo", "Calvo", "Rasta", "Moño/Recogido"])
+                            
+                            altura = st.number_input("Altura (cm) *", min_value=140, max_value=200, value=170)
+                        
+                        with col5:
+                            complexión = st.selectbox("Complexión física *",
+                                                    ["Delgado", "Atlético", "Mediano", "Robusto", "Obeso"])
+                            
+                            peso = st.number_input("Peso (kg) *", min_value=40, max_value=150, value=70)
+                        
+                        st.markdown("---")
+                        st.subheader("🏥 Condiciones de Salud (Opcional)")
+                        
+                        condiciones_salud = st.multiselect("Condiciones de salud conocidas:",
+                                                          ["Vértigo", "Mareos", "Problemas cardíacos", "Diabetes", 
+                                                           "Problemas respiratorios", "Problemas de espalda", "Ninguna"])
+                        
+                        st.subheader("🛠 Equipamiento y EPP")
+                        
+                        col_equipo1, col_equipo2 = st.columns(2)
+                        
+                        with col_equipo1:
+                            herramientas = st.multiselect("Herramientas a utilizar:",
+                                                         ["Martillo", "Taladro", "Soldadora", "Sierra eléctrica", 
+                                                          "Llave inglesa", "Nivel", "Ninguna"])
+                        
+                        with col_equipo2:
+                            epp = st.multiselect("Equipo de protección personal (EPP):",
+                                                ["Casco", "Botas con punta de acero", "Guantes", "Gafas de seguridad",
+                                                 "Arnés de seguridad", "Chaleco reflectante", "Protector auditivo"])
+                        
+                        submitted_estudiante = st.form_submit_button("🎮 Unirse a la Simulación", type="primary")
+                        
+                        if submitted_estudiante:
+                            if nombre_estudiante and institucion and telefono:
+                                # Crear estudiante
+                                estudiante_id = str(uuid.uuid4())[:8]
+                                estudiante = Estudiante(
+                                    id=estudiante_id,
+                                    nombre=nombre_estudiante,
+                                    edad=edad,
+                                    experiencia=experiencia,
+                                    institucion=institucion,
+                                    telefono=telefono,
+                                    email=email,
+                                    tipo_personaje=tipo_personaje,
+                                    tono_piel=tono_piel,
+                                    cabello=cabello,
+                                    altura=altura,
+                                    complexion=complexión,
+                                    peso=peso,
+                                    condiciones_salud=condiciones_salud,
+                                    herramientas=herramientas,
+                                    epp=epp,
+                                    sala_id=sala_encontrada.sala_id,
+                                    ubicacion_actual=ZONA_INICIAL,
+                                    ultimo_movimiento=datetime.now().strftime("%H:%M:%S"),
+                                    fecha_union=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                                )
+                                
+                                # Evaluar riesgos iniciales antes de publicar al estudiante
+                                evaluacion = evaluar_riesgos_memorizados(estudiante, estudiante.ubicacion_actual)
+                                mascara_inicial = evaluacion.mascara & MASCARA_AUTOMATICOS
+                                acumular_riesgos(estudiante, mascara_inicial, time.time())
+                                riesgos_iniciales = etiquetas_riesgos(mascara_inicial)
+                                
+                                # Añadir a la sala (el cupo se verifica bajo el candado de la sala)
+                                if not almacen.registrar_estudiante(sala_encontrada.sala_id, estudiante):
+                                    st.error("❌ La sala está llena. No se pueden unir más estudiantes.")
+                                    st.stop()
+                                
+                                st.success(f"✅ Te has unido exitosamente a la sala!")
+                                st.balloons()
+                                
+                                st.markdown("---")
+                                st.subheader("👤 Tu Personaje Creado")
+                                
+                                col_per1, col_per2 = st.columns(2)
+                                
+                                with col_per1:
+                                    st.metric("Nombre", nombre_estudiante)
+                                    st.metric("Personaje", f"{obtener_icono_personaje(tipo_personaje)} {tipo_personaje}")
+                                    st.metric("Experiencia", experiencia)
+                                
+                                with col_per2:
+                                    st.metric("Ubicación Inicial", ZONA_INICIAL)
+                                    st.metric("Riesgos Detectados", len(riesgos_iniciales))
+                                    st.metric("EPP Equipado", len(epp))
+                                
+                                if riesgos_iniciales:
+                                    st.warning("⚠️ **Riesgos detectados inicialmente:**")
+                                    for riesgo in riesgos_iniciales:
+                                        st.write(f"- {riesgo}")
+                                
+                            else:
+                                st.error("❌ Por favor completa todos los campos obligatorios (*)")
+            else:
+                st.error("❌ No se encontró ninguna sala activa con ese código")
+                st.info("💡 Asegúrate de que:")
+                st.write("• El código sea correcto (ej: SIM-1234)")
+                st.write("• La sala esté activa")
+                st.write("• El monitor haya creado la sala recientemente")
+                
+                # Mostrar salas disponibles para debugging
+                if st.checkbox("Mostrar salas disponibles (para debugging)"):
+                    if almacen.salas:
+                        st.write("Salas activas:")
+                        for sala in almacen.salas_activas():
+                            st.write(f"- {sala.codigo}: {sala.tipo_escenario} ({len(sala.estudiantes)}/{sala.max_estudiantes} estudiantes)")
+                    else:
+                        st.write("No hay salas creadas aún")
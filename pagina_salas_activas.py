@@ -0,0 +1,316 @@
+import random
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from componentes import obtener_icono_personaje
+from importacion import EXTENSIONES, ErrorNomina, importar_nomina, plantilla_csv
+from metricas import metricas
+from riesgos import CATALOGO_RIESGOS, cache_evaluaciones, etiquetas_riesgos
+from simulacion import ZONA_INICIAL, ZONAS
+
+# =============================================
+# SECCIÓN: SALAS ACTIVAS (PARA MONITORES) - COMPLETA
+# =============================================
+
+# Vistas del panel de salas: tarjetas paginadas o una tabla por sala
+VISTA_TARJETAS = "🃏 Tarjetas"
+VISTA_TABLA = "📋 Tabla"
+TARJETAS_POR_PAGINA = [10, 20, 50]
+NOVEDADES_VISIBLES = 5
+
+
+def mostrar_tarjeta_estudiante(almacen, sala, estudiante, evaluacion):
+    est_id = estudiante.id
+    with st.container():
+        col_est1, col_est2, col_est3 = st.columns([1, 2, 1])
+        
+        with col_est1:
+            st.write(f"**{obtener_icono_personaje(estudiante.tipo_personaje)} {estudiante.nombre}**")
+            st.write(f"*{estudiante.institucion}*")
+            st.write(f"Edad: {estudiante.edad}")
+            st.write(f"Exp: {estudiante.experiencia}")
+        
+        with col_est2:
+            # Información de ubicación y movimiento
+            st.write(f"📍 **Ubicación actual:** {estudiante.ubicacion_actual}")
+            st.write(f"⏰ **Último movimiento:** {estudiante.ultimo_movimiento}")
+            st.write(f"🚶 **Movimientos:** {sala.historial.movimientos_de(estudiante.indice)}")
+            if estudiante.caidas:
+                st.error(f"🔴 **Caídas detectadas:** {estudiante.caidas}")
+            
+            # Riesgos actuales (automáticos, caída y sobrecarga) como códigos;
+            # las etiquetas se resuelven solo para mostrarlas
+            todos_riesgos = etiquetas_riesgos(evaluacion.mascara)
+            if todos_riesgos:
+                st.error(f"🚨 **{len(todos_riesgos)} riesgos detectados**")
+                for riesgo in todos_riesgos[:4]:  # Mostrar máximo 4 riesgos
+                    st.write(f"• {riesgo}")
+            else:
+                st.success("✅ Sin riesgos detectados")
+        
+        with col_est3:
+            # Información de equipamiento
+            st.write("**EPP:**", ", ".join(estudiante.epp) if estudiante.epp else "Ninguno")
+            st.write("**Herramientas:**", ", ".join(estudiante.herramientas) if estudiante.herramientas else "Ninguna")
+            
+            # Botón para forzar movimiento (solo para testing)
+            if st.button(f"🚶‍♂️ Mover", key=f"move_{est_id}"):
+                nueva_zona = random.choice([z for z in ZONAS if z != estudiante.ubicacion_actual])
+                almacen.mover_estudiante(sala.sala_id, est_id, nueva_zona, datetime.now())
+                st.success(f"Movido a {nueva_zona}")
+                st.rerun()
+
+
+def tabla_estudiantes(sala, estudiantes_sala, evaluaciones):
+    # Una fila por estudiante con lo mismo que muestran las tarjetas; pandas se
+    # importa solo si algún monitor elige la vista de tabla
+    import pandas as pd
+
+    riesgos = [etiquetas_riesgos(evaluacion.mascara) for evaluacion in evaluaciones]
+    return pd.DataFrame({
+        "Estudiante": [f"{obtener_icono_personaje(e.tipo_personaje)} {e.nombre}" for e in estudiantes_sala],
+        "Institución": [e.institucion for e in estudiantes_sala],
+        "Ubicación": [str(e.ubicacion_actual) for e in estudiantes_sala],
+        "Último movimiento": [e.ultimo_movimiento for e in estudiantes_sala],
+        "Movimientos": [sala.historial.movimientos_de(e.indice) for e in estudiantes_sala],
+        "Caídas": [e.caidas for e in estudiantes_sala],
+        "Riesgos": [len(r) for r in riesgos],
+        "Principales riesgos": [" · ".join(r[:3]) for r in riesgos],
+        "EPP": [", ".join(e.epp) if e.epp else "Ninguno" for e in estudiantes_sala],
+    })
+
+
+def tabla_alertas(alertas, nombres, ahora):
+    import pandas as pd
+
+    return pd.DataFrame({
+        "Estado": [str(a.estado) for a in alertas],
+        "Estudiante": [nombres.get(a.est_id, a.est_id) for a in alertas],
+        "Riesgo": [CATALOGO_RIESGOS[a.codigo] for a in alertas],
+        "Abierta hace": [f"{int(ahora - a.abierta) // 60} min {int(ahora - a.abierta) % 60} s" for a in alertas],
+        "Reaperturas": [a.reaperturas for a in alertas],
+    })
+
+
+def mostrar_alertas(almacen, sala_id, estudiantes_sala):
+    # Novedades desde el último render de este monitor y alertas vigentes para reconocer
+    cursor = f"visto_{sala_id}"
+    novedades = almacen.seguimiento.transiciones(sala_id, st.session_state.get(cursor, 0))
+    if novedades:
+        st.session_state[cursor] = novedades[-1].numero
+    nombres = {e.id: e.nombre for e in estudiantes_sala}
+    for transicion in novedades[-NOVEDADES_VISIBLES:]:
+        st.caption(f"{transicion.hacia} · {nombres.get(transicion.est_id, transicion.est_id)} - "
+                   f"{CATALOGO_RIESGOS[transicion.codigo]}")
+    if len(novedades) > NOVEDADES_VISIBLES:
+        st.caption(f"… y {len(novedades) - NOVEDADES_VISIBLES} cambios más")
+
+    alertas = almacen.seguimiento.activas(sala_id)
+    if not alertas:
+        st.success("✅ Sin alertas abiertas")
+        return
+    seleccion = st.dataframe(tabla_alertas(alertas, nombres, time.time()), hide_index=True,
+                             key=f"alertas_{sala_id}", on_select="rerun", selection_mode="multi-row")
+    # La selección sobrevive al rerun aunque la lista haya cambiado
+    filas = [f for f in seleccion.selection.rows if f < len(alertas)]
+    col_rec1, col_rec2 = st.columns(2)
+    with col_rec1:
+        if filas and st.button(f"👁️ Reconocer seleccionadas ({len(filas)})", key=f"ack_sel_{sala_id}"):
+            almacen.reconocer_alertas(sala_id, [(alertas[f].est_id, alertas[f].codigo) for f in filas])
+            st.rerun()
+    with col_rec2:
+        if st.button("👁️ Reconocer todas", key=f"ack_all_{sala_id}"):
+            almacen.reconocer_alertas(sala_id, [(a.est_id, a.codigo) for a in alertas])
+            st.rerun()
+
+
+def mostrar_importacion(almacen, sala):
+    # Nómina completa de la clase en un archivo: el resultado sobrevive al rerun que refresca el panel
+    sala_id = sala.sala_id
+    cupo = sala.max_estudiantes - len(sala.estudiantes)
+    col_imp1, col_imp2 = st.columns([3, 1])
+    with col_imp1:
+        archivo = st.file_uploader(f"Nómina de estudiantes (cupo libre: {cupo})", type=list(EXTENSIONES),
+                                   key=f"nomina_{sala_id}", disabled=cupo <= 0)
+    with col_imp2:
+        st.download_button("📄 Plantilla CSV", plantilla_csv(), file_name="nomina.csv", mime="text/csv",
+                           key=f"plantilla_{sala_id}")
+        if archivo is not None and st.button("📥 Importar nómina", key=f"importar_{sala_id}", type="primary"):
+            try:
+                with metricas.medir("salas_activas.importar_nomina"):
+                    st.session_state[f"importacion_{sala_id}"] = importar_nomina(almacen, sala_id, archivo,
+                                                                                   archivo.name)
+            except ErrorNomina as error:
+                st.error(f"❌ {error}")
+            else:
+                st.rerun()
+
+    resultado = st.session_state.get(f"importacion_{sala_id}")
+    if resultado is not None:
+        st.success(f"✅ {len(resultado.registrados)} de {resultado.filas} filas importadas "
+                   f"en {resultado.segundos * 1000:.0f} ms")
+        if resultado.errores:
+            st.warning(f"⚠️ {len(resultado.errores)} filas con errores")
+            st.dataframe({"Fila": [e.fila for e in resultado.errores],
+                          "Error": [e.mensaje for e in resultado.errores]}, hide_index=True)
+
+
+def mostrar(almacen, motor_simulacion):
+    st.header("📊 Salas de Simulación Activas")
+    
+    if not almacen.salas:
+        st.info("📝 No hay salas activas. Crea una sala en 'Modo Multijugador'.")
+    else:
+        # Contadores generales (mantenidos por el almacén, lectura O(1))
+        contadores = almacen.contadores
+        
+        col_stats1, col_stats2, col_stats3 = st.columns(3)
+        with col_stats1:
+            st.metric("Salas Activas", contadores.salas_activas)
+        with col_stats2:
+            st.metric("Estudiantes Totales", contadores.estudiantes_en_salas_activas)
+        with col_stats3:
+            st.metric("Simulaciones Activas", contadores.simulaciones_activas)
+        latencia = motor_simulacion.latencia_caidas()
+        if latencia is not None:
+            st.caption(f"🔴 {latencia['caidas']} caídas detectadas · latencia p50 {latencia['p50']:.2f} s · "
+                       f"p95 {latencia['p95']:.2f} s")
+        if almacen.alertas is not None and almacen.alertas.estadisticas['encoladas']:
+            envio = almacen.alertas.estadisticas
+            st.caption(f"📨 {envio['alertas_enviadas']} alertas enviadas en {envio['mensajes']} mensajes · "
+                       f"{almacen.alertas.en_cola()} pendientes · {envio['descartadas']} descartadas · "
+                       f"{envio['fallidos']} fallidas")
+        
+        # Vista de estudiantes: tarjetas paginadas o una tabla por sala
+        col_vista1, col_vista2 = st.columns([2, 1])
+        with col_vista1:
+            vista = st.segmented_control("Vista de estudiantes", [VISTA_TARJETAS, VISTA_TABLA],
+                                         default=VISTA_TARJETAS, key="vista_salas")
+        with col_vista2:
+            por_pagina = st.selectbox("Tarjetas por página", TARJETAS_POR_PAGINA, key="tarjetas_por_pagina")
+        
+        salas_activas = almacen.salas_activas()
+        for sala in salas_activas:
+            sala_id = sala.sala_id
+            # Las salas cerradas no se copian ni se dibujan: solo su encabezado
+            panel = st.expander(f"🏠 {sala.codigo} - {sala.tipo_escenario} ({len(sala.estudiantes)}/{sala.max_estudiantes} estudiantes)",
+                                expanded=len(salas_activas) == 1, key=f"panel_{sala_id}", on_change="rerun")
+            if not panel.open:
+                continue
+            with panel, metricas.medir("salas_activas.panel"):
+                # Copia consistente de la sala: no bloquea el tick de movimiento
+                sala, estudiantes_sala = almacen.instantanea_sala(sala_id)
+                
+                col_sala1, col_sala2, col_sala3 = st.columns(3)
+                
+                with col_sala1:
+                    st.metric("Monitor", sala.monitor_nombre)
+                    st.metric("Dificultad", sala.nivel_dificultad)
+                    st.metric("Empresa", sala.empresa)
+                
+                with col_sala2:
+                    st.metric("Estudiantes", f"{len(sala.estudiantes)}/{sala.max_estudiantes}")
+                    st.metric("Duración", f"{sala.duracion} min")
+                    st.metric("Clima", sala.condiciones_climaticas)
+                
+                with col_sala3:
+                    st.metric("Riesgos Configurados", len(sala.riesgos_activados))
+                    estado = "🎬 Activa" if sala.simulacion_iniciada else "⏸️ Pausada"
+                    st.metric("Estado Simulación", estado)
+                    st.metric("Creada", sala.fecha_creacion.split()[0])
+                
+                # Descripción del escenario
+                st.write("**Descripción:**", sala.descripcion_escenario)
+                st.caption(f"⏱️ Movimiento cada {sala.intervalo_movimiento} s · "
+                           f"Último tick: {sala.ultimo_tick or 'sin movimientos aún'} · "
+                           f"🔴 Caídas detectadas: {sala.caidas_detectadas}"
+                           + (" (🧪 sensores simulados)" if sala.simular_sensores else ""))
+                
+                # Botones de control para el monitor
+                st.subheader("🎮 Controles de Simulación")
+                col_btn1, col_btn2, col_btn3, col_btn4 = st.columns(4)
+                
+                with col_btn1:
+                    if st.button(f"🎬 Iniciar Simulación", key=f"start_{sala_id}", type="primary"):
+                        almacen.actualizar_sala(sala_id, simulacion_iniciada=True)
+                        st.success("✅ Simulación iniciada! Los estudiantes comenzarán a moverse automáticamente.")
+                        st.rerun()
+                
+                with col_btn2:
+                    if st.button(f"⏸️ Pausar Simulación", key=f"pause_{sala_id}"):
+                        almacen.actualizar_sala(sala_id, simulacion_iniciada=False)
+                        st.warning("⏸️ Simulación pausada")
+                        st.rerun()
+                
+                with col_btn3:
+                    if st.button(f"🔄 Reiniciar Movimientos", key=f"reset_{sala_id}"):
+                        # Reiniciar ubicaciones de todos los estudiantes
+                        almacen.reiniciar_movimientos(sala_id, ZONA_INICIAL)
+                        st.info("🔄 Ubicaciones reiniciadas")
+                        st.rerun()
+                
+                with col_btn4:
+                    if st.button(f"🔴 Finalizar Sala", key=f"end_{sala_id}"):
+                        almacen.finalizar_sala(sala_id)
+                        st.error("🔴 Sala finalizada. Los estudiantes ya no podrán conectarse.")
+                        st.rerun()
+                
+                st.subheader("📥 Importar Estudiantes")
+                mostrar_importacion(almacen, sala)
+                
+                st.subheader("🚨 Alertas")
+                with metricas.medir("salas_activas.alertas"):
+                    mostrar_alertas(almacen, sala_id, estudiantes_sala)
+                
+                # Lista de estudiantes en la sala
+                if estudiantes_sala:
+                    st.subheader("🎓 Estudiantes Conectados")
+                    
+                    if vista == VISTA_TABLA:
+                        # Una sola tabla: un elemento por sala sin importar el tamaño de la clase
+                        with metricas.medir("salas_activas.riesgos"):
+                            evaluaciones_sala = cache_evaluaciones.evaluar(estudiantes_sala)
+                        with metricas.medir("salas_activas.tabla"):
+                            seleccion = st.dataframe(tabla_estudiantes(sala, estudiantes_sala, evaluaciones_sala),
+                                                     hide_index=True, key=f"tabla_{sala_id}",
+                                                     on_select="rerun", selection_mode="multi-row")
+                        filas = seleccion.selection.rows
+                        if filas and st.button(f"🚶‍♂️ Mover seleccionados ({len(filas)})", key=f"move_sel_{sala_id}"):
+                            for fila in filas:
+                                estudiante = estudiantes_sala[fila]
+                                nueva_zona = random.choice([z for z in ZONAS if z != estudiante.ubicacion_actual])
+                                almacen.mover_estudiante(sala_id, estudiante.id, nueva_zona, datetime.now())
+                            st.rerun()
+                    else:
+                        # Tarjetas paginadas: solo se evalúan y dibujan las de la página actual
+                        paginas = max(1, -(-len(estudiantes_sala) // por_pagina))
+                        pagina = 1
+                        if paginas > 1:
+                            pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas,
+                                                     value=1, step=1, key=f"pagina_{sala_id}")
+                        inicio = (pagina - 1) * por_pagina
+                        estudiantes_pagina = estudiantes_sala[inicio:inicio + por_pagina]
+                        with metricas.medir("salas_activas.riesgos"):
+                            evaluaciones_pagina = cache_evaluaciones.evaluar(estudiantes_pagina)
+                        with metricas.medir("salas_activas.tarjetas"):
+                            for estudiante, evaluacion in zip(estudiantes_pagina, evaluaciones_pagina):
+                                mostrar_tarjeta_estudiante(almacen, sala, estudiante, evaluacion)
+                    
+                    # Estadísticas de la sala
+                    st.subheader("📈 Estadísticas de la Sala")
+                    col_stat1, col_stat2, col_stat3 = st.columns(3)
+                    
+                    # Agregados de la copia de la sala: se mantienen al mutar, sin recorrer estudiantes
+                    with col_stat1:
+                        st.metric("Estudiantes con Riesgos", sala.con_riesgo)
+                    
+                    with col_stat2:
+                        st.metric("Total Movimientos", sala.historial.total)
+                    
+                    with col_stat3:
+                        st.metric("Sin Arnés", sala.sin_arnes)
+                
+                else:
+                    st.info("👥 No hay estudiantes conectados aún. Comparte el código de la sala para que se unan.")
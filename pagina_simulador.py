@@ -0,0 +1,316 @@
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from figuras import figura_escenario
+from metricas import metricas
+from telemetria import ALTURA_ESCENARIO, FRECUENCIA_DEFECTO, CanalTelemetria
+
+# =============================================
+# SECCIÓN: SIMULADOR ORIGINAL - MEJORADA
+# =============================================
+# Única página que usa matplotlib/PIL (figuras): este módulo se importa
+# recién la primera vez que se abre. pandas solo se carga al graficar la
+# telemetría (ver serie_telemetria).
+
+# Tras "Simular Caída" la página se recarga sola cada REVISION_DETECCION
+# segundos hasta que el detector confirma la caída (o vence PLAZO_DETECCION)
+REVISION_DETECCION = 0.3
+PLAZO_DETECCION = 5.0
+
+
+def serie_telemetria(ventanas, columnas):
+    # columnas: {nombre en la gráfica: campo de la ventana}
+    import pandas as pd
+
+    return pd.DataFrame({nombre: ventanas[campo] for nombre, campo in columnas.items()},
+                        index=pd.to_datetime(ventanas['t'], unit='s'))
+
+
+@st.fragment(run_every=REVISION_DETECCION)
+def esperar_deteccion(canal):
+    st.caption("📡 Esperando la detección de la caída...")
+    canal.avanzar()
+    vencido = time.time() > st.session_state.get("deteccion_hasta", 0)
+    if len(canal.caidas_detectadas) > st.session_state.get("caidas_avisadas", 0) or vencido:
+        st.session_state.pop("deteccion_hasta", None)
+        st.rerun(scope="app")
+
+
+def mostrar(almacen, motor_simulacion):
+    st.header("🎮 Simulador de Arnés Inteligente - Modo Individual")
+    
+    # Configuración inicial
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.subheader("⚙️ Configuración del Trabajador")
+        
+        # Información básica
+        trabajador_nombre = st.text_input("Nombre del trabajador", "Carlos Rodríguez")
+        trabajador_edad = st.slider("Edad", 18, 65, 35)
+        trabajador_experiencia = st.selectbox("Experiencia en alturas", 
+                                            ["Principiante (<1 año)", "Intermedio (1-3 años)", "Avanzado (>3 años)"])
+        
+        # Condiciones de salud
+        st.subheader("🏥 Condiciones de Salud")
+        condiciones_salud = st.multiselect("Selecciona condiciones relevantes:",
+                                         ["Vértigo", "Mareos", "Problemas cardíacos", "Diabetes", 
+                                          "Problemas de espalda", "Ninguna"])
+        
+        # Equipamiento
+        st.subheader("🛠️ Equipamiento")
+        epp_equipado = st.multiselect("EPP utilizado:",
+                                    ["Arnés de seguridad", "Casco", "Botas de seguridad", 
+                                     "Guantes", "Gafas de protección", "Línea de vida"])
+        
+    with col2:
+        st.subheader("🎯 Estado Actual")
+        
+        # Canal de telemetría del trabajador: vive en la sesión y se recrea
+        # solo si cambian la frecuencia de muestreo o la altura del escenario
+        frecuencia_muestreo = st.slider("Frecuencia de muestreo (Hz)", 50, 100, FRECUENCIA_DEFECTO, step=10)
+        altura_trabajo = ALTURA_ESCENARIO.get(st.session_state.get("escenario_individual"), 12.0)
+        canal = st.session_state.get("telemetria")
+        if canal is None or (canal.frecuencia, canal.altura) != (frecuencia_muestreo, altura_trabajo):
+            canal = st.session_state.telemetria = CanalTelemetria(frecuencia_muestreo, altura_trabajo)
+            st.session_state.caidas_avisadas = 0
+
+        # Botón de inicio de simulación
+        if st.button("🎬 Iniciar Simulación", type="primary", use_container_width=True):
+            st.session_state.simulation_running = True
+            st.session_state.simulation_start_time = datetime.now()
+            canal = st.session_state.telemetria = CanalTelemetria(frecuencia_muestreo, altura_trabajo)
+            st.session_state.caidas_avisadas = 0
+            st.success("Simulación iniciada!")
+            
+        if st.button("⏹️ Detener Simulación", use_container_width=True):
+            st.session_state.simulation_running = False
+            st.warning("Simulación detenida")
+        
+        # Estado de la simulación
+        if st.session_state.get('simulation_running', False):
+            st.success("🟢 SIMULACIÓN ACTIVA")
+            tiempo_transcurrido = datetime.now() - st.session_state.simulation_start_time
+            st.metric("Tiempo transcurrido", f"{int(tiempo_transcurrido.total_seconds())} seg")
+        else:
+            st.info("⏸️ SIMULACIÓN DETENIDA")
+        
+        # Métricas en tiempo real: promedio de la última ventana de 1 s y
+        # variación frente a la de 10 s antes
+        if st.session_state.get('simulation_running', False):
+            with metricas.medir("simulador.telemetria"):
+                canal.avanzar()
+        # Caídas que el detector confirmó desde el último render
+        caidas_nuevas = canal.caidas_detectadas[st.session_state.get("caidas_avisadas", 0):]
+        st.session_state.caidas_avisadas = len(canal.caidas_detectadas)
+        for _, _, impacto in caidas_nuevas:
+            almacen.registrar_caida(fecha=impacto)
+        recientes = canal.ventanas.ultimos(11)
+        if len(recientes):
+            actual, anterior = recientes[-1], recientes[0]
+            st.metric("Ritmo cardíaco", f"{actual['ritmo']:.0f} lpm",
+                      delta=f"{actual['ritmo'] - anterior['ritmo']:+.1f}")
+            st.metric("Oxígeno en sangre", f"{actual['spo2']:.1f}%",
+                      delta=f"{actual['spo2'] - anterior['spo2']:+.2f}")
+            st.metric("Temperatura corporal", f"{actual['temperatura']:.1f}°C",
+                      delta=f"{actual['temperatura'] - anterior['temperatura']:+.2f}")
+        else:
+            st.metric("Ritmo cardíaco", "-- lpm")
+            st.metric("Oxígeno en sangre", "--%")
+            st.metric("Temperatura corporal", "--°C")
+        
+        # Estado del arnés
+        estado_arnes = st.selectbox("Estado del arnés", 
+                                  ["Correctamente ajustado", "Ajuste deficiente", "No verificado"])
+        
+        if estado_arnes != "Correctamente ajustado":
+            st.error("⚠️ Verificar ajuste del arnés")
+        else:
+            st.success("✅ Arnés correctamente ajustado")
+    
+    # Series de la telemetría (últimos 2 minutos de ventanas ya generadas)
+    if len(canal.ventanas):
+        with metricas.medir("simulador.graficas"):
+            st.markdown("---")
+            st.subheader("📡 Telemetría del Arnés")
+            ventanas = canal.ventanas.ultimos(120)
+            col_tel1, col_tel2 = st.columns(2)
+            with col_tel1:
+                st.caption(f"Signos vitales · {canal.frecuencia} Hz")
+                st.line_chart(serie_telemetria(ventanas, {"Ritmo cardíaco": 'ritmo', "SpO2": 'spo2'}))
+            with col_tel2:
+                st.caption("Aceleración (m/s²) y altitud (m)")
+                st.line_chart(serie_telemetria(ventanas, {"Aceleración máx.": 'aceleracion_maxima',
+                                                          "Aceleración mín.": 'aceleracion_minima',
+                                                          "Altitud": 'altitud'}))
+    
+    # Simulación de escenario
+    st.markdown("---")
+    st.subheader("🏗️ Simulación de Escenario de Trabajo")
+    
+    escenario = st.selectbox("Selecciona el escenario de trabajo:",
+                           ["Andamios en fachada", "Estructura metálica", "Torre de comunicación", 
+                            "Trabajos en cubierta", "Espacios confinados verticales"],
+                           key="escenario_individual")
+    
+    # Visualización del escenario MEJORADA
+    col_viz1, col_viz2 = st.columns([2, 1])
+    
+    with col_viz1:
+        # Fondo del escenario renderizado una sola vez (LRU de PNG) y, encima,
+        # la capa del trabajador: nombre, línea de vida y descenso tras una caída
+        ultima_muestra = canal.crudas.ultimo()
+        descenso = 0.0
+        if ultima_muestra is not None:
+            descenso = min(1.5, max(0.0, (canal.altura - float(ultima_muestra['altitud'])) / 3))
+        linea_de_vida = "Línea de vida" in epp_equipado or "Arnés de seguridad" in epp_equipado
+        with metricas.medir("simulador.figura"):
+            st.image(figura_escenario(escenario, trabajador_nombre, linea_de_vida, descenso), width="stretch")
+    
+    with col_viz2:
+        st.subheader("📊 Análisis de Riesgos")
+        
+        # Evaluar riesgos basados en la configuración
+        riesgos = []
+        recomendaciones = []
+        
+        if "Vértigo" in condiciones_salud and "Andamios" in escenario:
+            riesgos.append("🦘 Alto riesgo por vértigo en altura")
+            recomendaciones.append("• Evaluar aptitud médica para trabajo en altura")
+            
+        if "Principiante" in trabajador_experiencia:
+            riesgos.append("🎓 Experiencia limitada - supervisión requerida")
+            recomendaciones.append("• Asignar supervisor experimentado")
+            recomendaciones.append("• Realizar entrenamiento adicional")
+            
+        if "Arnés de seguridad" not in epp_equipado:
+            riesgos.append("🪂 CRÍTICO: Arnés de seguridad no equipado")
+            recomendaciones.append("• SUSPENDER TRABAJO hasta equipar arnés")
+            
+        if "Línea de vida" not in epp_equipado and "Andamios" in escenario:
+            riesgos.append("🔗 Sistema de anclaje recomendado")
+            recomendaciones.append("• Instalar línea de vida continua")
+            
+        if trabajador_edad > 55:
+            riesgos.append("👴 Mayor riesgo de fatiga - pausas frecuentes")
+            recomendaciones.append("• Programar pausas cada 45 minutos")
+            
+        if "Torre" in escenario:
+            recomendaciones.extend([
+                "• Verificar condiciones climáticas",
+                "• Usar equipo anticaídas certificado", 
+                "• Comunicación constante con base",
+                "• Verificar anclajes estructurales"
+            ])
+            
+        if "Estructura" in escenario:
+            recomendaciones.extend([
+                "• Inspeccionar puntos de soldadura",
+                "• Verificar estabilidad de componentes",
+                "• Delimitar área de trabajo"
+            ])
+        
+        # Mostrar riesgos
+        if len(riesgos) > 0:
+            st.error("🚨 **Riesgos Detectados:**")
+            for riesgo in riesgos:
+                st.write(f"• {riesgo}")
+        else:
+            st.success("✅ **Sin riesgos críticos detectados**")
+            
+        # Mostrar recomendaciones
+        st.subheader("💡 Recomendaciones de Seguridad")
+        for recomendacion in recomendaciones[:6]:  # Mostrar máximo 6 recomendaciones
+            st.write(recomendacion)
+    
+    # Sistema de alertas y controles
+    st.markdown("---")
+    st.subheader("🎮 Controles de Simulación")
+    
+    col_control1, col_control2, col_control3, col_control4 = st.columns(4)
+    
+    with col_control1:
+        # El botón solo inyecta la caída en el acelerómetro; la alerta sale
+        # cuando el detector la confirma (esperar_deteccion recarga hasta entonces)
+        if st.button("🔴 Simular Caída", type="secondary", use_container_width=True):
+            st.session_state.fall_count += 1
+            canal.inyectar_caida()
+            if st.session_state.get('simulation_running', False):
+                st.session_state.deteccion_hasta = time.time() + PLAZO_DETECCION
+            else:
+                st.warning("Inicia la simulación para que el arnés transmita datos")
+        if caidas_nuevas:
+            st.session_state.pop("deteccion_hasta", None)
+            st.error(f"""
+            🚨 **¡ALERTA DE CAÍDA DETECTADA!**
+            
+            **Latencia de detección:** {canal.detector.latencias[-1]:.2f} s
+            
+            **Acciones automáticas:**
+            • Bloqueo instantáneo del arnés
+            • Notificación a supervisores
+            • Activación de protocolo de rescate
+            • Envío de ubicación GPS
+            """)
+        elif st.session_state.get("deteccion_hasta") and st.session_state.get('simulation_running', False):
+            esperar_deteccion(canal)
+            
+    with col_control2:
+        if st.button("🟡 Simular Mal Ajuste", type="secondary", use_container_width=True):
+            st.warning("""
+            ⚠️ **ARNÉS MAL AJUSTADO**
+            
+            **Recomendaciones:**
+            • Verificar ajuste de piernas
+            • Revisar hebilla pectoral
+            • Ajustar cintas sobrantes
+            """)
+            
+    with col_control3:
+        if st.button("🟢 Condiciones Normales", type="secondary", use_container_width=True):
+            st.success("""
+            ✅ **CONDICIONES NORMALES**
+            
+            **Estado del sistema:**
+            • Monitoreo activo
+            • Comunicación estable
+            • Equipamiento correcto
+            """)
+            
+    with col_control4:
+        if st.button("📊 Generar Reporte", type="secondary", use_container_width=True):
+            st.info("""
+            📋 **REPORTE DE SIMULACIÓN**
+            
+            **Datos recopilados:**
+            • Tiempo de simulación: Activo
+            • Alertas generadas: Sí
+            • Riesgos identificados: {}
+            """.format(len(riesgos)))
+    
+    # Métricas de la simulación
+    st.markdown("---")
+    st.subheader("📈 Métricas de la Simulación")
+    
+    col_metric1, col_metric2, col_metric3, col_metric4 = st.columns(4)
+    
+    with col_metric1:
+        st.metric("Caídas simuladas", st.session_state.fall_count)
+        st.metric("Caídas detectadas", canal.detector.detectadas)
+        
+    with col_metric2:
+        st.metric("Riesgos detectados", len(riesgos))
+        
+    with col_metric3:
+        st.metric("Nivel de seguridad", 
+                 f"{max(0, 100 - len(riesgos)*15)}%",
+                 delta=f"-{len(riesgos)*15}%" if riesgos else "+0%")
+        
+    with col_metric4:
+        if st.session_state.get('simulation_running', False):
+            tiempo = datetime.now() - st.session_state.simulation_start_time
+            st.metric("Tiempo activo", f"{int(tiempo.total_seconds())}s")
+        else:
+            st.metric("Tiempo activo", "0s")
@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import threading
+
+import numpy as np
+
+from historial import DTYPE_MOVIMIENTO
+from modelos import ID_ZONA, ZONAS, Estudiante, Sala
+from riesgos import codigos_riesgos
+
+# =============================================
+# PERSISTENCIA OPCIONAL EN SQLITE
+# =============================================
+# El almacén en memoria sigue siendo el camino de lectura; SQLite solo guarda
+# una copia para sobrevivir a reinicios y consultar clases terminadas.
+# - Modo WAL: los lectores no bloquean al escritor del tick de movimiento.
+# - Una conexión por hilo (el motor de simulación y cada hilo de Streamlit).
+# - Sentencias fijas con parámetros: sqlite3 las guarda compiladas por conexión.
+# - Cada tick escribe todos sus movimientos en una sola transacción.
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS salas (
+    sala_id TEXT PRIMARY KEY,
+    codigo TEXT NOT NULL,
+    activa INTEGER NOT NULL,
+    simulacion_iniciada INTEGER NOT NULL,
+    semilla INTEGER,
+    intervalo_movimiento INTEGER NOT NULL,
+    fecha_creacion TEXT NOT NULL,
+    ultimo_tick TEXT,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS estudiantes (
+    id TEXT PRIMARY KEY,
+    sala_id TEXT NOT NULL REFERENCES salas(sala_id),
+    indice INTEGER NOT NULL,
+    ubicacion INTEGER NOT NULL,
+    riesgos_detectados INTEGER NOT NULL,
+    revision INTEGER NOT NULL,
+    ultimo_movimiento TEXT,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS estudiantes_por_sala ON estudiantes(sala_id, indice);
+CREATE TABLE IF NOT EXISTS movimientos (
+    sala_id TEXT NOT NULL,
+    estudiante INTEGER NOT NULL,
+    desde INTEGER NOT NULL,
+    hacia INTEGER NOT NULL,
+    fecha REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS movimientos_por_sala ON movimientos(sala_id, fecha);
+CREATE TABLE IF NOT EXISTS riesgos (
+    estudiante_id TEXT NOT NULL,
+    codigo INTEGER NOT NULL,
+    fecha REAL NOT NULL,
+    PRIMARY KEY (estudiante_id, codigo)
+);
+"""
+
+CAMPOS_DATOS_SALA = ('monitor_nombre', 'empresa', 'telefono_monitor', 'tipo_escenario', 'nivel_dificultad', 'max_estudiantes',
+                     'duracion', 'condiciones_climaticas', 'riesgos_activados', 'descripcion_escenario',
+                     'simular_sensores')
+CAMPOS_DATOS_ESTUDIANTE = ('nombre', 'tipo_personaje', 'peso', 'altura', 'edad', 'experiencia', 'institucion',
+                           'telefono', 'email', 'tono_piel', 'cabello', 'complexion', 'condiciones_salud',
+                           'herramientas', 'epp', 'fecha_union')
+
+SQL_GUARDAR_SALA = """
+INSERT OR REPLACE INTO salas (sala_id, codigo, activa, simulacion_iniciada, semilla,
+                              intervalo_movimiento, fecha_creacion, ultimo_tick, datos)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_GUARDAR_ESTUDIANTE = """
+INSERT OR REPLACE INTO estudiantes (id, sala_id, indice, ubicacion, riesgos_detectados,
+                                    revision, ultimo_movimiento, datos)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_ACTUALIZAR_ESTADO = """
+UPDATE estudiantes SET ubicacion = ?, riesgos_detectados = ?, revision = ?, ultimo_movimiento = ?
+WHERE id = ?
+"""
+SQL_ACTUALIZAR_TICK = "UPDATE salas SET ultimo_tick = ? WHERE sala_id = ?"
+SQL_MOVIMIENTO = "INSERT INTO movimientos (sala_id, estudiante, desde, hacia, fecha) VALUES (?, ?, ?, ?, ?)"
+SQL_RIESGO = "INSERT OR IGNORE INTO riesgos (estudiante_id, codigo, fecha) VALUES (?, ?, ?)"
+SQL_BORRAR_RIESGOS_SALA = "DELETE FROM riesgos WHERE estudiante_id IN (SELECT id FROM estudiantes WHERE sala_id = ?)"
+
+
+def _a_json(objeto, campos):
+    datos = {}
+    for campo in campos:
+        valor = getattr(objeto, campo)
+        datos[campo] = list(valor) if isinstance(valor, tuple) else valor
+    return json.dumps(datos, ensure_ascii=False)
+
+
+class PersistenciaSQLite:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        with self.conexion() as conexion:
+            conexion.executescript(ESQUEMA)
+
+    def conexion(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=10, check_same_thread=False)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def cerrar(self):
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+
+    # ---------- escritura ----------
+
+    def guardar_sala(self, sala):
+        with self.conexion() as conexion:
+            conexion.execute(SQL_GUARDAR_SALA, (
+                sala.sala_id, sala.codigo, int(sala.activa), int(sala.simulacion_iniciada), sala.semilla,
+                sala.intervalo_movimiento, sala.fecha_creacion, sala.ultimo_tick,
+                _a_json(sala, CAMPOS_DATOS_SALA),
+            ))
+
+    def guardar_estudiantes(self, estudiantes):
+        with self.conexion() as conexion:
+            conexion.executemany(SQL_GUARDAR_ESTUDIANTE, [
+                (e.id, e.sala_id, e.indice, ID_ZONA[e.ubicacion_actual], e.riesgos_detectados,
+                 e.revision, e.ultimo_movimiento, _a_json(e, CAMPOS_DATOS_ESTUDIANTE))
+                for e in estudiantes
+            ])
+            conexion.executemany(SQL_RIESGO, [
+                (e.id, codigo, fecha) for e in estudiantes for codigo, fecha in e.riesgos_desde.items()
+            ])
+
+    def guardar_estado(self, estudiantes):
+        # Zona, riesgos y revisión de estudiantes ya guardados (sin reescribir el perfil)
+        with self.conexion() as conexion:
+            conexion.executemany(SQL_ACTUALIZAR_ESTADO, [
+                (ID_ZONA[e.ubicacion_actual], e.riesgos_detectados, e.revision, e.ultimo_movimiento, e.id)
+                for e in estudiantes
+            ])
+
+    def guardar_tick(self, sala, estudiantes, cambios, fecha):
+        # Un tick completo = una transacción: movimientos, estado y riesgos nuevos
+        with self.conexion() as conexion:
+            conexion.execute(SQL_ACTUALIZAR_TICK, (sala.ultimo_tick, sala.sala_id))
+            conexion.executemany(SQL_MOVIMIENTO, [
+                (sala.sala_id, estudiantes[est_id].indice, ID_ZONA[desde], ID_ZONA[hacia], fecha)
+                for est_id, desde, hacia, _ in cambios
+            ])
+            conexion.executemany(SQL_ACTUALIZAR_ESTADO, [
+                (ID_ZONA[hacia], estudiantes[est_id].riesgos_detectados, estudiantes[est_id].revision,
+                 estudiantes[est_id].ultimo_movimiento, est_id)
+                for est_id, _, hacia, _ in cambios
+            ])
+            conexion.executemany(SQL_RIESGO, [
+                (est_id, codigo, fecha)
+                for est_id, _, _, nuevos in cambios if nuevos
+                for codigo in codigos_riesgos(nuevos)
+            ])
+
+    def borrar_riesgos_sala(self, sala_id):
+        with self.conexion() as conexion:
+            conexion.execute(SQL_BORRAR_RIESGOS_SALA, (sala_id,))
+
+    # ---------- lectura ----------
+
+    def cargar_salas_activas(self, capacidad_historial=None):
+        # Devuelve [(sala, [estudiantes], movimientos recientes, movimientos por estudiante)]
+        conexion = self.conexion()
+        resultado = []
+        for fila in conexion.execute(
+                "SELECT sala_id, codigo, activa, simulacion_iniciada, semilla, intervalo_movimiento, "
+                "fecha_creacion, ultimo_tick, datos FROM salas WHERE activa = 1"):
+            sala_id, codigo, activa, iniciada, semilla, intervalo, fecha_creacion, ultimo_tick, datos = fila
+            datos = json.loads(datos)
+            datos['riesgos_activados'] = tuple(datos.get('riesgos_activados', ()))
+            sala = Sala(sala_id=sala_id, codigo=codigo, activa=bool(activa), simulacion_iniciada=bool(iniciada),
+                        semilla=semilla, intervalo_movimiento=intervalo, fecha_creacion=fecha_creacion,
+                        ultimo_tick=ultimo_tick, **datos)
+            estudiantes = self._cargar_estudiantes(conexion, sala_id)
+            movimientos, conteos = self._cargar_movimientos(conexion, sala_id, len(estudiantes),
+                                                            capacidad_historial)
+            resultado.append((sala, estudiantes, movimientos, conteos))
+        return resultado
+
+    def _cargar_estudiantes(self, conexion, sala_id):
+        riesgos = {}
+        for est_id, codigo, fecha in conexion.execute(
+                "SELECT r.estudiante_id, r.codigo, r.fecha FROM riesgos r "
+                "JOIN estudiantes e ON e.id = r.estudiante_id WHERE e.sala_id = ?", (sala_id,)):
+            riesgos.setdefault(est_id, {})[codigo] = fecha
+
+        estudiantes = []
+        for est_id, indice, ubicacion, mascara, revision, ultimo_movimiento, datos in conexion.execute(
+                "SELECT id, indice, ubicacion, riesgos_detectados, revision, ultimo_movimiento, datos "
+                "FROM estudiantes WHERE sala_id = ? ORDER BY indice", (sala_id,)):
+            estudiante = Estudiante(id=est_id, sala_id=sala_id, indice=indice, ubicacion_actual=ZONAS[ubicacion],
+                                    riesgos_detectados=mascara, revision=revision,
+                                    ultimo_movimiento=ultimo_movimiento or "", **json.loads(datos))
+            estudiante.riesgos_desde = riesgos.get(est_id, {})
+            estudiantes.append(estudiante)
+        return estudiantes
+
+    def _cargar_movimientos(self, conexion, sala_id, n_estudiantes, limite):
+        conteos = np.zeros(n_estudiantes, dtype=np.int64)
+        for estudiante, cantidad in conexion.execute(
+                "SELECT estudiante, COUNT(*) FROM movimientos WHERE sala_id = ? GROUP BY estudiante", (sala_id,)):
+            if estudiante < n_estudiantes:
+                conteos[estudiante] = cantidad
+        consulta = ("SELECT estudiante, desde, hacia, fecha FROM movimientos WHERE sala_id = ? "
+                    "ORDER BY fecha DESC, rowid DESC")
+        parametros = (sala_id,)
+        if limite is not None:
+            consulta += " LIMIT ?"
+            parametros += (limite,)
+        filas = conexion.execute(consulta, parametros).fetchall()
+        filas.reverse()
+        movimientos = np.array(filas, dtype=DTYPE_MOVIMIENTO) if filas else np.zeros(0, dtype=DTYPE_MOVIMIENTO)
+        return movimientos, conteos
+
@@ -0,0 +1,211 @@
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from almacen import AlmacenSimulacion
+from modelos import Condicion, Epp, Estudiante, Herramienta, Perfil
+from persistencia import PersistenciaSQLite
+from riesgos import MASCARA_AUTOMATICOS, acumular_riesgos, evaluar_riesgos_memorizados
+from simulacion import INTERVALO_MOVIMIENTO, MotorSimulacion, ZONA_INICIAL
+
+try:
+    import resource
+except ImportError:  # Windows: sin pico de memoria del proceso
+    resource = None
+
+# =============================================
+# PRUEBA DE CARGA SIN NAVEGADOR
+# =============================================
+# Dos fases sobre los mismos datos:
+#   1. núcleo: crea N salas con M estudiantes de perfil aleatorio y avanza el
+#      motor con un reloj simulado durante un turno completo (sin esperas)
+#   2. monitor: abre app.py con AppTest contra la misma base SQLite y mide
+#      cada rerun de "Salas Activas" con paneles de sala abiertos
+# Informa percentiles de latencia por tick y por rerun y el pico de memoria.
+#
+#   python prueba_carga.py --salas 50 --estudiantes 30 --turno 8 --reruns 30
+
+PAGINA_MONITOR = "📊 Salas Activas"
+PERCENTILES = (50, 90, 95, 99)
+ESCENARIOS = ["Obra en construcción", "Edificio en altura", "Planta industrial", "Torre de telecomunicaciones"]
+EXPERIENCIAS = ["Ninguna", "Menos de 1 año", "1-3 años", "3-5 años", "Más de 5 años"]
+
+
+def estudiante_aleatorio(generador, sala_id, numero):
+    estudiante = Estudiante(
+        id=f"{sala_id}-{numero}",
+        nombre=f"Estudiante {numero}",
+        tipo_personaje=generador.choice(list(Perfil)),
+        peso=generador.randint(45, 120),
+        altura=generador.randint(150, 195),
+        edad=generador.randint(18, 65),
+        experiencia=generador.choice(EXPERIENCIAS),
+        institucion="Prueba de carga",
+        condiciones_salud=generador.sample(list(Condicion), generador.randint(0, 2)),
+        herramientas=generador.sample(list(Herramienta), generador.randint(0, 3)),
+        epp=generador.sample(list(Epp), generador.randint(0, len(Epp))),
+        sala_id=sala_id,
+        ubicacion_actual=ZONA_INICIAL,
+        ultimo_movimiento=datetime.now().strftime("%H:%M:%S"),
+        fecha_union=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    # Igual que el registro desde la página: riesgos iniciales antes de publicar
+    evaluacion = evaluar_riesgos_memorizados(estudiante, estudiante.ubicacion_actual)
+    acumular_riesgos(estudiante, evaluacion.mascara & MASCARA_AUTOMATICOS, time.time())
+    return estudiante
+
+
+def poblar(almacen, n_salas, n_estudiantes, intervalo, generador):
+    for numero in range(n_salas):
+        sala = almacen.crear_sala(monitor_nombre=f"Monitor {numero}", empresa="Prueba de carga",
+                                  tipo_escenario=generador.choice(ESCENARIOS), max_estudiantes=n_estudiantes,
+                                  intervalo_movimiento=intervalo, semilla=generador.getrandbits(32))
+        if sala is None:
+            raise RuntimeError(f"No quedan códigos de sala libres (se crearon {numero})")
+        for i in range(n_estudiantes):
+            almacen.registrar_estudiante(sala.sala_id, estudiante_aleatorio(generador, sala.sala_id, i))
+        almacen.actualizar_sala(sala.sala_id, simulacion_iniciada=True)
+
+
+def percentiles(latencias):
+    if not latencias:
+        return None
+    valores = np.asarray(latencias) * 1000
+    resumen = {f"p{p}": round(float(np.percentile(valores, p)), 2) for p in PERCENTILES}
+    resumen['maximo'] = round(float(valores.max()), 2)
+    resumen['muestras'] = len(valores)
+    return resumen
+
+
+def memoria_pico_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB, macOS bytes
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def fase_nucleo(almacen, horas, intervalo):
+    # El reloj avanza de un intervalo en un intervalo: cada paso mueve todas las salas
+    motor = MotorSimulacion(almacen)
+    latencias = []
+    movimientos = 0
+    pasos = int(horas * 3600 / intervalo)
+    reloj = 0.0
+    motor.paso(reloj)
+    for _ in range(pasos):
+        reloj += intervalo
+        inicio = time.perf_counter()
+        movimientos += motor.paso(reloj)
+        latencias.append(time.perf_counter() - inicio)
+    return {'ticks': percentiles(latencias), 'pasos': pasos, 'movimientos': movimientos,
+            'segundos': round(sum(latencias), 2)}
+
+
+def fase_monitor(ruta_app, salas, reruns, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    prueba = AppTest.from_file(ruta_app, default_timeout=timeout)
+    inicio = time.perf_counter()
+    prueba.run()
+    primera = time.perf_counter() - inicio
+    prueba.sidebar.selectbox[0].select(PAGINA_MONITOR).run()
+    if prueba.exception:
+        raise RuntimeError(f"La página del monitor falló: {prueba.exception[0].value}")
+
+    latencias = []
+    for i in range(reruns):
+        # Un panel distinto en cada rerun, como un monitor revisando salas
+        prueba.session_state[f"panel_{salas[i % len(salas)]}"] = True
+        inicio = time.perf_counter()
+        prueba.run()
+        latencias.append(time.perf_counter() - inicio)
+        if prueba.exception:
+            raise RuntimeError(f"La página del monitor falló: {prueba.exception[0].value}")
+    return {'primer_render_ms': round(primera * 1000, 2), 'reruns': percentiles(latencias)}
+
+
+def ejecutar(salas=50, estudiantes=30, horas=8.0, intervalo=INTERVALO_MOVIMIENTO, reruns=30, semilla=0,
+             con_monitor=True, timeout=120):
+    generador = random.Random(semilla)
+    directorio = tempfile.mkdtemp(prefix="arnes-carga-")
+    ruta_sqlite = os.path.join(directorio, "salas.db")
+    almacen = AlmacenSimulacion(persistencia=PersistenciaSQLite(ruta_sqlite))
+
+    inicio = time.perf_counter()
+    poblar(almacen, salas, estudiantes, intervalo, generador)
+    informe = {
+        'parametros': {'salas': salas, 'estudiantes': estudiantes, 'horas': horas, 'intervalo': intervalo,
+                       'reruns': reruns, 'semilla': semilla},
+        'poblar_segundos': round(time.perf_counter() - inicio, 2),
+    }
+    informe['nucleo'] = fase_nucleo(almacen, horas, intervalo)
+    informe['contadores_inconsistentes'] = almacen.verificar_contadores()
+    informe['memoria_nucleo_mb'] = memoria_pico_mb()
+
+    if con_monitor:
+        ids = list(almacen.salas)
+        del almacen
+        gc.collect()
+        # La app hidrata su almacén desde la misma base al primer render
+        os.environ["ARNES_SQLITE"] = ruta_sqlite
+        ruta_app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+        informe['monitor'] = fase_monitor(ruta_app, ids, reruns, timeout)
+        informe['memoria_total_mb'] = memoria_pico_mb()
+    return informe
+
+
+def imprimir(informe):
+    parametros = informe['parametros']
+    print(f"Salas: {parametros['salas']} x {parametros['estudiantes']} estudiantes · "
+          f"turno de {parametros['horas']} h cada {parametros['intervalo']} s")
+    print(f"Poblar: {informe['poblar_segundos']} s")
+    nucleo = informe['nucleo']
+    print(f"Ticks del motor ({nucleo['pasos']} pasos, {nucleo['movimientos']} movimientos, "
+          f"{nucleo['segundos']} s): {_formato(nucleo['ticks'])}")
+    if informe['contadores_inconsistentes']:
+        print(f"⚠️ Contadores inconsistentes: {informe['contadores_inconsistentes']}")
+    print(f"Memoria pico tras el núcleo: {informe['memoria_nucleo_mb']} MB")
+    if 'monitor' in informe:
+        monitor = informe['monitor']
+        print(f"Monitor: primer render {monitor['primer_render_ms']} ms · reruns {_formato(monitor['reruns'])}")
+        print(f"Memoria pico total: {informe['memoria_total_mb']} MB")
+
+
+def _formato(resumen):
+    if resumen is None:
+        return "sin muestras"
+    return " · ".join(f"{clave} {valor} ms" for clave, valor in resumen.items() if clave != 'muestras')
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga sin navegador de las salas multijugador")
+    parser.add_argument("--salas", type=int, default=50)
+    parser.add_argument("--estudiantes", type=int, default=30, help="estudiantes por sala")
+    parser.add_argument("--turno", type=float, default=8.0, help="horas simuladas")
+    parser.add_argument("--intervalo", type=int, default=INTERVALO_MOVIMIENTO, help="segundos entre ticks")
+    parser.add_argument("--reruns", type=int, default=30, help="reruns medidos de la página del monitor")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-monitor", action="store_true", help="solo mide el núcleo, sin AppTest")
+    parser.add_argument("--json", help="guarda el informe en este archivo")
+    opciones = parser.parse_args(argumentos)
+
+    informe = ejecutar(opciones.salas, opciones.estudiantes, opciones.turno, opciones.intervalo,
+                       opciones.reruns, opciones.semilla, con_monitor=not opciones.sin_monitor)
+    imprimir(informe)
+    if opciones.json:
+        with open(opciones.json, 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    return informe
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import csv
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+
+from almacen import AlmacenSimulacion
+from figuras import figura_escenario, renderizar_fondo
+from importacion import PLANTILLA, importar_nomina
+from modelos import ZONAS
+from prueba_carga import estudiante_aleatorio, poblar
+from riesgos import (evaluar_estudiantes, evaluar_riesgo_caida, evaluar_riesgo_sobrecarga,
+                     evaluar_riesgos_automaticos, evaluar_riesgos_memorizados)
+from simulacion import INTERVALO_MOVIMIENTO, MotorSimulacion, mover_sala
+
+# =============================================
+# MICRO-BENCHMARKS DE LOS CAMINOS CALIENTES
+# =============================================
+# Cada caso se mide con repeticiones de un número fijo de llamadas y se
+# guarda la mediana y el mínimo por llamada. Los resultados van a un JSON con
+# clave "caso[parámetros]" para comparar corridas; con --base se compara
+# contra una corrida anterior y el proceso termina con código 1 si algún caso
+# empeora más que el umbral.
+#
+#   python rendimiento.py --salas 10 50 200 --estudiantes 10 30 --json actual.json
+#   python rendimiento.py --base actual.json --umbral 0.25
+
+REPETICIONES = 7
+SEGUNDOS_OBJETIVO = 0.05
+UMBRAL_REGRESION = 0.25
+ESCENARIOS_FIGURA = ["Andamios en fachada", "Estructura metálica", "Torre de comunicación", "Trabajos en cubierta"]
+
+
+def medir(funcion, repeticiones=REPETICIONES, objetivo=SEGUNDOS_OBJETIVO):
+    # Calibra cuántas llamadas caben en 'objetivo' segundos (como timeit) y
+    # devuelve microsegundos por llamada
+    funcion()
+    llamadas = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        duracion = time.perf_counter() - inicio
+        if duracion >= objetivo or llamadas >= 1 << 20:
+            break
+        llamadas *= 2 if duracion == 0 else max(2, min(10, int(objetivo / duracion) + 1))
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / llamadas * 1e6)
+    return {'mediana_us': round(statistics.median(tiempos), 3), 'minimo_us': round(min(tiempos), 3),
+            'llamadas': llamadas, 'repeticiones': repeticiones}
+
+
+def casos_riesgos(estudiantes):
+    # Una clase completa por llamada: el costo que paga la página por sala
+    generador = random.Random(len(estudiantes))
+    ubicaciones = [generador.choice(ZONAS) for _ in estudiantes]
+    pares = list(zip(estudiantes, ubicaciones))
+    return {
+        'evaluar_riesgos_automaticos': lambda: [evaluar_riesgos_automaticos(e, u) for e, u in pares],
+        'evaluar_riesgo_caida': lambda: [evaluar_riesgo_caida(e, u) for e, u in pares],
+        'evaluar_riesgo_sobrecarga': lambda: [evaluar_riesgo_sobrecarga(e) for e in estudiantes],
+        'evaluar_riesgos_memorizados': lambda: [evaluar_riesgos_memorizados(e, u) for e, u in pares],
+        'evaluar_estudiantes': lambda: evaluar_estudiantes(estudiantes, ubicaciones),
+    }
+
+
+def casos_sala(n_estudiantes):
+    # Un tick de movimiento de una sala (antes simular_movimiento_continuo)
+    almacen = AlmacenSimulacion()
+    poblar(almacen, 1, n_estudiantes, INTERVALO_MOVIMIENTO, random.Random(n_estudiantes))
+    sala_id = next(iter(almacen.salas))
+    generador = np.random.default_rng(0)
+
+    def tick():
+        with almacen.modificar_sala(sala_id) as sala:
+            mover_sala(almacen, sala, datetime.now(), generador)
+
+    estudiantes = [almacen.estudiantes[est_id] for est_id in almacen.salas[sala_id].estudiantes]
+    return tick, estudiantes
+
+
+def casos_almacen(n_salas, n_estudiantes):
+    almacen = AlmacenSimulacion()
+    poblar(almacen, n_salas, n_estudiantes, INTERVALO_MOVIMIENTO, random.Random(n_salas))
+    codigos = [sala.codigo for sala in almacen.salas.values()]
+    motor = MotorSimulacion(almacen)
+    reloj = [0.0]
+    motor.paso(reloj[0])
+
+    def paso_motor():
+        # Avanza un intervalo completo: todas las salas mueven en este paso
+        reloj[0] += INTERVALO_MOVIMIENTO
+        motor.paso(reloj[0])
+
+    return {
+        'buscar_sala_por_codigo': lambda: [almacen.buscar_sala_por_codigo(codigo) for codigo in codigos],
+        'paso_motor': paso_motor,
+    }
+
+
+def casos_importacion(n_estudiantes):
+    # Nómina completa en CSV hacia una sala vacía: lectura, validación, lote de riesgos y registro
+    generador = random.Random(n_estudiantes)
+    salida = io.StringIO()
+    escritor = csv.writer(salida)
+    escritor.writerow(PLANTILLA)
+    for i in range(n_estudiantes):
+        e = estudiante_aleatorio(generador, "nomina", i)
+        escritor.writerow([e.nombre, e.institucion, e.tipo_personaje, e.peso, e.altura, e.edad, e.experiencia,
+                           e.telefono, e.email, ";".join(e.condiciones_salud), ";".join(e.epp),
+                           ";".join(e.herramientas)])
+    datos = salida.getvalue().encode('utf-8')
+
+    def importar():
+        almacen = AlmacenSimulacion()
+        sala = almacen.crear_sala(monitor_nombre="Monitor", max_estudiantes=n_estudiantes)
+        importar_nomina(almacen, sala.sala_id, io.BytesIO(datos), "nomina.csv")
+
+    return importar
+
+
+def casos_figuras():
+    # Los emojis de los títulos no están en DejaVu Sans: el aviso no aporta nada aquí
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+    claves = iter(ESCENARIOS_FIGURA * 1000)
+    return {
+        'renderizar_fondo': lambda: renderizar_fondo("Andamios"),
+        'figura_escenario': lambda: figura_escenario(next(claves), "Trabajador", True),
+    }
+
+
+def ejecutar(salas, estudiantes, con_figuras=True, filtro=None, nominas=()):
+    resultados = {}
+
+    def registrar(nombre, parametros, funcion):
+        if filtro and filtro not in nombre:
+            return
+        clave = nombre + ("[" + ",".join(f"{k}={v}" for k, v in parametros.items()) + "]" if parametros else "")
+        resultados[clave] = dict(medir(funcion), caso=nombre, parametros=parametros)
+        print(f"{clave:60s} {resultados[clave]['mediana_us']:>14.1f} µs")
+
+    for n_estudiantes in estudiantes:
+        tick, clase = casos_sala(n_estudiantes)
+        registrar('tick_sala', {'estudiantes': n_estudiantes}, tick)
+        for nombre, funcion in casos_riesgos(clase).items():
+            registrar(nombre, {'estudiantes': n_estudiantes}, funcion)
+        for n_salas in salas:
+            for nombre, funcion in casos_almacen(n_salas, n_estudiantes).items():
+                registrar(nombre, {'salas': n_salas, 'estudiantes': n_estudiantes}, funcion)
+    for n_estudiantes in nominas:
+        registrar('importar_nomina', {'estudiantes': n_estudiantes}, casos_importacion(n_estudiantes))
+    if con_figuras:
+        for nombre, funcion in casos_figuras().items():
+            registrar(nombre, {}, funcion)
+    return resultados
+
+
+def comparar(resultados, base, umbral=UMBRAL_REGRESION):
+    # Devuelve [(clave, base µs, actual µs, cambio relativo)] de los casos que empeoraron
+    regresiones = []
+    for clave, actual in resultados.items():
+        anterior = base.get(clave)
+        if anterior is None or anterior['mediana_us'] <= 0:
+            continue
+        cambio = actual['mediana_us'] / anterior['mediana_us'] - 1
+        if cambio > umbral:
+            regresiones.append((clave, anterior['mediana_us'], actual['mediana_us'], cambio))
+    return regresiones
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de riesgos, movimiento y figuras")
+    parser.add_argument("--salas", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--estudiantes", type=int, nargs="+", default=[10, 30, 50], help="tamaños de clase")
+    parser.add_argument("--nomina", type=int, nargs="+", default=[500], help="filas de las nóminas importadas")
+    parser.add_argument("--solo", help="solo los casos cuyo nombre contenga este texto")
+    parser.add_argument("--sin-figuras", action="store_true")
+    parser.add_argument("--json", help="guarda los resultados en este archivo")
+    parser.add_argument("--base", help="JSON de una corrida anterior para comparar")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                        help="empeoramiento relativo tolerado de la mediana (0.25 = 25%%)")
+    opciones = parser.parse_args(argumentos)
+
+    resultados = ejecutar(opciones.salas, opciones.estudiantes, not opciones.sin_figuras, opciones.solo,
+                          opciones.nomina)
+    if opciones.json:
+        with open(opciones.json, 'w', encoding='utf-8') as archivo:
+            json.dump({'fecha': datetime.now().isoformat(timespec='seconds'),
+                       'python': platform.python_version(), 'numpy': np.__version__,
+                       'maquina': platform.machine(), 'resultados': resultados},
+                      archivo, indent=2, ensure_ascii=False)
+
+    if opciones.base:
+        with open(opciones.base, encoding='utf-8') as archivo:
+            base = json.load(archivo)['resultados']
+        regresiones = comparar(resultados, base, opciones.umbral)
+        for clave, anterior, actual, cambio in regresiones:
+            print(f"❌ {clave}: {anterior:.1f} -> {actual:.1f} µs (+{cambio:.0%})")
+        if regresiones:
+            return 1
+        print(f"✅ Sin regresiones mayores a {opciones.umbral:.0%} frente a {opciones.base}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
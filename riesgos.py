@@ -0,0 +1,591 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from modelos import ZONAS, Condicion, Epp, Estudiante, Herramienta, Perfil, calcular_imc
+
+def imc_estudiante(estudiante):
+    # El modelo Estudiante lo trae calculado al registrar; los dicts sueltos no
+    imc = estudiante.get('imc')
+    if imc is None:
+        imc = calcular_imc(estudiante.get('peso', 70), estudiante.get('altura', 170))
+    return imc
+
+# 🚨 SISTEMA DE DETECCIÓN AUTOMÁTICA DE RIESGOS
+def evaluar_riesgos_automaticos(estudiante, ubicacion):
+    riesgos_detectados = []
+    
+    condiciones_salud = estudiante.get('condiciones_salud', [])
+    
+    if "Vértigo" in condiciones_salud and "Andamios" in ubicacion:
+        riesgos_detectados.append("🦘 Riesgo de vértigo en altura")
+    
+    if "Mareos" in condiciones_salud and "Estructura" in ubicacion:
+        riesgos_detectados.append("🌀 Posible mareo en estructura elevada")
+    
+    if "Problemas cardíacos" in condiciones_salud:
+        riesgos_detectados.append("❤️ Monitoreo cardíaco requerido")
+    
+    if "Diabetes" in condiciones_salud:
+        riesgos_detectados.append("🩸 Riesgo hipoglucémico - monitoreo continuo")
+    
+    tipo_personaje = estudiante.get('tipo_personaje', '')
+    
+    if tipo_personaje == "Persona mayor":
+        riesgos_detectados.append("👴 Mayor riesgo de fatiga y caídas")
+    
+    if tipo_personaje == "Mujer embarazada":
+        riesgos_detectados.append("🤰 Riesgo elevado - evitar esfuerzos intensos")
+        if "Excavación" in ubicacion:
+            riesgos_detectados.append("⚠️ Exposición a vibraciones peligrosa")
+    
+    if tipo_personaje == "Persona con discapacidad motriz":
+        riesgos_detectados.append("♿ Movilidad reducida - rutas de evacuación críticas")
+    
+    if tipo_personaje == "Persona con sobrepeso":
+        riesgos_detectados.append("⚖️ Mayor carga articular - límite de peso reducido")
+    
+    imc = imc_estudiante(estudiante)
+    
+    if imc is not None:
+        if imc > 30:
+            riesgos_detectados.append("📊 IMC elevado - mayor riesgo metabólico")
+        if imc < 18.5:
+            riesgos_detectados.append("📊 Bajo peso - riesgo de fatiga")
+    
+    herramientas = estudiante.get('herramientas', [])
+    
+    if "Soldadora" in herramientas and "Andamios" in ubicacion:
+        riesgos_detectados.append("🔥 Riesgo de incendio por soldadura en altura")
+    
+    if "Taladro" in herramientas and "Estructura" in ubicacion:
+        riesgos_detectados.append("⚡ Riesgo eléctrico aumentado")
+    
+    if "Sierra eléctrica" in herramientas:
+        riesgos_detectados.append("🔪 Corte severo - EPP completo requerido")
+    
+    epp_requerido = ["Casco", "Botas con punta de acero"]
+    epp_faltante = [ep for ep in epp_requerido if ep not in estudiante.get('epp', [])]
+    
+    if epp_faltante:
+        riesgos_detectados.append(f"🦺 EPP faltante: {', '.join(epp_faltante)}")
+    
+    if "Andamios" in ubicacion and "Arnés de seguridad" not in estudiante.get('epp', []):
+        riesgos_detectados.append("🪂 ALTURA CRÍTICA - Arnés de seguridad requerido")
+    
+    if "Excavación" in ubicacion:
+        riesgos_detectados.append("⛰️ Riesgo de derrumbe o atrapamiento")
+    
+    if "Estructura" in ubicacion:
+        riesgos_detectados.append("🏗️ Caída de objetos - área delimitada")
+    
+    if len(herramientas) > 3:
+        riesgos_detectados.append("🎒 Sobrecarga de herramientas - riesgo ergonómico")
+    
+    return riesgos_detectados
+
+def evaluar_riesgo_caida(estudiante, ubicacion):
+    factores_riesgo = 0
+    
+    if "Vértigo" in estudiante.get('condiciones_salud', []):
+        factores_riesgo += 2
+    
+    if "Mareos" in estudiante.get('condiciones_salud', []):
+        factores_riesgo += 2
+    
+    if estudiante.get('tipo_personaje') == "Persona mayor":
+        factores_riesgo += 2
+    
+    if estudiante.get('tipo_personaje') == "Mujer embarazada":
+        factores_riesgo += 3
+    
+    if "Andamios" in ubicacion:
+        factores_riesgo += 3
+    
+    if "Estructura" in ubicacion:
+        factores_riesgo += 2
+    
+    if "Arnés de seguridad" not in estudiante.get('epp', []):
+        factores_riesgo += 4
+    
+    if factores_riesgo >= 8:
+        return "🔴 ALTO RIESGO de caída"
+    elif factores_riesgo >= 5:
+        return "🟡 MEDIO RIESGO de caída"
+    elif factores_riesgo >= 3:
+        return "🟢 BAJO RIESGO de caída"
+    else:
+        return None
+
+def evaluar_riesgo_sobrecarga(estudiante):
+    peso = estudiante.get('peso', 70)
+    herramientas = estudiante.get('herramientas', [])
+    
+    puntaje = 0
+    
+    if peso > 100:
+        puntaje += 3
+    elif peso > 85:
+        puntaje += 2
+    elif peso > 70:
+        puntaje += 1
+    
+    if len(herramientas) > 4:
+        puntaje += 3
+    elif len(herramientas) > 2:
+        puntaje += 2
+    
+    herramientas_pesadas = ["Soldadora", "Compactadora", "Hidrolavadora"]
+    for herramienta in herramientas:
+        if herramienta in herramientas_pesadas:
+            puntaje += 2
+    
+    if puntaje >= 5:
+        return "⚖️ ALERTA: Posible sobrecarga física"
+    elif puntaje >= 3:
+        return "⚖️ ADVERTENCIA: Carga física elevada"
+    else:
+        return None
+
+# =============================================
+# MOTOR VECTORIZADO (SALAS COMPLETAS)
+# =============================================
+# Las reglas de arriba codificadas como estructura de arreglos: perfil y zona
+# como códigos/máscaras, condiciones, EPP y herramientas como máscaras de bits.
+# Una sola pasada de NumPy calcula todas las banderas de riesgo, el puntaje de
+# caída y el de sobrecarga de todos los estudiantes del lote, con resultados
+# idénticos a evaluar_riesgos_automaticos / evaluar_riesgo_caida /
+# evaluar_riesgo_sobrecarga.
+#
+# Codificar cuesta un recorrido en Python más ~150 µs fijos de NumPy, así que
+# el lote solo le gana a las reglas escalares a partir de unos 100-500
+# estudiantes (según la máquina) y nunca a la tabla memorizada ya caliente.
+# mascaras_estudiantes elige el camino con UMBRAL_LOTE; el tablero usa la
+# tabla (ver CacheEvaluaciones).
+
+UMBRAL_LOTE = 500
+
+PERFILES = [perfil.value for perfil in Perfil]
+PERFIL_OTRO = len(PERFILES)
+CODIGO_PERFIL = {perfil: i for i, perfil in enumerate(PERFILES)}
+(PERFIL_MUSCULOSO, PERFIL_ATLETICA, PERFIL_MAYOR,
+ PERFIL_SOBREPESO, PERFIL_EMBARAZADA, PERFIL_DISCAPACIDAD) = range(len(PERFILES))
+
+CONDICIONES = [condicion.value for condicion in Condicion]
+EPP = [equipo.value for equipo in Epp]
+HERRAMIENTAS = [herramienta.value for herramienta in Herramienta]
+HERRAMIENTAS_PESADAS = ["Soldadora", "Compactadora", "Hidrolavadora"]
+
+BIT_CONDICION = {nombre: 1 << i for i, nombre in enumerate(CONDICIONES)}
+BIT_EPP = {nombre: 1 << i for i, nombre in enumerate(EPP)}
+BIT_HERRAMIENTA = {nombre: 1 << i for i, nombre in enumerate(HERRAMIENTAS)}
+
+# La zona solo importa por las subcadenas que buscan las reglas
+ZONA_ANDAMIOS = 1
+ZONA_EXCAVACION = 2
+ZONA_ESTRUCTURA = 4
+
+# Mismo orden en que evaluar_riesgos_automaticos agrega cada riesgo
+RIESGOS_AUTOMATICOS = [
+    "🦘 Riesgo de vértigo en altura",
+    "🌀 Posible mareo en estructura elevada",
+    "❤️ Monitoreo cardíaco requerido",
+    "🩸 Riesgo hipoglucémico - monitoreo continuo",
+    "👴 Mayor riesgo de fatiga y caídas",
+    "🤰 Riesgo elevado - evitar esfuerzos intensos",
+    "⚠️ Exposición a vibraciones peligrosa",
+    "♿ Movilidad reducida - rutas de evacuación críticas",
+    "⚖️ Mayor carga articular - límite de peso reducido",
+    "📊 IMC elevado - mayor riesgo metabólico",
+    "📊 Bajo peso - riesgo de fatiga",
+    "🔥 Riesgo de incendio por soldadura en altura",
+    "⚡ Riesgo eléctrico aumentado",
+    "🔪 Corte severo - EPP completo requerido",
+    "🦺 EPP faltante: Casco",
+    "🦺 EPP faltante: Botas con punta de acero",
+    "🦺 EPP faltante: Casco, Botas con punta de acero",
+    "🪂 ALTURA CRÍTICA - Arnés de seguridad requerido",
+    "⛰️ Riesgo de derrumbe o atrapamiento",
+    "🏗️ Caída de objetos - área delimitada",
+    "🎒 Sobrecarga de herramientas - riesgo ergonómico",
+]
+
+NIVELES_CAIDA = [None, "🟢 BAJO RIESGO de caída", "🟡 MEDIO RIESGO de caída", "🔴 ALTO RIESGO de caída"]
+NIVELES_SOBRECARGA = [None, "⚖️ ADVERTENCIA: Carga física elevada", "⚖️ ALERTA: Posible sobrecarga física"]
+
+# Código estable de cada riesgo = su posición en el catálogo. Los riesgos
+# nuevos se agregan siempre al final para no cambiar códigos ya guardados.
+# Un conjunto de riesgos es un entero con el bit 'código' encendido; las
+# etiquetas solo se recuperan al mostrarlas.
+CATALOGO_RIESGOS = RIESGOS_AUTOMATICOS + NIVELES_CAIDA[1:] + NIVELES_SOBRECARGA[1:]
+CODIGO_RIESGO = {etiqueta: codigo for codigo, etiqueta in enumerate(CATALOGO_RIESGOS)}
+
+BITS_AUTOMATICOS = np.array([1 << CODIGO_RIESGO[etiqueta] for etiqueta in RIESGOS_AUTOMATICOS], dtype=np.int64)
+MASCARA_AUTOMATICOS = int(np.bitwise_or.reduce(BITS_AUTOMATICOS))
+# Bit de cada nivel (el nivel 0 no agrega nada)
+BITS_CAIDA = np.array([0] + [1 << CODIGO_RIESGO[nivel] for nivel in NIVELES_CAIDA[1:]], dtype=np.int64)
+BITS_SOBRECARGA = np.array([0] + [1 << CODIGO_RIESGO[nivel] for nivel in NIVELES_SOBRECARGA[1:]], dtype=np.int64)
+
+
+def mascara_riesgos(etiquetas):
+    resultado = 0
+    for etiqueta in etiquetas:
+        if etiqueta:
+            resultado |= 1 << CODIGO_RIESGO[etiqueta]
+    return resultado
+
+
+def codigos_riesgos(mascara_):
+    codigos = []
+    while mascara_:
+        bit = mascara_ & -mascara_
+        codigos.append(bit.bit_length() - 1)
+        mascara_ ^= bit
+    return codigos
+
+
+def etiquetas_riesgos(mascara_):
+    return [CATALOGO_RIESGOS[codigo] for codigo in codigos_riesgos(mascara_)]
+
+
+def acumular_riesgos(estudiante, mascara_, fecha):
+    # Agrega los riesgos nuevos con la fecha en que se vieron por primera vez
+    nuevos = mascara_ & ~estudiante.riesgos_detectados
+    if nuevos:
+        estudiante.riesgos_detectados |= nuevos
+        for codigo in codigos_riesgos(nuevos):
+            estudiante.riesgos_desde[codigo] = fecha
+    return nuevos
+
+
+def mascara(valores, bits):
+    resultado = 0
+    for valor in valores:
+        resultado |= bits.get(valor, 0)
+    return resultado
+
+
+def flags_zona(ubicacion):
+    flags = 0
+    if "Andamios" in ubicacion:
+        flags |= ZONA_ANDAMIOS
+    if "Excavación" in ubicacion:
+        flags |= ZONA_EXCAVACION
+    if "Estructura" in ubicacion:
+        flags |= ZONA_ESTRUCTURA
+    return flags
+
+
+FLAGS_ZONA = {zona: flags_zona(zona) for zona in ZONAS}
+
+
+class LoteEstudiantes:
+    # Estructura de arreglos: la posición i de cada arreglo es el estudiante ids[i]
+    def __init__(self, ids, perfil, condiciones, epp, herramientas,
+                 n_herramientas, n_pesadas, zona, peso, altura):
+        self.ids = ids
+        self.perfil = perfil
+        self.condiciones = condiciones
+        self.epp = epp
+        self.herramientas = herramientas
+        self.n_herramientas = n_herramientas
+        self.n_pesadas = n_pesadas
+        self.zona = zona
+        self.peso = peso
+        self.altura = altura
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def codificar_estudiantes(estudiantes, ubicaciones=None):
+    estudiantes = list(estudiantes)
+    n = len(estudiantes)
+    perfil = np.empty(n, dtype=np.int8)
+    condiciones = np.empty(n, dtype=np.uint16)
+    epp = np.empty(n, dtype=np.uint16)
+    herramientas = np.empty(n, dtype=np.uint16)
+    n_herramientas = np.empty(n, dtype=np.int16)
+    n_pesadas = np.empty(n, dtype=np.int16)
+    zona = np.empty(n, dtype=np.uint8)
+    peso = np.empty(n, dtype=np.float64)
+    altura = np.empty(n, dtype=np.float64)
+    ids = []
+
+    for i, estudiante in enumerate(estudiantes):
+        ids.append(estudiante.get('id'))
+        lista_herramientas = estudiante.get('herramientas', [])
+        ubicacion = ubicaciones[i] if ubicaciones is not None else estudiante.get('ubicacion_actual', '')
+        perfil[i] = CODIGO_PERFIL.get(estudiante.get('tipo_personaje', ''), PERFIL_OTRO)
+        condiciones[i] = mascara(estudiante.get('condiciones_salud', []), BIT_CONDICION)
+        epp[i] = mascara(estudiante.get('epp', []), BIT_EPP)
+        herramientas[i] = mascara(lista_herramientas, BIT_HERRAMIENTA)
+        n_herramientas[i] = len(lista_herramientas)
+        n_pesadas[i] = sum(1 for h in lista_herramientas if h in HERRAMIENTAS_PESADAS)
+        zona[i] = flags_zona(ubicacion)
+        peso[i] = estudiante.get('peso', 70)
+        altura[i] = estudiante.get('altura', 170)
+
+    return LoteEstudiantes(ids, perfil, condiciones, epp, herramientas,
+                           n_herramientas, n_pesadas, zona, peso, altura)
+
+
+class ResultadoLote:
+    def __init__(self, ids, banderas, puntaje_caida, nivel_caida, puntaje_sobrecarga, nivel_sobrecarga):
+        self.ids = ids
+        self.banderas = banderas
+        self.puntaje_caida = puntaje_caida
+        self.nivel_caida = nivel_caida
+        self.puntaje_sobrecarga = puntaje_sobrecarga
+        self.nivel_sobrecarga = nivel_sobrecarga
+
+    def riesgos_automaticos(self, i):
+        return [RIESGOS_AUTOMATICOS[j] for j in np.flatnonzero(self.banderas[i])]
+
+    def riesgo_caida(self, i):
+        return NIVELES_CAIDA[self.nivel_caida[i]]
+
+    def riesgo_sobrecarga(self, i):
+        return NIVELES_SOBRECARGA[self.nivel_sobrecarga[i]]
+
+    def mascaras(self):
+        return ((self.banderas * BITS_AUTOMATICOS).sum(axis=1)
+                | BITS_CAIDA[self.nivel_caida] | BITS_SOBRECARGA[self.nivel_sobrecarga])
+
+    def con_riesgos(self):
+        return self.mascaras() != 0
+
+
+def evaluar_lote(lote):
+    cond = lote.condiciones
+    epp = lote.epp
+    herr = lote.herramientas
+    perfil = lote.perfil
+    andamios = (lote.zona & ZONA_ANDAMIOS) != 0
+    excavacion = (lote.zona & ZONA_EXCAVACION) != 0
+    estructura = (lote.zona & ZONA_ESTRUCTURA) != 0
+
+    vertigo = (cond & BIT_CONDICION["Vértigo"]) != 0
+    mareos = (cond & BIT_CONDICION["Mareos"]) != 0
+    mayor = perfil == PERFIL_MAYOR
+    embarazada = perfil == PERFIL_EMBARAZADA
+    sin_casco = (epp & BIT_EPP["Casco"]) == 0
+    sin_botas = (epp & BIT_EPP["Botas con punta de acero"]) == 0
+    sin_arnes = (epp & BIT_EPP["Arnés de seguridad"]) == 0
+
+    con_altura = lote.altura > 0
+    altura_m = np.where(con_altura, lote.altura, 100.0) / 100
+    imc = lote.peso / (altura_m ** 2)
+
+    banderas = np.column_stack([
+        vertigo & andamios,
+        mareos & estructura,
+        (cond & BIT_CONDICION["Problemas cardíacos"]) != 0,
+        (cond & BIT_CONDICION["Diabetes"]) != 0,
+        mayor,
+        embarazada,
+        embarazada & excavacion,
+        perfil == PERFIL_DISCAPACIDAD,
+        perfil == PERFIL_SOBREPESO,
+        con_altura & (imc > 30),
+        con_altura & (imc < 18.5),
+        ((herr & BIT_HERRAMIENTA["Soldadora"]) != 0) & andamios,
+        ((herr & BIT_HERRAMIENTA["Taladro"]) != 0) & estructura,
+        (herr & BIT_HERRAMIENTA["Sierra eléctrica"]) != 0,
+        sin_casco & ~sin_botas,
+        ~sin_casco & sin_botas,
+        sin_casco & sin_botas,
+        andamios & sin_arnes,
+        excavacion,
+        estructura,
+        lote.n_herramientas > 3,
+    ]) if len(lote) else np.zeros((0, len(RIESGOS_AUTOMATICOS)), dtype=bool)
+
+    puntaje_caida = (2 * vertigo + 2 * mareos + 2 * mayor + 3 * embarazada
+                     + 3 * andamios + 2 * estructura + 4 * sin_arnes).astype(np.int16)
+    nivel_caida = ((puntaje_caida >= 3).astype(np.int8) + (puntaje_caida >= 5) + (puntaje_caida >= 8))
+
+    peso = lote.peso
+    puntaje_sobrecarga = (
+        np.select([peso > 100, peso > 85, peso > 70], [3, 2, 1], 0)
+        + np.select([lote.n_herramientas > 4, lote.n_herramientas > 2], [3, 2], 0)
+        + 2 * lote.n_pesadas
+    ).astype(np.int16)
+    nivel_sobrecarga = (puntaje_sobrecarga >= 3).astype(np.int8) + (puntaje_sobrecarga >= 5)
+
+    return ResultadoLote(lote.ids, banderas, puntaje_caida, nivel_caida, puntaje_sobrecarga, nivel_sobrecarga)
+
+
+def evaluar_estudiantes(estudiantes, ubicaciones=None):
+    return evaluar_lote(codificar_estudiantes(estudiantes, ubicaciones))
+
+
+# =============================================
+# TABLA MEMORIZADA DE RIESGOS
+# =============================================
+# Todas las entradas de las reglas son categóricas salvo peso y altura, que
+# solo cuentan por la banda de IMC y la banda de peso. La clave reduce al
+# estudiante a lo que las reglas realmente miran; dos estudiantes con la misma
+# clave tienen exactamente los mismos riesgos, así que la tabla se llena sola
+# con el primer cálculo de cada combinación y después es un acceso a dict.
+
+CONDICIONES_RELEVANTES = mascara(["Vértigo", "Mareos", "Problemas cardíacos", "Diabetes"], BIT_CONDICION)
+EPP_RELEVANTE = mascara(["Casco", "Botas con punta de acero", "Arnés de seguridad"], BIT_EPP)
+HERRAMIENTAS_RELEVANTES = mascara(["Soldadora", "Taladro", "Sierra eléctrica"], BIT_HERRAMIENTA)
+CAPACIDAD_TABLA_RIESGOS = 4096
+
+EvaluacionRiesgos = namedtuple("EvaluacionRiesgos", ["automaticos", "caida", "sobrecarga", "mascara"])
+
+
+def nueva_evaluacion(automaticos, caida, sobrecarga):
+    automaticos = tuple(automaticos)
+    return EvaluacionRiesgos(automaticos, caida, sobrecarga,
+                             mascara_riesgos(automaticos + (caida, sobrecarga)))
+
+
+def banda_imc(imc):
+    if imc is not None:
+        if imc > 30:
+            return 2
+        if imc < 18.5:
+            return 0
+    return 1
+
+
+def banda_peso(peso):
+    if peso > 100:
+        return 3
+    if peso > 85:
+        return 2
+    if peso > 70:
+        return 1
+    return 0
+
+
+def clave_fija(estudiante):
+    herramientas = estudiante.get('herramientas', [])
+    peso = estudiante.get('peso', 70)
+    return (
+        CODIGO_PERFIL.get(estudiante.get('tipo_personaje', ''), PERFIL_OTRO),
+        mascara(estudiante.get('condiciones_salud', []), BIT_CONDICION) & CONDICIONES_RELEVANTES,
+        mascara(estudiante.get('epp', []), BIT_EPP) & EPP_RELEVANTE,
+        mascara(herramientas, BIT_HERRAMIENTA) & HERRAMIENTAS_RELEVANTES,
+        # Las reglas solo distinguen hasta "más de 4" herramientas
+        min(len(herramientas), 5),
+        sum(1 for h in herramientas if h in HERRAMIENTAS_PESADAS),
+        banda_imc(imc_estudiante(estudiante)),
+        banda_peso(peso),
+    )
+
+
+def clave_riesgos(estudiante, ubicacion):
+    # Un Estudiante guarda la parte fija hasta su próximo normalizar() (que la
+    # borra al editar perfil, EPP, herramientas, peso o altura); así cada
+    # evaluación solo agrega la zona. Los dicts la arman cada vez.
+    fija = estudiante.get('clave_riesgos')
+    if fija is None:
+        fija = clave_fija(estudiante)
+        if isinstance(estudiante, Estudiante):
+            estudiante.clave_riesgos = fija
+    zona = FLAGS_ZONA.get(ubicacion)
+    return fija, zona if zona is not None else flags_zona(ubicacion)
+
+
+class TablaRiesgos:
+    # LRU acotado: a lo sumo 'capacidad' combinaciones en memoria
+    def __init__(self, capacidad=CAPACIDAD_TABLA_RIESGOS):
+        self.capacidad = capacidad
+        self.aciertos = 0
+        self.fallos = 0
+        self._tabla = OrderedDict()
+        self._candado = threading.Lock()
+
+    def evaluar(self, estudiante, ubicacion):
+        clave = clave_riesgos(estudiante, ubicacion)
+        with self._candado:
+            evaluacion = self._tabla.get(clave)
+            if evaluacion is not None:
+                self._tabla.move_to_end(clave)
+                self.aciertos += 1
+                return evaluacion
+
+        evaluacion = nueva_evaluacion(
+            evaluar_riesgos_automaticos(estudiante, ubicacion),
+            evaluar_riesgo_caida(estudiante, ubicacion),
+            evaluar_riesgo_sobrecarga(estudiante),
+        )
+        with self._candado:
+            self.fallos += 1
+            self._tabla[clave] = evaluacion
+            if len(self._tabla) > self.capacidad:
+                self._tabla.popitem(last=False)
+        return evaluacion
+
+    def __len__(self):
+        return len(self._tabla)
+
+
+# Una tabla por proceso, compartida por todas las sesiones
+tabla_riesgos = TablaRiesgos()
+
+
+def evaluar_riesgos_memorizados(estudiante, ubicacion):
+    return tabla_riesgos.evaluar(estudiante, ubicacion)
+
+
+def mascaras_estudiantes(estudiantes, ubicaciones=None):
+    # Máscaras de riesgo de varios estudiantes: lote vectorizado solo si es grande
+    if len(estudiantes) >= UMBRAL_LOTE:
+        return evaluar_estudiantes(estudiantes, ubicaciones).mascaras().tolist()
+    if ubicaciones is None:
+        ubicaciones = [estudiante.get('ubicacion_actual', '') for estudiante in estudiantes]
+    return [tabla_riesgos.evaluar(estudiante, ubicacion).mascara
+            for estudiante, ubicacion in zip(estudiantes, ubicaciones)]
+
+
+# =============================================
+# REEVALUACIÓN INCREMENTAL (TABLERO DEL MONITOR)
+# =============================================
+# Cada estudiante lleva una 'revision' que el almacén incrementa cuando cambia
+# algo que afecta sus riesgos (zona, EPP, herramientas, perfil). El tablero
+# solo reevalúa —con la tabla memorizada— a los estudiantes cuya revisión no
+# coincide con la guardada; el resto reutiliza la evaluación anterior.
+
+class CacheEvaluaciones:
+    def __init__(self):
+        self._por_estudiante = {}
+        self._candado = threading.Lock()
+        self.reevaluados = 0
+
+    def evaluar(self, estudiantes):
+        pendientes = []
+        with self._candado:
+            for estudiante in estudiantes:
+                guardado = self._por_estudiante.get(estudiante.get('id'))
+                if guardado is None or guardado[0] != estudiante.get('revision', 0):
+                    pendientes.append(estudiante)
+
+        if pendientes:
+            # El tick ya evaluó casi todas estas combinaciones: son aciertos de la tabla
+            evaluaciones = [tabla_riesgos.evaluar(estudiante, estudiante.get('ubicacion_actual', ''))
+                            for estudiante in pendientes]
+            with self._candado:
+                for estudiante, evaluacion in zip(pendientes, evaluaciones):
+                    self._por_estudiante[estudiante.get('id')] = (estudiante.get('revision', 0), evaluacion)
+                self.reevaluados += len(pendientes)
+
+        with self._candado:
+            return [self._por_estudiante[estudiante.get('id')][1] for estudiante in estudiantes]
+
+    def olvidar(self, est_ids):
+        # Estudiantes de salas finalizadas: sin esto el caché crece con cada estudiante que se unió
+        with self._candado:
+            for est_id in est_ids:
+                self._por_estudiante.pop(est_id, None)
+
+    def __len__(self):
+        return len(self._por_estudiante)
+
+
+cache_evaluaciones = CacheEvaluaciones()
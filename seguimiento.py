@@ -0,0 +1,188 @@
+import copy
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from modelos import EstadoAlerta
+from riesgos import CODIGO_RIESGO, codigos_riesgos
+
+# =============================================
+# SEGUIMIENTO DE ALERTAS POR (ESTUDIANTE, RIESGO)
+# =============================================
+# Cada riesgo activo de un estudiante es una alerta con estado:
+#
+#   (nuevo) -> ABIERTA -> RECONOCIDA (el monitor la vio)
+#                 |            |
+#                 +-> ESCALADA (sigue abierta después de su plazo)
+#   cualquiera -> RESUELTA (el riesgo desapareció de la evaluación)
+#
+# El tick de movimiento informa la máscara actual de cada estudiante movido
+# (observar) y el motor hace una sola pasada periódica sobre las alertas no
+# resueltas (revisar) para escalar las vencidas y olvidar las resueltas
+# viejas. Un riesgo que vuelve dentro de VENTANA_SUPRESION reabre la misma
+# alerta sin anunciarla de nuevo (evita el parpadeo al cambiar de zona).
+# Solo las transiciones se publican: a la lista de novedades de la sala y,
+# vía el almacén, al despacho de WhatsApp.
+
+VENTANA_SUPRESION = 60.0
+PLAZO_NORMAL = 600.0
+PLAZO_CRITICO = 120.0
+TRANSICIONES_POR_SALA = 200
+
+CODIGOS_CRITICOS = frozenset(CODIGO_RIESGO[etiqueta] for etiqueta in (
+    "🪂 ALTURA CRÍTICA - Arnés de seguridad requerido",
+    "🔴 ALTO RIESGO de caída",
+    "⚖️ ALERTA: Posible sobrecarga física",
+    "🔥 Riesgo de incendio por soldadura en altura",
+    "⚡ Riesgo eléctrico aumentado",
+    "⛰️ Riesgo de derrumbe o atrapamiento",
+))
+# Informativos: se siguen y se resuelven, pero nunca escalan
+CODIGOS_SIN_ESCALAMIENTO = frozenset(CODIGO_RIESGO[etiqueta] for etiqueta in (
+    "🟢 BAJO RIESGO de caída",
+    "📊 IMC elevado - mayor riesgo metabólico",
+    "📊 Bajo peso - riesgo de fatiga",
+))
+
+ACTIVAS = (EstadoAlerta.ABIERTA, EstadoAlerta.RECONOCIDA, EstadoAlerta.ESCALADA)
+
+
+def plazo_escalamiento(codigo):
+    if codigo in CODIGOS_SIN_ESCALAMIENTO:
+        return None
+    return PLAZO_CRITICO if codigo in CODIGOS_CRITICOS else PLAZO_NORMAL
+
+
+@dataclass(slots=True)
+class AlertaRiesgo:
+    sala_id: str
+    est_id: str
+    codigo: int
+    estado: EstadoAlerta
+    abierta: float
+    cambio: float
+    # Solo tienen sentido mientras está RESUELTA (ventana de supresión):
+    # cuándo se resolvió y en qué estado estaba, para retomarlo si reaparece
+    resuelta: float = None
+    previo: EstadoAlerta = None
+    reaperturas: int = 0
+
+
+@dataclass(slots=True)
+class Transicion:
+    numero: int
+    fecha: float
+    sala_id: str
+    est_id: str
+    codigo: int
+    desde: EstadoAlerta
+    hacia: EstadoAlerta
+
+
+class SeguimientoAlertas:
+    def __init__(self, supresion=VENTANA_SUPRESION):
+        self.supresion = supresion
+        # sala_id -> est_id -> codigo -> AlertaRiesgo
+        self._alertas = {}
+        self._transiciones = {}
+        self._numeros = itertools.count(1)
+        self._candado = threading.Lock()
+        self.suprimidas = 0
+
+    def _transicion(self, alerta, hacia, fecha, publicadas):
+        transicion = Transicion(next(self._numeros), fecha, alerta.sala_id, alerta.est_id, alerta.codigo,
+                                alerta.estado, hacia)
+        if hacia is EstadoAlerta.RESUELTA:
+            alerta.previo = alerta.estado
+            alerta.resuelta = fecha
+        alerta.estado = hacia
+        alerta.cambio = fecha
+        sala = self._transiciones.get(alerta.sala_id)
+        if sala is None:
+            sala = self._transiciones[alerta.sala_id] = deque(maxlen=TRANSICIONES_POR_SALA)
+        sala.append(transicion)
+        publicadas.append(transicion)
+
+    def observar(self, sala_id, est_id, mascara_, fecha):
+        # Máscara actual (no acumulada) del estudiante; devuelve las transiciones
+        publicadas = []
+        activos = set(codigos_riesgos(mascara_))
+        with self._candado:
+            alertas = self._alertas.setdefault(sala_id, {}).setdefault(est_id, {})
+            for codigo in activos:
+                alerta = alertas.get(codigo)
+                if alerta is not None and alerta.estado is EstadoAlerta.RESUELTA \
+                        and fecha - alerta.resuelta >= self.supresion:
+                    # Resuelta hace rato (revisar aún no la olvidó): cuenta como alerta nueva
+                    alerta = None
+                if alerta is None:
+                    alerta = alertas[codigo] = AlertaRiesgo(sala_id, est_id, codigo, None, fecha, fecha)
+                    self._transicion(alerta, EstadoAlerta.ABIERTA, fecha, publicadas)
+                elif alerta.estado is EstadoAlerta.RESUELTA:
+                    # Dentro de la ventana de supresión: misma alerta, sin anuncio
+                    alerta.estado = alerta.previo
+                    alerta.resuelta = alerta.previo = None
+                    alerta.reaperturas += 1
+                    self.suprimidas += 1
+            for codigo, alerta in alertas.items():
+                if codigo not in activos and alerta.estado is not EstadoAlerta.RESUELTA:
+                    self._transicion(alerta, EstadoAlerta.RESUELTA, fecha, publicadas)
+        return publicadas
+
+    def revisar(self, ahora):
+        # Pasada programada: escala las vencidas y olvida las resueltas fuera de la ventana
+        publicadas = []
+        with self._candado:
+            for alumnos in self._alertas.values():
+                for alertas in alumnos.values():
+                    for codigo in list(alertas):
+                        alerta = alertas[codigo]
+                        if alerta.estado is EstadoAlerta.RESUELTA:
+                            if ahora - alerta.resuelta >= self.supresion:
+                                del alertas[codigo]
+                        elif alerta.estado is EstadoAlerta.ABIERTA:
+                            plazo = plazo_escalamiento(codigo)
+                            if plazo is not None and ahora - alerta.abierta >= plazo:
+                                self._transicion(alerta, EstadoAlerta.ESCALADA, ahora, publicadas)
+        return publicadas
+
+    def reconocer(self, sala_id, claves, fecha):
+        # claves: [(est_id, codigo)]; solo abiertas o escaladas pasan a reconocidas
+        publicadas = []
+        with self._candado:
+            alumnos = self._alertas.get(sala_id, {})
+            for est_id, codigo in claves:
+                alerta = alumnos.get(est_id, {}).get(codigo)
+                if alerta is not None and alerta.estado in (EstadoAlerta.ABIERTA, EstadoAlerta.ESCALADA):
+                    self._transicion(alerta, EstadoAlerta.RECONOCIDA, fecha, publicadas)
+        return publicadas
+
+    def resolver_sala(self, sala_id, fecha):
+        # Reinicio de la sala: todo lo activo queda resuelto
+        publicadas = []
+        with self._candado:
+            for alertas in self._alertas.get(sala_id, {}).values():
+                for alerta in alertas.values():
+                    if alerta.estado is not EstadoAlerta.RESUELTA:
+                        self._transicion(alerta, EstadoAlerta.RESUELTA, fecha, publicadas)
+        return publicadas
+
+    def olvidar_sala(self, sala_id):
+        with self._candado:
+            self._alertas.pop(sala_id, None)
+            self._transiciones.pop(sala_id, None)
+
+    def activas(self, sala_id):
+        # Copias de las alertas no resueltas de la sala, primero las escaladas y las más viejas
+        with self._candado:
+            alertas = [copy.copy(a)
+                       for alumnos in self._alertas.get(sala_id, {}).values()
+                       for a in alumnos.values() if a.estado in ACTIVAS]
+        orden = {EstadoAlerta.ESCALADA: 0, EstadoAlerta.ABIERTA: 1, EstadoAlerta.RECONOCIDA: 2}
+        return sorted(alertas, key=lambda a: (orden[a.estado], a.abierta))
+
+    def transiciones(self, sala_id, desde=0):
+        # Transiciones de la sala con número mayor a 'desde' (cursor de cada monitor)
+        with self._candado:
+            return [t for t in self._transiciones.get(sala_id, ()) if t.numero > desde]
@@ -0,0 +1,166 @@
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from almacen import marcar_modificado
+from caidas import SensoresSala, resumen_latencias
+from metricas import metricas
+from modelos import ID_ZONA, INTERVALO_MOVIMIENTO, ZONAS, Zona
+from riesgos import evaluar_riesgos_memorizados
+
+# =============================================
+# MOTOR DE SIMULACIÓN EN SEGUNDO PLANO
+# =============================================
+# Un solo hilo por servidor avanza cada sala a su propio intervalo. Las
+# páginas ya no mueven a los estudiantes ni fuerzan st.rerun(): solo leen el
+# último estado del almacén en su siguiente render.
+# En las salas iniciadas con simular_sensores, cada paso también simula los
+# acelerómetros y los pasa por el detector de caídas (ver caidas.py), un lote
+# por sala. Esas caídas son sintéticas: se cuentan pero no se alertan.
+
+ZONA_INICIAL = Zona.ANDAMIOS
+PROBABILIDAD_MOVIMIENTO = 0.35
+RESOLUCION_MOTOR = 0.5
+# Cada cuántos segundos se revisan las alertas abiertas (escalamiento)
+INTERVALO_REVISION_ALERTAS = 5.0
+
+
+def paso_movimiento(zonas, generador, probabilidad=PROBABILIDAD_MOVIMIENTO):
+    # Decisiones y destinos de toda la sala en dos sorteos: sumar un
+    # desplazamiento 1..N-1 módulo N elige de forma uniforme una zona distinta
+    # de la actual. Siempre se sortea la sala completa para que la secuencia
+    # dependa solo de la semilla y del tamaño de la sala.
+    n = len(zonas)
+    se_mueve = generador.random(n) < probabilidad
+    desplazamiento = generador.integers(1, len(ZONAS), size=n, dtype=np.int8)
+    movidos = np.flatnonzero(se_mueve)
+    return movidos, (zonas[movidos] + desplazamiento[movidos]) % len(ZONAS)
+
+
+def zonas_de_sala(almacen, sala):
+    return np.fromiter((ID_ZONA.get(almacen.estudiantes[est_id].ubicacion_actual, 0)
+                        for est_id in sala.estudiantes),
+                       dtype=np.int8, count=len(sala.estudiantes))
+
+
+def mover_sala(almacen, sala, ahora, generador):
+    zonas = zonas_de_sala(almacen, sala)
+    movidos, nuevas_zonas = paso_movimiento(zonas, generador)
+    if sala.historial is not None:
+        sala.historial.registrar(movidos, zonas[movidos], nuevas_zonas, ahora.timestamp())
+    hora = ahora.strftime("%H:%M:%S")
+    marca = ahora.timestamp()
+    cambios = []
+    for i, zona_id in zip(movidos.tolist(), nuevas_zonas.tolist()):
+        est_id = sala.estudiantes[i]
+        estudiante = almacen.estudiantes[est_id]
+        nueva_zona = ZONAS[zona_id]
+
+        movimiento_anterior = estudiante.ubicacion_actual
+        estudiante.ubicacion_actual = nueva_zona
+        estudiante.ultimo_movimiento = hora
+        marcar_modificado(estudiante)
+
+        evaluacion = evaluar_riesgos_memorizados(estudiante, nueva_zona)
+        nuevos = almacen.acumular_riesgos_estudiante(sala, estudiante, evaluacion.mascara, marca)
+
+        cambios.append((est_id, movimiento_anterior, nueva_zona, nuevos))
+    return cambios
+
+
+class MotorSimulacion:
+    def __init__(self, almacen, resolucion=RESOLUCION_MOTOR):
+        self.almacen = almacen
+        self.resolucion = resolucion
+        self._proximo_tick = {}
+        self._generadores = {}
+        self._sensores = {}
+        self._proxima_revision = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="motor-simulacion", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def _bucle(self):
+        while not self._detener.wait(self.resolucion):
+            self.paso()
+
+    def paso(self, reloj=None):
+        reloj = time.monotonic() if reloj is None else reloj
+        if not self.almacen.movimiento_automatico:
+            return 0
+        with metricas.medir("motor.paso"):
+            movimientos = self._mover_salas(reloj)
+        if self._proxima_revision is None or reloj >= self._proxima_revision:
+            self._proxima_revision = reloj + INTERVALO_REVISION_ALERTAS
+            with metricas.medir("motor.revisar_alertas"):
+                self.almacen.revisar_alertas(time.time())
+        return movimientos
+
+    def _mover_salas(self, reloj):
+        movimientos_totales = 0
+        salas = self.almacen.salas_activas()
+        self._olvidar_salas(salas)
+        for sala in salas:
+            sala_id = sala.sala_id
+            if not sala.simulacion_iniciada:
+                # Al reanudar, el primer movimiento espera un intervalo completo
+                self._proximo_tick.pop(sala_id, None)
+                continue
+
+            if sala.simular_sensores:
+                with metricas.medir("motor.caidas"):
+                    self._detectar_caidas(sala)
+
+            intervalo = sala.intervalo_movimiento
+            proximo = self._proximo_tick.setdefault(sala_id, reloj + intervalo)
+            if reloj < proximo:
+                continue
+            self._proximo_tick[sala_id] = reloj + intervalo
+
+            generador = self._generadores.get(sala_id)
+            if generador is None:
+                generador = self._generadores[sala_id] = np.random.default_rng(sala.semilla)
+
+            ahora = datetime.now()
+            with metricas.medir("motor.mover_sala"), self.almacen.modificar_sala(sala_id) as sala:
+                cambios = mover_sala(self.almacen, sala, ahora, generador)
+                sala.ultimo_tick = ahora.strftime("%H:%M:%S")
+            with metricas.medir("motor.persistir_tick"):
+                self.almacen.persistir_tick(sala, cambios, ahora)
+            movimientos_totales += len(cambios)
+        return movimientos_totales
+
+    def _olvidar_salas(self, salas):
+        # Las salas finalizadas dejan de estar activas: se sueltan su generador, sensores y próximo tick
+        activas = {sala.sala_id for sala in salas}
+        con_sensores = {sala.sala_id for sala in salas if sala.simular_sensores}
+        for estado, vigentes in ((self._proximo_tick, activas), (self._generadores, activas),
+                                 (self._sensores, con_sensores)):
+            for sala_id in estado.keys() - vigentes:
+                del estado[sala_id]
+
+    def _detectar_caidas(self, sala):
+        sensores = self._sensores.get(sala.sala_id)
+        if sensores is None:
+            sensores = self._sensores[sala.sala_id] = SensoresSala(sala.semilla)
+        for indice, _, impacto in sensores.avanzar(len(sala.estudiantes)):
+            self.almacen.registrar_caida(sala.sala_id, indice, impacto, simulada=True)
+
+    def latencia_caidas(self):
+        return resumen_latencias([sensores.detector for sensores in list(self._sensores.values())])
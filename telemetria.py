@@ -0,0 +1,211 @@
+import time
+
+import numpy as np
+
+from caidas import DetectorCaidas
+
+# =============================================
+# TELEMETRÍA SINTÉTICA DEL ARNÉS (SIMULADOR INDIVIDUAL)
+# =============================================
+# Tubería de generadores:
+#   fuente_sensores -> registrar (muestras crudas) -> detectar_caidas -> agregar_ventanas -> SerieTemporal
+# La fuente produce bloques de muestras a la frecuencia configurada (50-100 Hz)
+# con acelerómetro, altitud y signos vitales. Cada render solo avanza la
+# tubería hasta la hora actual: los datos ya generados se conservan en las
+# series acotadas y no se vuelven a sortear en cada rerun.
+
+FRECUENCIA_DEFECTO = 50
+SEGUNDOS_POR_BLOQUE = 0.5
+SEGUNDOS_POR_VENTANA = 1.0
+# Ventanas de 1 s retenidas (10 min) y muestras crudas retenidas (10 s)
+CAPACIDAD_VENTANAS = 600
+SEGUNDOS_CRUDOS = 10
+# Si la página estuvo mucho tiempo sin abrirse, solo se genera este tramo
+MAXIMO_PONERSE_AL_DIA = 120
+GRAVEDAD = 9.81
+
+DTYPE_MUESTRA = np.dtype([
+    ('t', np.float64),
+    ('ax', np.float32),
+    ('ay', np.float32),
+    ('az', np.float32),
+    ('altitud', np.float32),
+    ('ritmo', np.float32),
+    ('spo2', np.float32),
+    ('temperatura', np.float32),
+])
+
+DTYPE_VENTANA = np.dtype([
+    ('t', np.float64),
+    ('ritmo', np.float32),
+    ('spo2', np.float32),
+    ('temperatura', np.float32),
+    ('altitud', np.float32),
+    ('aceleracion_media', np.float32),
+    ('aceleracion_minima', np.float32),
+    ('aceleracion_maxima', np.float32),
+])
+
+ALTURA_ESCENARIO = {
+    "Andamios en fachada": 12.0,
+    "Estructura metálica": 15.0,
+    "Torre de comunicación": 45.0,
+    "Trabajos en cubierta": 8.0,
+    "Espacios confinados verticales": 10.0,
+}
+
+
+class SerieTemporal:
+    # Buffer circular de registros con dtype estructurado: agregar es O(n)
+    # del lote y la memoria no crece con la duración de la sesión.
+    def __init__(self, capacidad, dtype):
+        self.capacidad = capacidad
+        self._datos = np.zeros(capacidad, dtype=dtype)
+        self._inicio = 0
+        self._cantidad = 0
+
+    def __len__(self):
+        return self._cantidad
+
+    def agregar(self, registros):
+        registros = np.atleast_1d(registros)[-self.capacidad:]
+        n = len(registros)
+        posiciones = (self._inicio + self._cantidad + np.arange(n)) % self.capacidad
+        self._datos[posiciones] = registros
+        sobrantes = max(0, self._cantidad + n - self.capacidad)
+        self._inicio = (self._inicio + sobrantes) % self.capacidad
+        self._cantidad = min(self.capacidad, self._cantidad + n)
+
+    def ultimos(self, n=None):
+        n = self._cantidad if n is None else min(n, self._cantidad)
+        posiciones = (self._inicio + self._cantidad - n + np.arange(n)) % self.capacidad
+        return self._datos[posiciones]
+
+    def ultimo(self):
+        return self.ultimos(1)[0] if self._cantidad else None
+
+
+def _caminata(generador, n, actual, media, retorno, ruido):
+    # Proceso AR(1) alrededor de 'media': los valores derivan pero no se disparan
+    valores = np.empty(n, dtype=np.float64)
+    ruidos = generador.normal(0, ruido, n)
+    for i in range(n):
+        actual += retorno * (media - actual) + ruidos[i]
+        valores[i] = actual
+    return valores, actual
+
+
+def fuente_sensores(frecuencia, generador, inicio, altura=12.0, ritmo_base=75.0, caidas=None):
+    # Generador infinito de bloques de SEGUNDOS_POR_BLOQUE. 'caidas' es una
+    # lista compartida: la página agrega fechas y la fuente las inyecta
+    # (caída libre ~0.4 s, impacto y pérdida de altura) en el bloque que corresponda.
+    n = max(1, int(round(frecuencia * SEGUNDOS_POR_BLOQUE)))
+    paso = 1.0 / frecuencia
+    t0 = inicio
+    ritmo, spo2, temperatura, altitud = ritmo_base, 97.5, 36.5, altura
+    caidas = [] if caidas is None else caidas
+    while True:
+        bloque = np.zeros(n, dtype=DTYPE_MUESTRA)
+        bloque['t'] = t0 + np.arange(n) * paso
+        bloque['ritmo'], ritmo = _caminata(generador, n, ritmo, ritmo_base, 0.01, 0.15)
+        bloque['spo2'], spo2 = _caminata(generador, n, spo2, 97.5, 0.01, 0.02)
+        bloque['temperatura'], temperatura = _caminata(generador, n, temperatura, 36.5, 0.005, 0.002)
+        bloque['altitud'], altitud = _caminata(generador, n, altitud, altura, 0.02, 0.01)
+        bloque['ax'] = generador.normal(0, 0.3, n)
+        bloque['ay'] = generador.normal(0, 0.3, n)
+        bloque['az'] = GRAVEDAD + generador.normal(0, 0.3, n)
+
+        fin = t0 + n * paso
+        for fecha in [f for f in caidas if f < fin]:
+            caidas.remove(fecha)
+            duracion_libre = int(0.4 * frecuencia)
+            duracion_impacto = max(1, int(0.05 * frecuencia))
+            # La caída completa queda dentro del bloque (0.45 s < SEGUNDOS_POR_BLOQUE)
+            i = min(max(0, int((fecha - t0) / paso)), n - duracion_libre - duracion_impacto)
+            caida_libre = slice(i, i + duracion_libre)
+            impacto = slice(caida_libre.stop, caida_libre.stop + duracion_impacto)
+            bloque['ax'][caida_libre] = generador.normal(0, 0.2, duracion_libre)
+            bloque['ay'][caida_libre] = generador.normal(0, 0.2, duracion_libre)
+            bloque['az'][caida_libre] = generador.normal(0.5, 0.2, duracion_libre)
+            bloque['az'][impacto] = 4 * GRAVEDAD
+            bloque['altitud'][i:] -= 1.5
+            altitud -= 1.5
+            ritmo += 25
+        yield bloque
+        t0 = fin
+
+
+def registrar(bloques, serie):
+    # Etapa de paso: guarda las muestras crudas recientes sin alterar el flujo
+    for bloque in bloques:
+        serie.agregar(bloque)
+        yield bloque
+
+
+def detectar_caidas(bloques, detector, detectadas):
+    # Etapa de paso: |a| de cada bloque al detector; las caídas van a 'detectadas'
+    for bloque in bloques:
+        ejes = np.stack([bloque['ax'], bloque['ay'], bloque['az']]).astype(np.float64)
+        magnitud = np.sqrt((ejes ** 2).sum(axis=0))
+        detectadas.extend(detector.procesar(bloque['t'], magnitud[np.newaxis]))
+        yield bloque
+
+
+def agregar_ventanas(bloques, frecuencia, segundos=SEGUNDOS_POR_VENTANA):
+    # Junta bloques hasta completar una ventana y la resume en un registro
+    por_ventana = max(1, int(round(frecuencia * segundos)))
+    pendiente = np.zeros(0, dtype=DTYPE_MUESTRA)
+    for bloque in bloques:
+        pendiente = np.concatenate([pendiente, bloque])
+        while len(pendiente) >= por_ventana:
+            muestras, pendiente = pendiente[:por_ventana], pendiente[por_ventana:]
+            magnitud = np.sqrt(muestras['ax'].astype(np.float64) ** 2 + muestras['ay'] ** 2 + muestras['az'] ** 2)
+            ventana = np.zeros(1, dtype=DTYPE_VENTANA)
+            ventana['t'] = muestras['t'][-1]
+            for campo in ('ritmo', 'spo2', 'temperatura', 'altitud'):
+                ventana[campo] = muestras[campo].mean()
+            ventana['aceleracion_media'] = magnitud.mean()
+            ventana['aceleracion_minima'] = magnitud.min()
+            ventana['aceleracion_maxima'] = magnitud.max()
+            yield ventana
+
+
+class CanalTelemetria:
+    def __init__(self, frecuencia=FRECUENCIA_DEFECTO, altura=12.0, ritmo_base=75.0, semilla=None, inicio=None):
+        self.frecuencia = frecuencia
+        self.altura = altura
+        self.ritmo_base = ritmo_base
+        self.inicio = time.time() if inicio is None else inicio
+        self.crudas = SerieTemporal(int(frecuencia * SEGUNDOS_CRUDOS), DTYPE_MUESTRA)
+        self.ventanas = SerieTemporal(CAPACIDAD_VENTANAS, DTYPE_VENTANA)
+        self.caidas_pendientes = []
+        self.detector = DetectorCaidas(frecuencia)
+        # (trabajador, inicio, impacto) de cada caída confirmada por el detector
+        self.caidas_detectadas = []
+        self._generador = np.random.default_rng(semilla)
+        self._conectar(self.inicio)
+
+    def _conectar(self, desde):
+        self._hasta = desde
+        fuente = fuente_sensores(self.frecuencia, self._generador, desde, self.altura, self.ritmo_base,
+                                 self.caidas_pendientes)
+        etapas = detectar_caidas(registrar(fuente, self.crudas), self.detector, self.caidas_detectadas)
+        self._tuberia = agregar_ventanas(etapas, self.frecuencia)
+
+    def inyectar_caida(self, fecha=None):
+        self.caidas_pendientes.append(max(self._hasta, time.time() if fecha is None else fecha))
+
+    def avanzar(self, ahora=None):
+        # Genera solo el tramo desde la última llamada hasta 'ahora'
+        ahora = time.time() if ahora is None else ahora
+        if ahora - self._hasta > MAXIMO_PONERSE_AL_DIA:
+            # Tramo demasiado largo: se reinicia la tubería en vez de generar todo
+            self._conectar(ahora - MAXIMO_PONERSE_AL_DIA)
+        nuevas = 0
+        while self._hasta + SEGUNDOS_POR_VENTANA <= ahora:
+            ventana = next(self._tuberia)
+            self.ventanas.agregar(ventana)
+            self._hasta = float(ventana['t'][0]) + 1.0 / self.frecuencia
+            nuevas += 1
+        return nuevas
+
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from alertas import MAXIMO_PENDIENTES, DespachadorAlertas, ServidorAlertasFalso, TransporteHTTP
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 100.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def falso():
+    with ServidorAlertasFalso() as servidor:
+        yield servidor
+
+
+def despachador(falso, reloj, **opciones):
+    return DespachadorAlertas(TransporteHTTP(falso.url, timeout=2), reloj=reloj, **opciones)
+
+
+def test_agrupa_por_destinatario_al_cerrar_la_ventana(falso):
+    reloj = Reloj()
+    alertas = despachador(falso, reloj, ventana=2.0)
+    for i in range(3):
+        alertas.notificar("+1", f"a{i}")
+    alertas.notificar("+2", "b0")
+    alertas.recibir()
+    assert alertas.despachar() == 0
+    reloj.ahora += 2.0
+    assert alertas.despachar() == 2
+
+    por_numero = {recibido['to']: recibido['text'] for recibido in falso.recibidos}
+    assert set(por_numero) == {"+1", "+2"}
+    assert por_numero["+1"].startswith("🚨 3 alertas") and "• a2" in por_numero["+1"]
+    assert por_numero["+2"] == "b0"
+    assert alertas.estadisticas['alertas_enviadas'] == 4
+    assert alertas.en_cola() == 0
+
+
+def test_cubo_de_fichas_limita_mensajes_por_destinatario(falso):
+    reloj = Reloj()
+    alertas = despachador(falso, reloj, ventana=0, mensajes_por_minuto=60, rafaga=2)
+    enviados = []
+    for i in range(4):
+        alertas.notificar("+1", f"a{i}")
+        alertas.notificar("+2", f"b{i}")
+        alertas.recibir()
+        enviados.append(alertas.despachar())
+    # Ráfaga de 2 por destinatario; después el lote crece en vez de mandar más
+    assert enviados == [2, 2, 0, 0]
+    assert alertas.en_cola() == 4
+    reloj.ahora += 1.0
+    assert alertas.despachar() == 2
+    assert alertas.en_cola() == 0
+    ultimos = [r['text'] for r in falso.recibidos if r['to'] == "+1"]
+    assert ultimos[-1].startswith("🚨 2 alertas")
+
+
+def test_reintenta_errores_5xx_con_espera_exponencial(falso):
+    reloj = Reloj()
+    alertas = despachador(falso, reloj, ventana=0, espera_base=1.0, reintentos=3)
+    falso.fallar_siguientes(2, estado=503)
+    alertas.notificar("+1", "caída")
+    alertas.recibir()
+
+    assert alertas.despachar() == 0
+    primera = alertas._reintentos[0][0] - reloj.ahora
+    assert 1.0 <= primera <= 1.5
+    reloj.ahora += 0.9
+    assert alertas.despachar() == 0 and alertas.estadisticas['reintentos'] == 1
+
+    reloj.ahora += primera
+    assert alertas.despachar() == 0
+    segunda = alertas._reintentos[0][0] - reloj.ahora
+    assert 2.0 <= segunda <= 3.0
+
+    reloj.ahora += segunda
+    assert alertas.despachar() == 1
+    assert [r['text'] for r in falso.recibidos] == ["caída"]
+    assert alertas.estadisticas['reintentos'] == 2 and alertas.estadisticas['fallidos'] == 0
+
+
+def test_agota_reintentos_y_cuenta_fallido(falso):
+    reloj = Reloj()
+    alertas = despachador(falso, reloj, ventana=0, espera_base=1.0, reintentos=1)
+    falso.fallar_siguientes(5, estado=500)
+    alertas.notificar("+1", "caída")
+    alertas.recibir()
+    alertas.despachar()
+    reloj.ahora += 10
+    alertas.despachar()
+    assert alertas.estadisticas['fallidos'] == 1 and not alertas._reintentos
+    assert falso.recibidos == []
+
+
+def test_cola_llena_descarta_sin_bloquear(falso):
+    alertas = despachador(falso, Reloj(), capacidad=3)
+    inicio = time.perf_counter()
+    aceptadas = [alertas.notificar("+1", f"a{i}") for i in range(5)]
+    assert time.perf_counter() - inicio < 0.1
+    assert aceptadas == [True, True, True, False, False]
+    assert alertas.estadisticas['encoladas'] == 3 and alertas.estadisticas['descartadas'] == 2
+
+
+def test_caida_sobrevive_a_cola_y_lote_llenos(falso):
+    reloj = Reloj()
+    alertas = despachador(falso, reloj, capacidad=MAXIMO_PENDIENTES + 50, ventana=2.0)
+    assert alertas.notificar("+1", "🔴 Caída detectada", urgente=True)
+    for i in range(MAXIMO_PENDIENTES + 50):
+        alertas.notificar("+1", f"riesgo {i}")
+    assert not alertas.notificar("+1", "riesgo de más")
+    assert alertas.notificar("+1", "🔴 Segunda caída", urgente=True)
+    alertas.recibir()
+    # Descartadas: la de la cola llena y los riesgos más viejos que no caben junto a las dos caídas
+    assert alertas.estadisticas['descartadas'] == 1 + 52
+    assert alertas.en_cola() == MAXIMO_PENDIENTES
+
+    reloj.ahora += 2.0
+    assert alertas.despachar() == 1
+    lineas = falso.recibidos[0]['text'].splitlines()
+    assert lineas[1:3] == ["• 🔴 Caída detectada", "• 🔴 Segunda caída"]
+
+
+def test_hilo_entrega_al_servidor(falso):
+    alertas = DespachadorAlertas(TransporteHTTP(falso.url, timeout=2), ventana=0.05)
+    alertas.iniciar()
+    try:
+        alertas.notificar("+1", "hola")
+        limite = time.monotonic() + 3
+        while not falso.recibidos and time.monotonic() < limite:
+            time.sleep(0.01)
+    finally:
+        alertas.detener()
+    assert [r['text'] for r in falso.recibidos] == ["hola"]
+    assert not alertas.activo()
@@ -0,0 +1,150 @@
+import random
+import sys
+import threading
+from datetime import datetime
+
+from almacen import AlmacenSimulacion, AsignadorCodigos
+from modelos import ZONAS, Epp, Estudiante, Perfil, Zona
+from persistencia import PersistenciaSQLite
+from riesgos import CODIGO_RIESGO, cache_evaluaciones
+from simulacion import MotorSimulacion
+from utilidades import DespachoRegistrado, nueva_sala
+
+
+def test_finalizar_sala_olvida_evaluaciones_en_cache():
+    almacen = AlmacenSimulacion()
+    sala = nueva_sala(almacen)
+    _, estudiantes = almacen.instantanea_sala(sala.sala_id)
+    cache_evaluaciones.evaluar(estudiantes)
+    antes = len(cache_evaluaciones)
+    almacen.finalizar_sala(sala.sala_id)
+    assert len(cache_evaluaciones) == antes - len(estudiantes)
+
+
+def test_contadores_al_dia_tras_operaciones_aleatorias(tmp_path):
+    generador = random.Random(3)
+    ruta = str(tmp_path / "salas.db")
+    almacen = AlmacenSimulacion(persistencia=PersistenciaSQLite(ruta))
+    motor = MotorSimulacion(almacen)
+    ids = []
+    for paso in range(400):
+        operacion = generador.random()
+        activas = [sala.sala_id for sala in almacen.salas_activas()]
+        if operacion < 0.1 or not activas:
+            ids.append(nueva_sala(almacen, generador.randint(0, 4), intervalo_movimiento=10).sala_id)
+        elif operacion < 0.3:
+            sala_id = generador.choice(activas)
+            numero = len(almacen.salas[sala_id].estudiantes)
+            almacen.registrar_estudiante(sala_id, Estudiante(
+                id=f"{sala_id}-{numero}", nombre=f"E{numero}", tipo_personaje=generador.choice(list(Perfil)),
+                epp=generador.sample(list(Epp), generador.randint(0, 3)), sala_id=sala_id))
+        elif operacion < 0.4:
+            almacen.actualizar_sala(generador.choice(activas), simulacion_iniciada=generador.random() < 0.7)
+        elif operacion < 0.5:
+            sala = almacen.salas[generador.choice(activas)]
+            if sala.estudiantes:
+                almacen.mover_estudiante(sala.sala_id, generador.choice(sala.estudiantes), generador.choice(ZONAS),
+                                         datetime.now())
+        elif operacion < 0.6:
+            sala = almacen.salas[generador.choice(activas)]
+            if sala.estudiantes:
+                almacen.actualizar_estudiante(sala.sala_id, generador.choice(sala.estudiantes),
+                                              epp=generador.sample(list(Epp), generador.randint(0, 3)))
+        elif operacion < 0.65:
+            almacen.reiniciar_movimientos(generador.choice(activas), ZONAS[0])
+        elif operacion < 0.7:
+            almacen.finalizar_sala(generador.choice(ids))
+        else:
+            motor.paso(reloj=paso * 10.0)
+        assert almacen.verificar_contadores() == {}, paso
+
+    hidratado = AlmacenSimulacion(persistencia=PersistenciaSQLite(ruta))
+    hidratado.hidratar()
+    assert hidratado.verificar_contadores() == {}
+    assert hidratado.contadores.salas_activas == almacen.contadores.salas_activas
+
+
+def test_verificar_contadores_detecta_desvios():
+    almacen = AlmacenSimulacion()
+    nueva_sala(almacen)
+    almacen.contadores.estudiantes += 1
+    assert almacen.verificar_contadores() == {'estudiantes': (6, 5)}
+
+
+def test_movimiento_manual_acumula_riesgos_historial_y_alertas():
+    despacho = DespachoRegistrado()
+    almacen = AlmacenSimulacion(alertas=despacho)
+    sala = nueva_sala(almacen, 0, telefono_monitor="+521")
+    almacen.registrar_estudiante(sala.sala_id, Estudiante(id="e", nombre="Ana", tipo_personaje="Hombre musculoso",
+                                                          epp=["Casco", "Botas con punta de acero"],
+                                                          ubicacion_actual=ZONAS[3], sala_id=sala.sala_id))
+    altura = CODIGO_RIESGO["🪂 ALTURA CRÍTICA - Arnés de seguridad requerido"]
+
+    almacen.mover_estudiante(sala.sala_id, "e", Zona.ANDAMIOS, datetime.now())
+    sala_actual, (estudiante,) = almacen.instantanea_sala(sala.sala_id)
+    assert estudiante.riesgos_detectados & (1 << altura)
+    assert sala_actual.con_riesgo == 1
+    assert sala_actual.historial.total == 1
+    assert any(alerta.codigo == altura for alerta in almacen.seguimiento.activas(sala.sala_id))
+    assert [texto for texto in despacho.notificados if "ALTURA CRÍTICA" in texto]
+    assert almacen.verificar_contadores() == {}
+
+
+def test_instantanea_nunca_ve_una_escritura_a_medias():
+    # Intercambio de hilos muy frecuente para que el lector caiga en medio de escrituras
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    almacen = AlmacenSimulacion()
+    sala = nueva_sala(almacen, estudiantes=20)
+    detener = threading.Event()
+
+    def escritor():
+        valor = 0
+        while not detener.is_set():
+            valor += 1
+            with almacen.modificar_sala(sala.sala_id) as escrita:
+                escrita.con_riesgo = valor
+                for est_id in escrita.estudiantes:
+                    almacen.estudiantes[est_id].caidas = valor
+                escrita.sin_arnes = valor
+
+    hilo = threading.Thread(target=escritor)
+    hilo.start()
+    try:
+        for _ in range(2000):
+            copia, estudiantes = almacen.instantanea_sala(sala.sala_id)
+            assert copia.version % 2 == 0
+            assert copia.con_riesgo == copia.sin_arnes
+            assert {estudiante.caidas for estudiante in estudiantes} == {copia.con_riesgo}
+    finally:
+        detener.set()
+        hilo.join()
+        sys.setswitchinterval(intervalo)
+
+
+def test_codigos_liberados_se_reutilizan_y_sin_codigos_no_hay_sala():
+    almacen = AlmacenSimulacion()
+    almacen._codigos = AsignadorCodigos(minimo=1000, maximo=1001, semilla=1)
+    primera, segunda = nueva_sala(almacen, estudiantes=0), nueva_sala(almacen, estudiantes=0)
+    assert {primera.codigo, segunda.codigo} == {"SIM-1000", "SIM-1001"}
+    assert almacen.crear_sala(monitor_nombre="Monitor") is None
+    assert almacen.contadores.salas == 2
+
+    almacen.finalizar_sala(primera.sala_id)
+    assert almacen.buscar_sala_por_codigo(primera.codigo) is None
+    tercera = nueva_sala(almacen, estudiantes=0)
+    assert tercera.codigo == primera.codigo
+    assert almacen.buscar_sala_por_codigo(tercera.codigo) is tercera
+    assert almacen.crear_sala(monitor_nombre="Monitor") is None
+
+
+def test_asignador_reserva_y_libera_sin_duplicados():
+    asignador = AsignadorCodigos(minimo=1000, maximo=1009, semilla=2)
+    assert asignador.reservar("SIM-1004") and not asignador.reservar("SIM-1004")
+    codigos = [asignador.asignar() for _ in range(9)]
+    assert asignador.asignar() is None and "SIM-1004" not in codigos
+    assert len(set(codigos)) == 9
+    asignador.liberar(codigos[3])
+    asignador.liberar(codigos[3])
+    assert asignador.disponibles() == 1
+    assert asignador.asignar() == codigos[3]
@@ -0,0 +1,75 @@
+import numpy as np
+
+from caidas import (FRECUENCIA_ACELEROMETRO, GRAVEDAD, REFRACTARIO, DetectorCaidas, patron_caida,
+                    simular_magnitudes)
+
+F = FRECUENCIA_ACELEROMETRO
+
+
+def quieto(generador, segundos):
+    return GRAVEDAD + generador.normal(0, 0.05, int(segundos * F))
+
+
+def con_caida(generador, antes=1.0, total=3.5):
+    senal = quieto(generador, total)
+    patron = patron_caida(generador, F)
+    desde = int(antes * F)
+    senal[desde:desde + len(patron)] = patron
+    return senal
+
+
+def en_lotes(detector, senal, cortes, inicio=0.0):
+    # senal: (trabajadores, n) partida en las posiciones 'cortes'; devuelve todas las caídas
+    tiempos = inicio + np.arange(senal.shape[1]) / F
+    caidas = []
+    for desde, hasta in zip([0] + cortes, cortes + [senal.shape[1]]):
+        caidas.extend(detector.procesar(tiempos[desde:hasta], senal[:, desde:hasta], ahora=tiempos[hasta - 1]))
+    return caidas
+
+
+def test_caida_partida_entre_dos_lotes():
+    generador = np.random.default_rng(1)
+    senal = np.stack([con_caida(generador), quieto(generador, 3.5)])
+    # El corte cae en medio del impacto: ningún lote tiene el patrón completo
+    corte = int(1.0 * F) + len(patron_caida(generador, F)) - 2
+    caidas = en_lotes(DetectorCaidas(), senal, [corte])
+    assert len(caidas) == 1
+    trabajador, inicio, impacto = caidas[0]
+    assert trabajador == 0 and 1.0 <= inicio < impacto < 1.5
+
+
+def test_mismo_resultado_en_cualquier_particion():
+    generador = np.random.default_rng(2)
+    senal = np.stack([con_caida(generador, antes=a) for a in (0.5, 1.0, 1.7)])
+    entera = en_lotes(DetectorCaidas(), senal, [])
+    assert len(entera) == 3
+    for cortes in ([50], [120, 121, 300], list(range(7, senal.shape[1], 7))):
+        assert en_lotes(DetectorCaidas(), senal, cortes) == entera
+
+
+def test_movimiento_normal_sin_falsos_positivos():
+    generador = np.random.default_rng(3)
+    detector = DetectorCaidas()
+    senal = simular_magnitudes(generador, 200, 60 * F, F, probabilidad=0)
+    assert en_lotes(detector, senal, list(range(F, 60 * F, F))) == []
+    assert detector.detectadas == 0
+
+
+def test_estado_por_trabajador_entre_lotes():
+    generador = np.random.default_rng(4)
+    detector = DetectorCaidas()
+    # Entre lotes solo queda la cola que aún no completa una ventana
+    en_lotes(detector, np.stack([quieto(generador, 5.0)] * 3), [100, 250])
+    assert detector._cola.shape == (3, detector.largo - 1)
+
+    # Cada trabajador tiene su propio período refractario
+    primera = np.stack([con_caida(generador), con_caida(generador), quieto(generador, 3.5)])
+    assert [c[0] for c in en_lotes(detector, primera, [], inicio=10.0)] == [0, 1]
+    rapida = np.stack([con_caida(generador, antes=0.1, total=2.5), quieto(generador, 2.5), quieto(generador, 2.5)])
+    assert en_lotes(detector, rapida, [], inicio=13.5) == []
+    assert len(en_lotes(DetectorCaidas(), rapida, [], inicio=13.5)) == 1
+    # Pasado el refractario, el mismo trabajador vuelve a detectarse
+    tardia = np.stack([con_caida(generador, antes=REFRACTARIO, total=5.5), quieto(generador, 5.5),
+                       con_caida(generador, total=5.5)])
+    assert [c[0] for c in en_lotes(detector, tardia, [], inicio=16.0)] == [0, 2]
+    assert detector.detectadas == 4
@@ -0,0 +1,65 @@
+import os
+from datetime import datetime
+
+from almacen import AlmacenSimulacion
+from eventos import EVENTO_CAIDA, EVENTO_MOVIMIENTO, DiariosEventos, cargar_instantanea, reconstruir
+from modelos import ID_ZONA, Zona
+from simulacion import MotorSimulacion
+from utilidades import nueva_sala
+
+
+def estado_en_vivo(almacen, sala):
+    estudiantes = almacen.estudiantes_de_sala(sala)
+    return ([ID_ZONA[e.ubicacion_actual] for e in estudiantes], [e.riesgos_detectados for e in estudiantes],
+            [sala.historial.movimientos_de(e.indice) for e in estudiantes], sala.caidas_detectadas)
+
+
+def test_instantanea_mas_cola_reproduce_el_estado_en_vivo(tmp_path):
+    almacen = AlmacenSimulacion()
+    almacen.diarios = DiariosEventos(str(tmp_path), eventos_por_instantanea=25)
+    sala = nueva_sala(almacen, estudiantes=12, intervalo_movimiento=1, semilla=3)
+    almacen.actualizar_sala(sala.sala_id, simulacion_iniciada=True)
+    motor = MotorSimulacion(almacen)
+    for reloj in range(40):
+        motor.paso(float(reloj))
+    almacen.mover_estudiante(sala.sala_id, sala.estudiantes[0], Zona.EXCAVACION, datetime.now())
+    almacen.registrar_caida(sala.sala_id, 2, simulada=True)
+
+    diario = almacen.diarios.diario(sala.sala_id)
+    # Hay instantánea y además una cola sin instantánea detrás de ella
+    assert 0 < cargar_instantanea(diario.ruta_instantanea).posicion < os.path.getsize(diario.ruta)
+    reconstruido = reconstruir(diario.ruta, diario.ruta_instantanea)
+    assert sum(reconstruido.movimientos) > 0 and reconstruido.posicion == os.path.getsize(diario.ruta)
+    desde_cero = reconstruir(diario.ruta, str(tmp_path / "no-existe.npz"))
+    for estado in (reconstruido, desde_cero, diario.estado):
+        assert (estado.zonas, estado.mascaras, estado.movimientos, estado.caidas) == estado_en_vivo(almacen, sala)
+
+
+def test_registro_incompleto_se_ignora_y_se_recorta(tmp_path):
+    diarios = DiariosEventos(str(tmp_path))
+    diario = diarios.diario("s")
+    diario.agregar(EVENTO_MOVIMIENTO, 1.0, 0, 0, 1)
+    diarios.cerrar("s")
+    with open(diario.ruta, 'ab') as archivo:
+        archivo.write(b"\x05\x00")
+    tamano = os.path.getsize(diario.ruta)
+
+    otro = DiariosEventos(str(tmp_path)).diario("s")
+    assert os.path.getsize(otro.ruta) == tamano - 2
+    otro.agregar(EVENTO_CAIDA, 2.0, 0)
+    estado = reconstruir(otro.ruta, str(tmp_path / "no-existe.npz"))
+    assert (estado.zonas, estado.caidas, estado.eventos) == ([1], 1, 2)
+
+
+def test_limita_los_archivos_abiertos(tmp_path):
+    diarios = DiariosEventos(str(tmp_path), archivos_abiertos=2)
+    for clave in ("a", "b", "c"):
+        diarios.diario(clave).agregar(EVENTO_MOVIMIENTO, 1.0, 0, 0, 1)
+    assert [diarios.diario(clave).abierto() for clave in ("b", "c")] == [True, True]
+    primero = diarios._diarios["a"]
+    assert not primero.abierto()
+    # Al volver a escribir se reabre y el que lleva más tiempo sin uso se cierra
+    diarios.diario("a").agregar(EVENTO_MOVIMIENTO, 2.0, 0, 1, 2)
+    assert primero.abierto() and not diarios._diarios["b"].abierto()
+    estado = reconstruir(primero.ruta, primero.ruta_instantanea)
+    assert (estado.zonas, estado.movimientos) == ([2], [2])
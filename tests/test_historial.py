@@ -0,0 +1,44 @@
+import numpy as np
+
+from almacen import AlmacenSimulacion
+from historial import HistorialMovimientos
+from utilidades import nueva_sala
+
+
+def registrar(historial, desde_fecha, n, estudiantes=3):
+    for fecha in range(desde_fecha, desde_fecha + n):
+        historial.registrar([fecha % estudiantes], [0], [1], float(fecha))
+
+
+def test_buffer_circular_da_la_vuelta_y_conserva_los_conteos():
+    historial = HistorialMovimientos(capacidad=8)
+    registrar(historial, 0, 20)
+    # Se descartan bloques de capacidad // 4 = 2: quedan los más recientes, en orden
+    fechas = historial.registros()['fecha']
+    assert list(fechas) == [float(f) for f in range(20 - len(historial), 20)]
+    assert len(historial) <= 8 and historial.total == 20
+    assert [historial.movimientos_de(i) for i in range(3)] == [7, 7, 6]
+    assert historial.leer_volcado().size == 0
+
+
+def test_lo_descartado_se_vuelca_y_se_relee(tmp_path):
+    historial = HistorialMovimientos(capacidad=8, ruta_volcado=str(tmp_path / "sub" / "sala.movimientos"))
+    registrar(historial, 0, 20)
+    # Un lote mayor que la capacidad vuelca su cabeza directamente
+    historial.registrar(np.arange(10), np.zeros(10), np.ones(10), 100.0)
+    volcado = historial.leer_volcado()
+    retenidos = historial.registros()
+    assert len(volcado) + len(retenidos) == historial.total == 30
+    # Volcado + memoria = todos los movimientos, en el mismo orden en que se registraron
+    todos = np.concatenate([volcado, retenidos])
+    assert list(todos['fecha']) == [float(f) for f in range(20)] + [100.0] * 10
+    assert list(todos['estudiante'][20:]) == list(range(10))
+
+
+def test_almacen_vuelca_en_su_directorio(tmp_path):
+    almacen = AlmacenSimulacion(directorio_historial=str(tmp_path))
+    sala = nueva_sala(almacen, estudiantes=1)
+    assert sala.historial.ruta_volcado == str(tmp_path / f"{sala.sala_id}.movimientos")
+    registrar(sala.historial, 0, sala.historial.capacidad + 1, estudiantes=1)
+    assert (tmp_path / f"{sala.sala_id}.movimientos").exists()
+    assert len(sala.historial.leer_volcado()) + len(sala.historial) == sala.historial.total
@@ -0,0 +1,80 @@
+import io
+
+import pytest
+
+from alertas import DespachadorAlertas, TransporteSimulado
+from almacen import AlmacenSimulacion
+from importacion import ErrorNomina, importar_nomina, leer_filas
+from utilidades import nueva_sala
+
+ENCABEZADO = "Nombre;Institución;Perfil;Peso;Altura\n"
+
+
+def test_csv_de_excel_en_cp1252_con_punto_y_coma():
+    almacen = AlmacenSimulacion()
+    sala = nueva_sala(almacen, estudiantes=0)
+    datos = (ENCABEZADO + "José Peña;Técnica;Persona mayor;70;170\n").encode("cp1252")
+    resultado = importar_nomina(almacen, sala.sala_id, io.BytesIO(datos), "nomina.csv")
+    assert not resultado.errores
+    assert [e.nombre for e in resultado.registrados] == ["José Peña"]
+    assert resultado.registrados[0].institucion == "Técnica"
+
+
+def test_csv_utf8_con_bom():
+    datos = (ENCABEZADO + "Ana;Técnica;Persona mayor;70;170\n").encode("utf-8-sig")
+    assert list(leer_filas(io.BytesIO(datos), "nomina.csv"))[0][1]['nombre'] == "Ana"
+
+
+def test_csv_indecodificable_es_error_de_nomina():
+    # 0x81 no existe en utf-8 (como byte suelto) ni en cp1252
+    datos = ENCABEZADO.encode() + b"\x81\x81;x;Persona mayor;70;170\n"
+    with pytest.raises(ErrorNomina):
+        list(leer_filas(io.BytesIO(datos), "nomina.csv"))
+
+
+def test_csv_danado_es_error_de_nomina():
+    # Un campo mayor que csv.field_size_limit() hace fallar al lector
+    datos = (ENCABEZADO + "A" * 200_000 + ";Técnica;Persona mayor;70;170\n").encode()
+    with pytest.raises(ErrorNomina):
+        list(leer_filas(io.BytesIO(datos), "nomina.csv"))
+
+
+def test_xlsx_invalido_es_error_de_nomina():
+    # Sin openpyxl también es ErrorNomina (con el mensaje de instalación)
+    with pytest.raises(ErrorNomina):
+        list(leer_filas(io.BytesIO(b"esto no es un zip"), "nomina.xlsx"))
+
+
+def test_errores_por_fila_y_sala_llena():
+    almacen = AlmacenSimulacion()
+    sala = nueva_sala(almacen, estudiantes=0)
+    sala.max_estudiantes = 1
+    datos = (ENCABEZADO + "Ana;Técnica;Persona mayor;70;170\n"
+             "Luis;Técnica;Robot;70;170\n"
+             "Eva;Técnica;Persona mayor;300;170\n"
+             "Sol;Técnica;Persona mayor;60;160\n").encode()
+    resultado = importar_nomina(almacen, sala.sala_id, io.BytesIO(datos), "nomina.csv")
+    assert [e.nombre for e in resultado.registrados] == ["Ana"]
+    assert [(error.fila, error.mensaje) for error in resultado.errores] == [
+        (3, "Perfil desconocido: 'Robot'"),
+        (4, "Peso fuera de rango (40-150): 300"),
+        (5, "la sala está llena"),
+    ]
+
+
+def test_nomina_grande_no_satura_el_despacho():
+    despacho = DespachadorAlertas(TransporteSimulado(), ventana=0)
+    almacen = AlmacenSimulacion(alertas=despacho)
+    sala = nueva_sala(almacen, estudiantes=0, telefono_monitor="+52 55 0000 0000")
+    sala.max_estudiantes = 500
+    datos = (ENCABEZADO + "".join(f"E{i};Técnica;Persona mayor;70;170\n" for i in range(500))).encode()
+    resultado = importar_nomina(almacen, sala.sala_id, io.BytesIO(datos), "nomina.csv")
+    assert len(resultado.registrados) == 500
+
+    almacen.registrar_caida(sala.sala_id, 0)
+    despacho.recibir()
+    despacho.despachar()
+    assert despacho.estadisticas['descartadas'] == 0
+    assert despacho.estadisticas['encoladas'] == 2
+    (_, mensaje), = despacho.transporte.enviados
+    assert "Nómina registrada" in mensaje and "Caída detectada: E0" in mensaje
@@ -0,0 +1,28 @@
+import time
+
+from metricas import RegistroMetricas
+
+
+def esperar(condicion, plazo=2.0):
+    limite = time.monotonic() + plazo
+    while not condicion() and time.monotonic() < limite:
+        time.sleep(0.01)
+    return condicion()
+
+
+def test_exportacion_periodica_sobrevive_errores_y_se_detiene(tmp_path):
+    registro = RegistroMetricas()
+    registro.registrar("prueba", 0.003)
+    carpeta = tmp_path / "todavia-no"
+    ruta = carpeta / "arnes.prom"
+    hilo = registro.exportar_periodicamente(str(ruta), intervalo=0.02)
+
+    # Sin carpeta la escritura falla, pero el hilo sigue vivo y cuenta los fallos
+    assert esperar(lambda: registro.exportaciones_fallidas >= 2)
+    assert hilo.is_alive()
+    carpeta.mkdir()
+    assert esperar(ruta.exists)
+    assert 'seccion="prueba"' in ruta.read_text(encoding='utf-8')
+
+    registro.detener()
+    assert not hilo.is_alive()
@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("pagina", ["pagina_inicio", "pagina_multijugador", "pagina_salas_activas",
+                                    "pagina_simulador"])
+def test_paginas_no_importan_pandas_al_cargar(pagina):
+    # Proceso aparte: el resto de las pruebas puede haber cargado pandas ya
+    codigo = f"import sys, {pagina}; print('pandas' in sys.modules)"
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert salida.stdout.strip().splitlines()[-1] == "False"
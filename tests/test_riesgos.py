@@ -0,0 +1,122 @@
+import random
+from datetime import datetime
+
+import pytest
+
+from almacen import AlmacenSimulacion
+from modelos import ZONAS, Condicion, Epp, Estudiante, Herramienta, Perfil, Zona
+from riesgos import (UMBRAL_LOTE, CacheEvaluaciones, evaluar_estudiantes, evaluar_riesgo_caida, evaluar_riesgo_sobrecarga,
+                     evaluar_riesgos_automaticos, evaluar_riesgos_memorizados, mascara_riesgos,
+                     mascaras_estudiantes)
+from utilidades import nueva_sala
+
+# Los bordes de cada banda: peso 70/85/100 kg e IMC 18.5/30 (altura 170 cm)
+PESOS_BORDE = [70, 70.01, 85, 85.01, 100, 100.01, 18.5 * 1.7 ** 2, 30 * 1.7 ** 2]
+ALTURAS = [-10, 0, 0.5, 140, 170, 200]
+UBICACIONES = [str(zona) for zona in ZONAS] + ["Oficina", "", "Andamios y Estructura", "zona sin nombre"]
+PERFILES = [str(perfil) for perfil in Perfil] + ["Robot", ""]
+
+
+def estudiante_aleatorio(generador, numero):
+    return {
+        'id': str(numero),
+        'tipo_personaje': generador.choice(PERFILES),
+        'peso': generador.choice(PESOS_BORDE + [generador.uniform(30, 160)]),
+        'altura': generador.choice(ALTURAS + [generador.uniform(120, 210)]),
+        'condiciones_salud': generador.sample([str(c) for c in Condicion], generador.randint(0, 3)),
+        'epp': generador.sample([str(e) for e in Epp], generador.randint(0, len(Epp))),
+        'herramientas': generador.sample([str(h) for h in Herramienta], generador.randint(0, 6)),
+    }
+
+
+def evaluacion_escalar(estudiante, ubicacion):
+    return (evaluar_riesgos_automaticos(estudiante, ubicacion), evaluar_riesgo_caida(estudiante, ubicacion),
+            evaluar_riesgo_sobrecarga(estudiante))
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_lote_igual_a_reglas_escalares(semilla):
+    generador = random.Random(semilla)
+    estudiantes = [estudiante_aleatorio(generador, i) for i in range(10000)]
+    ubicaciones = [generador.choice(UBICACIONES) for _ in estudiantes]
+    resultado = evaluar_estudiantes(estudiantes, ubicaciones)
+    mascaras = resultado.mascaras()
+    for i, (estudiante, ubicacion) in enumerate(zip(estudiantes, ubicaciones)):
+        automaticos, caida, sobrecarga = evaluacion_escalar(estudiante, ubicacion)
+        assert resultado.riesgos_automaticos(i) == automaticos, (estudiante, ubicacion)
+        assert resultado.riesgo_caida(i) == caida, (estudiante, ubicacion)
+        assert resultado.riesgo_sobrecarga(i) == sobrecarga, (estudiante, ubicacion)
+        assert int(mascaras[i]) == mascara_riesgos(automaticos + [caida, sobrecarga])
+
+
+def test_bordes_de_bandas():
+    ubicacion = str(ZONAS[0])
+    estudiantes = [{'id': str(i), 'tipo_personaje': "Persona mayor", 'peso': peso, 'altura': altura}
+                   for i, (peso, altura) in enumerate((p, a) for p in PESOS_BORDE for a in ALTURAS)]
+    resultado = evaluar_estudiantes(estudiantes, [ubicacion] * len(estudiantes))
+    for i, estudiante in enumerate(estudiantes):
+        automaticos, caida, sobrecarga = evaluacion_escalar(estudiante, ubicacion)
+        assert resultado.riesgos_automaticos(i) == automaticos, estudiante
+        assert resultado.riesgo_sobrecarga(i) == sobrecarga, estudiante
+
+
+def test_tabla_memorizada_igual_a_reglas_escalares():
+    generador = random.Random(7)
+    for numero in range(3000):
+        datos = estudiante_aleatorio(generador, numero)
+        if datos['tipo_personaje'] not in PERFILES[:len(Perfil)]:
+            continue
+        estudiante = Estudiante(nombre=f"E{numero}", **datos)
+        ubicacion = generador.choice(UBICACIONES)
+        automaticos, caida, sobrecarga = evaluacion_escalar(estudiante, ubicacion)
+        evaluacion = evaluar_riesgos_memorizados(estudiante, ubicacion)
+        assert list(evaluacion.automaticos) == automaticos
+        assert (evaluacion.caida, evaluacion.sobrecarga) == (caida, sobrecarga)
+
+
+def test_clave_guardada_se_renueva_al_editar():
+    almacen = AlmacenSimulacion()
+    sala = nueva_sala(almacen, estudiantes=1)
+    estudiante = almacen.estudiantes[sala.estudiantes[0]]
+    arnes = "🪂 ALTURA CRÍTICA - Arnés de seguridad requerido"
+    assert arnes in evaluar_riesgos_memorizados(estudiante, Zona.ANDAMIOS).automaticos
+    assert estudiante.clave_riesgos is not None
+
+    almacen.actualizar_estudiante(sala.sala_id, estudiante.id, epp=[Epp.ARNES])
+    assert estudiante.clave_riesgos is None
+    assert arnes not in evaluar_riesgos_memorizados(estudiante, Zona.ANDAMIOS).automaticos
+
+
+def test_cache_reevalua_solo_revisiones_nuevas():
+    almacen = AlmacenSimulacion()
+    sala = nueva_sala(almacen, estudiantes=4)
+    estudiantes = almacen.estudiantes_de_sala(sala)
+    cache = CacheEvaluaciones()
+    primeras = cache.evaluar(estudiantes)
+    assert cache.reevaluados == 4
+    for estudiante, evaluacion in zip(estudiantes, primeras):
+        automaticos, caida, sobrecarga = evaluacion_escalar(estudiante, estudiante.ubicacion_actual)
+        assert (list(evaluacion.automaticos), evaluacion.caida, evaluacion.sobrecarga) == (
+            automaticos, caida, sobrecarga)
+
+    almacen.mover_estudiante(sala.sala_id, estudiantes[0].id, Zona.EXCAVACION, datetime.now())
+    segundas = cache.evaluar(estudiantes)
+    assert cache.reevaluados == 5
+    assert segundas[1:] == primeras[1:]
+    assert "⛰️ Riesgo de derrumbe o atrapamiento" in segundas[0].automaticos
+
+
+def test_mascaras_iguales_por_debajo_y_por_encima_del_umbral():
+    generador = random.Random(11)
+    estudiantes = []
+    numero = 0
+    while len(estudiantes) < UMBRAL_LOTE:
+        datos = estudiante_aleatorio(generador, numero)
+        numero += 1
+        if datos['tipo_personaje'] in PERFILES[:len(Perfil)]:
+            estudiantes.append(Estudiante(nombre=f"E{numero}", **datos))
+    ubicaciones = [generador.choice(UBICACIONES) for _ in estudiantes]
+    lote = mascaras_estudiantes(estudiantes, ubicaciones)
+    escalares = [mascaras_estudiantes([estudiante], [ubicacion])[0]
+                 for estudiante, ubicacion in zip(estudiantes, ubicaciones)]
+    assert lote == escalares
@@ -0,0 +1,82 @@
+from modelos import EstadoAlerta
+from riesgos import CODIGO_RIESGO
+from seguimiento import PLAZO_CRITICO, PLAZO_NORMAL, SeguimientoAlertas
+
+ALTURA = CODIGO_RIESGO["🪂 ALTURA CRÍTICA - Arnés de seguridad requerido"]
+FATIGA = CODIGO_RIESGO["👴 Mayor riesgo de fatiga y caídas"]
+BAJO = CODIGO_RIESGO["🟢 BAJO RIESGO de caída"]
+
+
+def pasos(transiciones):
+    return [(t.codigo, t.desde, t.hacia) for t in transiciones]
+
+
+def estados(seguimiento):
+    return {a.codigo: a.estado for a in seguimiento.activas("s")}
+
+
+def test_ciclo_abierta_reconocida_resuelta():
+    seguimiento = SeguimientoAlertas()
+    assert pasos(seguimiento.observar("s", "e", 1 << ALTURA, 0)) == [(ALTURA, None, EstadoAlerta.ABIERTA)]
+    # La misma máscara otra vez no publica nada
+    assert seguimiento.observar("s", "e", 1 << ALTURA, 5) == []
+    assert pasos(seguimiento.reconocer("s", [("e", ALTURA)], 10)) == [
+        (ALTURA, EstadoAlerta.ABIERTA, EstadoAlerta.RECONOCIDA)]
+    # Reconocida ya no escala
+    assert seguimiento.revisar(10 + PLAZO_CRITICO) == []
+    assert pasos(seguimiento.observar("s", "e", 0, 20)) == [
+        (ALTURA, EstadoAlerta.RECONOCIDA, EstadoAlerta.RESUELTA)]
+    assert seguimiento.activas("s") == []
+
+
+def test_revisar_escala_al_vencer_el_plazo():
+    seguimiento = SeguimientoAlertas()
+    seguimiento.observar("s", "e", (1 << ALTURA) | (1 << FATIGA) | (1 << BAJO), 0)
+    assert seguimiento.revisar(PLAZO_CRITICO - 1) == []
+    assert pasos(seguimiento.revisar(PLAZO_CRITICO)) == [(ALTURA, EstadoAlerta.ABIERTA, EstadoAlerta.ESCALADA)]
+    assert pasos(seguimiento.revisar(PLAZO_NORMAL)) == [(FATIGA, EstadoAlerta.ABIERTA, EstadoAlerta.ESCALADA)]
+    # Los informativos nunca escalan
+    assert seguimiento.revisar(10 * PLAZO_NORMAL) == []
+    assert estados(seguimiento) == {ALTURA: EstadoAlerta.ESCALADA, FATIGA: EstadoAlerta.ESCALADA,
+                                    BAJO: EstadoAlerta.ABIERTA}
+    # Escalada y después reconocida
+    assert pasos(seguimiento.reconocer("s", [("e", ALTURA)], 700)) == [
+        (ALTURA, EstadoAlerta.ESCALADA, EstadoAlerta.RECONOCIDA)]
+
+
+def test_reaparece_dentro_de_la_ventana_sin_anuncio():
+    seguimiento = SeguimientoAlertas(supresion=60)
+    seguimiento.observar("s", "e", 1 << ALTURA, 0)
+    seguimiento.reconocer("s", [("e", ALTURA)], 1)
+    seguimiento.observar("s", "e", 0, 10)
+    assert seguimiento.observar("s", "e", 1 << ALTURA, 69) == []
+    # Retoma el estado que tenía y conserva su apertura original
+    (alerta,) = seguimiento.activas("s")
+    assert alerta.estado is EstadoAlerta.RECONOCIDA and alerta.abierta == 0 and alerta.reaperturas == 1
+    assert seguimiento.suprimidas == 1
+
+
+def test_reaparece_fuera_de_la_ventana_como_alerta_nueva():
+    seguimiento = SeguimientoAlertas(supresion=60)
+    seguimiento.observar("s", "e", 1 << ALTURA, 0)
+    seguimiento.reconocer("s", [("e", ALTURA)], 1)
+    seguimiento.observar("s", "e", 0, 10)
+    # Sin pasada de revisar en medio: la resuelta sigue guardada, pero ya venció
+    assert pasos(seguimiento.observar("s", "e", 1 << ALTURA, 70)) == [(ALTURA, None, EstadoAlerta.ABIERTA)]
+    (alerta,) = seguimiento.activas("s")
+    assert alerta.abierta == 70 and alerta.reaperturas == 0
+    assert seguimiento.suprimidas == 0
+
+
+def test_revisar_olvida_resueltas_viejas_y_resolver_sala():
+    seguimiento = SeguimientoAlertas(supresion=60)
+    seguimiento.observar("s", "e", (1 << ALTURA) | (1 << FATIGA), 0)
+    seguimiento.observar("s", "e", 1 << FATIGA, 10)
+    seguimiento.revisar(70)
+    assert pasos(seguimiento.observar("s", "e", (1 << ALTURA) | (1 << FATIGA), 71)) == [
+        (ALTURA, None, EstadoAlerta.ABIERTA)]
+    resueltas = seguimiento.resolver_sala("s", 80)
+    assert sorted(pasos(resueltas)) == sorted([(ALTURA, EstadoAlerta.ABIERTA, EstadoAlerta.RESUELTA),
+                                               (FATIGA, EstadoAlerta.ABIERTA, EstadoAlerta.RESUELTA)])
+    assert [t.numero for t in seguimiento.transiciones("s", desde=resueltas[0].numero - 1)] == [
+        t.numero for t in resueltas]
@@ -0,0 +1,68 @@
+import functools
+import types
+
+from almacen import AlmacenSimulacion
+from simulacion import MotorSimulacion
+from utilidades import DespachoRegistrado, nueva_sala
+
+
+def test_motor_suelta_el_estado_de_salas_finalizadas():
+    almacen = AlmacenSimulacion()
+    salas = [nueva_sala(almacen, intervalo_movimiento=1) for _ in range(3)]
+    for sala in salas:
+        almacen.actualizar_sala(sala.sala_id, simulacion_iniciada=True)
+    motor = MotorSimulacion(almacen)
+    for reloj in range(5):
+        motor.paso(float(reloj))
+    assert set(motor._proximo_tick) == set(motor._generadores) == {sala.sala_id for sala in salas}
+
+    almacen.finalizar_sala(salas[0].sala_id)
+    motor.paso(5.0)
+    vivas = {sala.sala_id for sala in salas[1:]}
+    assert set(motor._proximo_tick) == set(motor._generadores) == vivas
+    assert set(motor._sensores) <= vivas
+
+
+def test_caidas_sinteticas_solo_con_sensores_simulados_y_sin_alertas(monkeypatch):
+    import caidas
+    monkeypatch.setattr(caidas, "simular_magnitudes", functools.partial(caidas.simular_magnitudes, probabilidad=0.05))
+    despacho = DespachoRegistrado()
+    almacen = AlmacenSimulacion(alertas=despacho)
+    normal = nueva_sala(almacen, 20, telefono_monitor="+521", intervalo_movimiento=1000)
+    simulada = nueva_sala(almacen, 20, telefono_monitor="+521", intervalo_movimiento=1000, simular_sensores=True)
+    for sala in (normal, simulada):
+        almacen.actualizar_sala(sala.sala_id, simulacion_iniciada=True)
+    # Reloj virtual para los acelerómetros: cada paso simula un segundo de muestras
+    reloj = [1000.0]
+    monkeypatch.setattr(caidas, "time", types.SimpleNamespace(time=lambda: reloj[0]))
+    motor = MotorSimulacion(almacen)
+    for _ in range(60):
+        reloj[0] += 1.0
+        motor.paso()
+
+    assert almacen.salas[normal.sala_id].caidas_detectadas == 0
+    assert normal.sala_id not in motor._sensores
+    assert almacen.salas[simulada.sala_id].caidas_detectadas > 0
+    assert not [texto for texto in despacho.notificados if "Caída" in texto]
+
+    # Una caída real (no simulada) sí se alerta
+    almacen.registrar_caida(normal.sala_id, 0)
+    assert [texto for texto in despacho.notificados if "Caída" in texto]
+
+
+def secuencia_de_movimientos(semilla, pasos=30):
+    almacen = AlmacenSimulacion()
+    sala = nueva_sala(almacen, 25, intervalo_movimiento=1, semilla=semilla)
+    almacen.actualizar_sala(sala.sala_id, simulacion_iniciada=True)
+    motor = MotorSimulacion(almacen)
+    for reloj in range(pasos):
+        motor.paso(float(reloj))
+    registros = sala.historial.registros()
+    return [tuple(fila) for fila in registros[['estudiante', 'desde', 'hacia']].tolist()]
+
+
+def test_misma_semilla_misma_secuencia_de_movimientos():
+    primera = secuencia_de_movimientos(1234)
+    assert len(primera) > 100
+    assert secuencia_de_movimientos(1234) == primera
+    assert secuencia_de_movimientos(4321) != primera
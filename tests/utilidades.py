@@ -0,0 +1,22 @@
+from modelos import Estudiante
+
+# Ayudas compartidas por las pruebas
+
+
+def nueva_sala(almacen, estudiantes=5, **datos):
+    sala = almacen.crear_sala(monitor_nombre="Monitor", tipo_escenario="Prueba", max_estudiantes=50, **datos)
+    for i in range(estudiantes):
+        almacen.registrar_estudiante(sala.sala_id, Estudiante(id=f"{sala.sala_id}-{i}", nombre=f"E{i}",
+                                                             tipo_personaje="Persona mayor",
+                                                             sala_id=sala.sala_id))
+    return sala
+
+
+class DespachoRegistrado:
+    # Sustituto de DespachadorAlertas que solo guarda los textos notificados
+    def __init__(self):
+        self.notificados = []
+
+    def notificar(self, destinatario, texto, sala_id="", urgente=False):
+        self.notificados.append(texto)
+        return True